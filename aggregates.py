@@ -0,0 +1,308 @@
+"""Daily aggregate cube for the dashboard pages.
+
+The cube is a long table with one row per (unit, branch, date, metric)
+holding the summed ``value`` and the number of non-null amounts (``count``). It is
+built once per loaded source version; MTD KPIs, daily trend lines, branch
+scatter plots and branch tables are then slices of a few thousand aggregate
+rows instead of scans over the whole loan book.
+
+Flow metrics are keyed by the date the event happened. Balance metrics
+(outstanding, principal, expected repayment) are keyed by the loan's
+disbursement date; rows without a usable date keep a NaT date so all-time
+totals still include them.
+
+Each cube gets a period index (see ``periods``) partitioned by (unit, metric)
+the first time it is sliced, so a month or date-range slice is a binary
+search per partition instead of a mask over the whole cube.
+
+``stream_repayments`` builds the collection aggregates straight from the
+repayments CSV in fixed-size chunks, for batch jobs over repayment histories
+too long to load whole.
+"""
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import timings
+from periods import build_period_index, period_positions
+
+CUBE_COLUMNS = ['unit', 'branch', 'date', 'metric', 'value', 'count']
+
+# --- METRIC DEFINITIONS ---
+# metric -> (date column, value column)
+LOGBOOK_DISBURSEMENT_METRICS = {
+    'disbursed': ('Disbursed Date', 'Disbursed'),
+    'outstanding': ('Disbursed Date', 'Outstanding'),
+    'principal': ('Disbursed Date', 'Principal'),
+}
+LOGBOOK_REPAYMENT_METRICS = {
+    'collected': ('repayment_collected_date', 'repayment_amount'),
+}
+ZIDISHA_METRICS = {
+    'disbursed': ('Disbursed On Date', 'Principal Amount'),
+    'repaid': ('Disbursed On Date', 'Total Repayment Derived'),
+    'outstanding': ('Disbursed On Date', 'Total Outstanding Derived'),
+    'expected_repayment': ('Disbursed On Date', 'Total Expected Repayment Derived'),
+    'collections': ('Expected Matured On Date', 'Total Repayment Derived'),
+}
+
+ADVANS_BRANCH = 'Advans Branch'
+
+
+@timings.timed('aggregate')
+def _aggregate(df, unit, branch_col, metrics):
+    parts = []
+    for metric, (date_col, value_col) in metrics.items():
+        if date_col not in df or value_col not in df:
+            continue
+        # Sum in float64: the loader may hold amounts as float32
+        grouped = df[value_col].astype('float64').groupby(
+            [df[branch_col], df[date_col].dt.normalize()], dropna=False, observed=True)
+        part = grouped.agg(['sum', 'count']).reset_index()
+        part.columns = ['branch', 'date', 'value', 'count']
+        if isinstance(part['branch'].dtype, pd.CategoricalDtype):
+            part['branch'] = part['branch'].astype(object)
+        part.insert(0, 'unit', unit)
+        part.insert(3, 'metric', metric)
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=CUBE_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def build_logbook_cube(df_disb, df_coll):
+    """Daily Logbook disbursement, balance and collection aggregates per branch"""
+    # Loandisk appends a totals row with no branch id; it is not a loan
+    df_disb = df_disb[df_disb['Branch'].notna()] if 'Branch' in df_disb else df_disb
+    return pd.concat([
+        _aggregate(df_disb, 'Logbook', 'Branch Name', LOGBOOK_DISBURSEMENT_METRICS),
+        _aggregate(df_coll, 'Logbook', 'Branch Name', LOGBOOK_REPAYMENT_METRICS),
+    ], ignore_index=True)
+
+
+def build_zidisha_cube(df_zidisha):
+    """Daily Zidisha and Advans aggregates per branch (Advans Branch is its own unit)"""
+    is_advans = df_zidisha['Branch Name'] == ADVANS_BRANCH
+    return pd.concat([
+        _aggregate(df_zidisha[~is_advans], 'Zidisha', 'Branch Name', ZIDISHA_METRICS),
+        _aggregate(df_zidisha[is_advans], 'Advans', 'Branch Name', ZIDISHA_METRICS),
+    ], ignore_index=True)
+
+
+@timings.timed('aggregate')
+def fold_cube(cube, delta_cube):
+    """Add the aggregates of newly arrived rows into an existing cube"""
+    if delta_cube.empty:
+        return cube
+    combined = pd.concat([cube, delta_cube], ignore_index=True)
+    return combined.groupby(['unit', 'branch', 'date', 'metric'], dropna=False, sort=False, observed=True)[
+        ['value', 'count']].sum().reset_index()
+
+
+# --- STREAMED REPAYMENTS ---
+# Columns parsed in streaming mode and their dtypes; ids parse much faster as
+# floats than as nullable integers and are converted once at the end
+STREAM_DTYPES = {'branch_id': 'float64', 'collector_id': 'float64', 'repayment_amount': 'float64'}
+STREAM_COLUMNS = list(STREAM_DTYPES) + ['repayment_collected_date']
+STREAM_CHUNK_ROWS = 100_000
+STREAM_KEYS = ['branch_id', 'collector_id', 'date']
+
+
+def _fold(running, part):
+    if running is None:
+        return part
+    return pd.concat([running, part]).groupby(level=STREAM_KEYS, dropna=False, sort=False).sum()
+
+
+@timings.timed('aggregate')
+def stream_repayments(path=data_loader.LOGBOOK_REPAYMENTS, chunksize=STREAM_CHUNK_ROWS):
+    """Repayment sums and counts per (branch, collector, day), read from the CSV chunk by chunk.
+
+    Only ``STREAM_COLUMNS`` are parsed and each chunk is folded into the
+    running group aggregates before the next one is read, so peak memory
+    depends on the chunk size and the number of groups, not on how many years
+    the file holds. Returns a frame with 'branch', 'collector_id', 'date',
+    'value' and 'count' columns; dates and branch names are parsed as the
+    loader parses them.
+    """
+    running = None
+    for chunk in pd.read_csv(path, usecols=STREAM_COLUMNS, dtype=STREAM_DTYPES, chunksize=chunksize):
+        dates = pd.to_datetime(chunk['repayment_collected_date'], format='%d/%m/%Y', errors='coerce')
+        part = chunk['repayment_amount'].groupby(
+            [chunk['branch_id'], chunk['collector_id'], dates.rename('date')], dropna=False).agg(['sum', 'count'])
+        running = _fold(running, part)
+    if running is None:
+        return pd.DataFrame(columns=['branch', 'collector_id', 'date', 'value', 'count'])
+    totals = running.reset_index()
+    totals['collector_id'] = totals['collector_id'].astype('Int64')
+    # Same names the loader gives, e.g. 'Branch 12' and 'Branch nan' for unmapped and missing ids
+    ids = totals['branch_id'].astype('Int64').astype(object).where(totals['branch_id'].notna(), np.nan)
+    totals.insert(0, 'branch', data_loader.map_branch_names(ids))
+    totals = totals.drop(columns='branch_id').rename(columns={'sum': 'value'})
+    return totals[['branch', 'collector_id', 'date', 'value', 'count']]
+
+
+def streamed_totals(totals, by):
+    """Roll streamed repayment aggregates up to 'branch', 'collector_id' or 'date'"""
+    rolled = totals.groupby(by, dropna=False)[['value', 'count']].sum()
+    rolled.index.name = None
+    return rolled
+
+
+def streamed_collections_cube(totals):
+    """Logbook 'collected' cube rows from streamed repayment aggregates"""
+    rows = totals.groupby(['branch', 'date'], dropna=False, sort=True)[['value', 'count']].sum().reset_index()
+    rows.insert(0, 'unit', 'Logbook')
+    rows.insert(3, 'metric', 'collected')
+    return rows[CUBE_COLUMNS]
+
+
+def build_streamed_logbook_cube(df_disb, path=data_loader.LOGBOOK_REPAYMENTS, chunksize=STREAM_CHUNK_ROWS,
+                                totals=None):
+    """Logbook cube with the collection aggregates streamed from the repayments CSV (or ``totals`` already streamed)"""
+    df_disb = df_disb[df_disb['Branch'].notna()] if 'Branch' in df_disb else df_disb
+    totals = stream_repayments(path, chunksize) if totals is None else totals
+    return pd.concat([
+        _aggregate(df_disb, 'Logbook', 'Branch Name', LOGBOOK_DISBURSEMENT_METRICS),
+        streamed_collections_cube(totals),
+    ], ignore_index=True)
+
+
+# --- CACHED CUBES ---
+# name -> (source frames, cube); the loader hands out the same frame objects until
+# a file changes, so identity tells us whether the cube is still current.
+_cubes = {}
+_lock = threading.Lock()
+
+
+def _cached(name, frames, build):
+    with _lock:
+        entry = _cubes.get(name)
+        if entry is not None and all(a is b for a, b in zip(entry[0], frames)):
+            return entry[1]
+    cube = build(*frames)
+    with _lock:
+        _cubes[name] = (frames, cube)
+    return cube
+
+
+def logbook_cube(df_disb, df_coll):
+    """Logbook cube for these loaded Logbook frames.
+
+    When the only change since the cached cube is rows appended to the
+    repayments export, just those rows are aggregated and folded in instead of
+    rebuilding the whole cube.
+    """
+    with _lock:
+        entry = _cubes.get('logbook')
+    if entry is not None and entry[0][0] is df_disb and entry[0][1] is not df_coll:
+        delta = data_loader.appended_rows(data_loader.LOGBOOK_REPAYMENTS, entry[0][1])
+        if delta is not None:
+            cube = fold_cube(entry[1], _aggregate(delta, 'Logbook', 'Branch Name', LOGBOOK_REPAYMENT_METRICS))
+            with _lock:
+                _cubes['logbook'] = ((df_disb, df_coll), cube)
+            return cube
+    return _cached('logbook', (df_disb, df_coll), build_logbook_cube)
+
+
+def zidisha_cube(df_zidisha):
+    """Zidisha/Advans cube for a loaded Zidisha frame"""
+    return _cached('zidisha', (df_zidisha,), build_zidisha_cube)
+
+
+def load_logbook_cube():
+    """Logbook cube for the currently loaded Logbook sources"""
+    return logbook_cube(data_loader.load_logbook_disbursements(data_loader.LOGBOOK_DISBURSEMENT_COLUMNS),
+                        data_loader.load_logbook_repayments())
+
+
+def load_zidisha_cube():
+    """Zidisha/Advans cube for the currently loaded Zidisha source"""
+    return zidisha_cube(data_loader.load_zidisha(data_loader.ZIDISHA_COLUMNS))
+
+
+# --- CUBE INDEX ---
+# id(cube) -> (weak reference to the cube, index); entries go when their cube does
+_cube_indexes = {}
+
+
+def _forget_index(key):
+    return lambda ref: _cube_indexes.pop(key, None)
+
+
+def cube_index(cube):
+    """Period index of a cube by date within each (unit, metric), built once per cube"""
+    key = id(cube)
+    with _lock:
+        entry = _cube_indexes.get(key)
+        if entry is not None and entry[0]() is cube:
+            return entry[1]
+    index = build_period_index(cube, 'date', by=['unit', 'metric'])
+    with _lock:
+        _cube_indexes[key] = (weakref.ref(cube, _forget_index(key)), index)
+    return index
+
+
+# --- SLICING ---
+def _as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+@timings.timed('mask')
+def cube_slice(cube, unit=None, metric=None, start=None, end=None, branches=None):
+    """Rows of the cube matching the filters; ``start``/``end`` are inclusive dates.
+
+    Rows come back in cube order; undated rows are only included when neither
+    ``start`` nor ``end`` is given.
+    """
+    index = cube_index(cube)
+    units = None if unit is None else set(_as_list(unit))
+    metrics = None if metric is None else set(_as_list(metric))
+    groups = [g for g in index['groups']
+              if (units is None or g[0] in units) and (metrics is None or g[1] in metrics)]
+    if start is None and end is None:
+        parts = [index['positions'][slice(*index['groups'][g])] for g in groups]
+        positions = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    else:
+        positions = period_positions(index, pd.Timestamp.min if start is None else start,
+                                     pd.Timestamp.max if end is None else end, groups)
+    rows = cube.iloc[positions]
+    if branches is not None:
+        rows = rows[rows['branch'].isin(list(branches))]
+    return rows
+
+
+@timings.timed('aggregate')
+def cube_total(cube, **filters):
+    """Summed value over a slice (0.0 when the slice is empty)"""
+    return float(cube_slice(cube, **filters)['value'].sum())
+
+
+@timings.timed('aggregate')
+def cube_count(cube, **filters):
+    """Number of non-null amounts behind a slice (e.g. loans or repayments)"""
+    return int(cube_slice(cube, **filters)['count'].sum())
+
+
+@timings.timed('aggregate')
+def daily_series(cube, **filters):
+    """Per-day totals for a slice, indexed by date (undated rows excluded)"""
+    rows = cube_slice(cube, **filters)
+    rows = rows[rows['date'].notna()]
+    series = rows.groupby(rows['date'].dt.date)['value'].sum().sort_index()
+    series.index.name = None
+    return series
+
+
+@timings.timed('aggregate')
+def branch_summary(cube, **filters):
+    """Per-branch sum, count and mean for a slice, indexed by branch"""
+    rows = cube_slice(cube, **filters)
+    summary = rows.groupby('branch')[['value', 'count']].sum()
+    summary.columns = ['sum', 'count']
+    summary['mean'] = summary['sum'] / summary['count'].where(summary['count'] > 0)
+    summary.index.name = None
+    return summary
@@ -0,0 +1,143 @@
+"""KPI computations for the dashboard pages.
+
+Pure functions over the daily aggregate cube (see ``aggregates``) or raw loan
+frames plus a reporting date; they return plain numbers, dicts or small
+DataFrames and never touch Streamlit, so the pages, the precompute job and
+the benchmarks all run the same code. Zidisha and Advans share every
+function: Advans Branch is its own unit in the cube, so the unit argument
+replaces the old ``!= 'Advans Branch'`` / ``== 'Advans Branch'`` masks.
+"""
+import numpy as np
+import pandas as pd
+
+import timings
+from aggregates import branch_summary, cube_slice, cube_total
+from par import par_totals
+from periods import month_bounds, previous_month_bounds, same_period_last_month
+from targets import target_achievement
+
+
+# --- BRANCHES ---
+def valid_branches(cube, unit):
+    """Sorted branch names for a unit, without placeholder names such as 'Branch nan'"""
+    names = cube_slice(cube, unit=unit)['branch'].dropna().unique()
+    return [b for b in sorted(names) if 'nan' not in str(b).lower() and str(b).strip() != '']
+
+
+# --- DASHBOARD KPIS ---
+def logbook_kpis(cube, today, branches=None, period=None, par=None):
+    """Logbook MTD disbursed/collected, PAR30 % and MTD disbursement target achievement.
+
+    ``period`` (start, end) replaces the month containing ``today``. ``par``
+    is the PAR-by-branch table at the reporting date (``par.par_summary``);
+    without it PAR30 % is NaN.
+    """
+    month_start, month_end = period or month_bounds(today)
+    branches = valid_branches(cube, 'Logbook') if branches is None else list(branches)
+    mtd = dict(unit='Logbook', start=month_start, end=month_end, branches=branches)
+    mtd_disbursed = cube_total(cube, metric='disbursed', **mtd)
+    mtd_collected = cube_total(cube, metric='collected', **mtd)
+    outstanding = cube_total(cube, unit='Logbook', metric='outstanding', branches=branches)
+    principal = cube_total(cube, unit='Logbook', metric='principal', branches=branches)
+    achievement = target_achievement(cube, 'Logbook', 'disbursed', month_start, month_end, today)
+    mtd_target = float(achievement['mtd_target'].reindex(branches).sum())
+    par_pct = float(par_totals(par, branches)['par30_pct']) if par is not None else np.nan
+    return {
+        'branches': branches,
+        'mtd_disbursed': mtd_disbursed,
+        'mtd_collected': mtd_collected,
+        'outstanding': outstanding,
+        'principal': principal,
+        'par_pct': par_pct,
+        'mtd_target': mtd_target,
+        'target_achievement_pct': (mtd_disbursed / mtd_target * 100) if mtd_target > 0 else 0.0,
+    }
+
+
+def loan_book_kpis(cube, unit, today, period=None):
+    """Zidisha-style dashboard KPIs: MTD disbursed/collections, book outstanding and repayment rate.
+
+    ``period`` (start, end) replaces the month containing ``today``.
+    """
+    month_start, month_end = period or month_bounds(today)
+    mtd = dict(unit=unit, start=month_start, end=month_end)
+    mtd_collections = cube_total(cube, metric='collections', **mtd)
+    expected = cube_total(cube, unit=unit, metric='expected_repayment')
+    return {
+        'branches': int(cube_slice(cube, unit=unit)['branch'].nunique()),
+        'mtd_disbursed': cube_total(cube, metric='disbursed', **mtd),
+        'mtd_collections': mtd_collections,
+        'outstanding': cube_total(cube, unit=unit, metric='outstanding'),
+        'expected': expected,
+        'repayment_rate': (mtd_collections / expected * 100) if expected > 0 else 0.0,
+    }
+
+
+def disbursed_cohort_kpis(cube, unit, start, end):
+    """Totals for the loans disbursed between ``start`` and ``end`` (inclusive)"""
+    period = dict(unit=unit, start=start, end=end)
+    repaid = cube_total(cube, metric='repaid', **period)
+    expected = cube_total(cube, metric='expected_repayment', **period)
+    return {
+        'start': pd.Timestamp(start).date().isoformat(),
+        'end': pd.Timestamp(end).date().isoformat(),
+        'loans': int(cube_slice(cube, metric='disbursed', **period)['count'].sum()),
+        'disbursed': cube_total(cube, metric='disbursed', **period),
+        'repaid': repaid,
+        'outstanding': cube_total(cube, metric='outstanding', **period),
+        'expected': expected,
+        'repayment_rate': (repaid / expected * 100) if expected > 0 else 0.0,
+    }
+
+
+def period_comparison_kpis(cube, unit, today):
+    """Same-period-last-month and previous full month disbursement cohorts"""
+    return {
+        'same_period_last_month': disbursed_cohort_kpis(cube, unit, *same_period_last_month(today)),
+        'previous_month': disbursed_cohort_kpis(cube, unit, *previous_month_bounds(today)),
+    }
+
+
+def month_totals(cube, unit, metric, today, branches=None, period=None):
+    """Current-month (or ``period``) total, number of loans and average per loan for one metric"""
+    month_start, month_end = period or month_bounds(today)
+    rows = cube_slice(cube, unit=unit, metric=metric, start=month_start, end=month_end, branches=branches)
+    total = float(rows['value'].sum())
+    loans = int(rows['count'].sum())
+    return {'total': total, 'loans': loans, 'average': total / loans if loans else 0.0}
+
+
+# --- BRANCH TABLES ---
+def branch_table(cube, unit, metric, columns, start=None, end=None):
+    """Per-branch total, count and average, largest total first.
+
+    ``columns`` names the three output columns, e.g.
+    ('Total Disbursed', 'Number of Loans', 'Average Disbursement').
+    """
+    table = branch_summary(cube, unit=unit, metric=metric, start=start, end=end).round(2)
+    table.columns = list(columns)
+    return table.rename_axis('Branch Name').sort_values(columns[0], ascending=False)
+
+
+def branch_scatter(cube, unit, disbursed_metric, collected_metric, start, end, branches=None, outstanding_unit=None):
+    """Per-branch disbursed, collections, outstanding and collection rate % for the scatter plot.
+
+    Outstanding is the whole book for ``outstanding_unit`` (defaults to ``unit``).
+    """
+    period = dict(unit=unit, start=start, end=end, branches=branches)
+    scatter = pd.DataFrame({
+        'Disbursed': branch_summary(cube, metric=disbursed_metric, **period)['sum'],
+        'Collections': branch_summary(cube, metric=collected_metric, **period)['sum'],
+        'Outstanding': branch_summary(cube, unit=outstanding_unit or unit, metric='outstanding')['sum'],
+    }).fillna(0.0)
+    if branches is not None:
+        scatter = scatter.loc[[b for b in branches if b in scatter.index]]
+    scatter['Collection Rate %'] = (scatter['Collections'] / scatter['Disbursed'].replace({0: np.nan}) * 100).fillna(0)
+    return scatter
+
+
+@timings.timed('aggregate')
+def top_n(rows, key, value, n=10):
+    """Leaderboard of the ``n`` largest ``value`` totals per ``key``"""
+    totals = rows[value].astype('float64').groupby(rows[key], observed=True).sum()
+    return totals.sort_values(ascending=False).head(n).reset_index()
@@ -1,7 +1,26 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+
+import timings
+from aggregates import ADVANS_BRANCH, cube_slice, daily_series
+from analytics import (
+    branch_scatter, branch_table, loan_book_kpis, logbook_kpis, month_totals, period_comparison_kpis, valid_branches,
+)
+from charts import (
+    branch_scatter_figure, cached_chart, chart_cache_info, collection_targets_figure, daily_trend_chart,
+    disbursement_targets_figure,
+)
+from data_loader import cache_info as loader_cache_info
+from drilldown import drill_rows, leaderboard
+from par import aging_buckets, loan_aging, par_summary, par_totals
+from partitions import read_period, store_info
+from periods import month_bounds, month_period, recent_months, reporting_period
+from precompute import load_precomputed
+from registry import dataset_status, get_dataset, preload, registry_info, start_watcher
+from tables import DEFAULT_PAGE_SIZE, PAGE_SIZES, page_count, page_rows, table_cache_info, view_positions
+from targets import target_achievement
+from timeseries import series_frame
+from uploads import load_upload, upload_cache_info
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -100,8 +119,8 @@ if st.sidebar.button("Logbook", use_container_width=True, type="primary" if 'men
 if st.sidebar.button("Zidisha", use_container_width=True, type="primary" if 'menu' in st.session_state and st.session_state.menu == "Zidisha" else "secondary"):
     st.session_state.menu = "Zidisha"
 
-if st.sidebar.button("Kajea - Tech", use_container_width=True, type="primary" if 'menu' in st.session_state and st.session_state.menu == "Kajea - Tracking" else "secondary"):
-    st.session_state.menu = "Kajea - Tracking"
+if st.sidebar.button("Kajea - Tech", use_container_width=True, type="primary" if 'menu' in st.session_state and st.session_state.menu == "Kajea - Tech" else "secondary"):
+    st.session_state.menu = "Kajea - Tech"
 
 if st.sidebar.button("Insurance", use_container_width=True, type="primary" if 'menu' in st.session_state and st.session_state.menu == "Insurance" else "secondary"):
     st.session_state.menu = "Insurance"
@@ -115,111 +134,245 @@ if 'menu' not in st.session_state:
 
 menu = st.session_state.menu
 
-# --- BRANCH MAPPING ---
-BRANCH_MAPPING = {
-    12936: "BURUBURU BRANCH",
-    27504: "Kentsewe Branch", 
-    63796: "Kiambu Branch",
-    27133: "KIlimani Branch",
-    77791: "Kitengela Branch",
-    8678: "Mombasa Road",
-    75092: "P.C Insurance Agency",
-    59535: "TECH AND DEMO ACCOUNT",
-    75350: "Thika Branch",
-    8550: "TOWN BRANCH",
-    55886: "Utawala Branch"
-}
+# --- REPORTING PERIOD ---
+# One period for every page, kept across menus. Pages slice the shared
+# datasets by it (period indexes), so switching months never reloads data.
+def period_selector():
+    """Sidebar month or date-range picker; returns the selected reporting period"""
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("📅 Reporting Period")
+    today = pd.Timestamp.today().normalize()
+    mode = st.sidebar.radio("Period type", ["Month", "Date range"], key="period_mode", horizontal=True,
+                            label_visibility="collapsed")
+    if mode == "Month":
+        months = [m.strftime('%Y-%m') for m in recent_months(today)]
+        month = st.sidebar.selectbox("Month", months, key="period_month",
+                                     format_func=lambda m: pd.Timestamp(m).strftime('%B %Y'))
+        return month_period(month, today)
+    month_start, _ = month_bounds(today)
+    dates = st.sidebar.date_input("Dates", value=(month_start.date(), today.date()), key="period_range")
+    # Only the first date is set while the user is still picking the range
+    dates = dates if isinstance(dates, (list, tuple)) else (dates,)
+    if not dates:
+        return month_period(today, today)
+    return reporting_period(dates[0], dates[-1], today)
 
-# --- BRANCH TARGETS ---
-BRANCH_TARGETS = {
-    "BURUBURU BRANCH": {"target": 19000000.00, "mtd_target": 11952952.96},
-    "Kiambu Branch": {"target": 19000000.00, "mtd_target": 11256256.30},
-    "KIlimani Branch": {"target": 16000000.00, "mtd_target": 10074074.07},
-    "Kitengela Branch": {"target": 7000000.00, "mtd_target": 4407407.41},
-    "Thika Branch": {"target": 7000000.00, "mtd_target": 4407407.41},
-    "TOWN BRANCH": {"target": 19000000.00, "mtd_target": 11952952.96},
-    "Utawala Branch": {"target": 19000000.00, "mtd_target": 11952952.96}
-}
 
-# --- LOGBOOK COLLECTION TARGETS ---
-LOGBOOK_COLLECTION_TARGETS = {
-    "BURUBURU BRANCH": 17656540.5,
-    "Kiambu Branch": 11088520.2,
-    "KIlimani Branch": 13803121.6,
-    "Thika Branch": 1049290.77,
-    "TOWN BRANCH": 18708150.1,
-    "Utawala Branch": 8869743.78
-}
+def precomputed(section):
+    """A precompute store section, only when the period is the month it was computed for"""
+    if period['month'] is None:
+        return None
+    return load_precomputed(section, period['as_of'])
+
+
+period = period_selector()
+
+# --- SUB-VIEW NAVIGATION ---
+# Each menu remembers its selected view in st.session_state.views; only that
+# view's body runs on a rerun (st.tabs would compute every tab each time).
+if 'views' not in st.session_state:
+    st.session_state.views = {}
+
+
+def _select_view(menu, view):
+    st.session_state.views[menu] = view
+
+
+def view_selector(menu, views):
+    """Row of sub-view buttons for a menu; returns the selected view"""
+    selected = st.session_state.views.get(menu)
+    if selected not in views:
+        selected = st.session_state.views[menu] = views[0]
+    for col, view in zip(st.columns(len(views)), views):
+        col.button(view, key=f"view_{menu}_{view}", use_container_width=True,
+                   type="primary" if view == selected else "secondary",
+                   on_click=_select_view, args=(menu, view))
+    timings.set_page(f"{menu} / {selected}")
+    return selected
+
+# --- CHARTS ---
+def show_chart(kind, data, build):
+    """Display a chart from the shared cache; ``build(data)`` draws it on a miss"""
+    with timings.stage('render chart'):
+        chart = cached_chart(kind, data, lambda: build(data))
+        if isinstance(chart, bytes):
+            st.image(chart, use_container_width=True)
+        else:
+            st.vega_lite_chart(chart, use_container_width=True)
+
+# --- TABLES ---
+def paged_table(name, df, key=None, sort=None, ascending=True):
+    """Searchable, sortable table that sends only the visible page to the browser.
+
+    ``name`` keeps the widgets' state apart; ``key`` identifies frames rebuilt
+    on every rerun from the same data (see ``tables.view_positions``).
+    """
+    columns = list(df.columns)
+    col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+    search = col1.text_input("Search", key=f"{name}_search", placeholder="Search text columns")
+    sort = col2.selectbox("Sort by", [None] + columns, key=f"{name}_sort",
+                          index=columns.index(sort) + 1 if sort in columns else 0,
+                          format_func=lambda col: "Original order" if col is None else str(col))
+    descending = col3.toggle("Descending", value=not ascending, key=f"{name}_descending")
+    page_size = col4.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                               key=f"{name}_page_size")
+    positions = view_positions(df, sort, not descending, search, key)
+    pages = page_count(len(positions), page_size)
+    # A new search or page size can leave the remembered page past the end
+    page_key = f"{name}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = col5.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    st.dataframe(page_rows(df, positions, page, page_size), use_container_width=True)
+    first = (page - 1) * page_size + 1 if len(positions) else 0
+    caption = f"Rows {first:,}–{min(page * page_size, len(positions)):,} of {len(positions):,}"
+    if len(positions) < len(df):
+        caption += f" (filtered from {len(df):,})"
+    st.caption(caption)
+
+
+
+def drill_down(name, df, index, start, end, key, branches=None, except_branches=None):
+    """Branch and officer/collector pickers over a drill-down index, with the matching rows paged below.
+
+    ``key`` identifies the loaded version of ``df`` (e.g. the dataset signature).
+    """
+    branch_level, leaf_level = index['levels']
+    branch_totals = leaderboard(index, branch_level, start, end, branches=branches, except_branches=except_branches,
+                                n=None)
+    if branch_totals.empty:
+        st.info("No rows for the selected period.")
+        return
+    col1, col2 = st.columns(2)
+    branch = col1.selectbox("Branch", branch_totals[branch_level].tolist(), key=f"{name}_branch")
+    leaf_totals = leaderboard(index, leaf_level, start, end, path=(branch,), n=None)
+    leaf = col2.selectbox(leaf_level, [None] + leaf_totals[leaf_level].tolist(), key=f"{name}_leaf",
+                          format_func=lambda value: "All" if value is None else str(value))
+    path = (branch,) if leaf is None else (branch, leaf)
+    rows = drill_rows(df, index, path, start, end)
+    paged_table(name, rows, key=(key, path, start, end), sort=index['value_col'], ascending=False)
+
+
+# --- DAILY TRENDS ---
+def rolling_trend(series, period, target=None, branches=None, except_branches=None):
+    """7/30-day averages, MTD against the prorated monthly ``target`` and the as-of day's deltas"""
+    frame = series_frame(series, period['start'], period['end'], branches, except_branches, target)
+    st.line_chart(frame[['value', 'mean_7d', 'mean_30d']].rename(
+        columns={'value': 'Daily', 'mean_7d': '7-day Average', 'mean_30d': '30-day Average'}))
+    day = frame.loc[period['as_of']]
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Last 7 Days", f"{day['sum_7d']:,.0f}")
+    with col2:
+        st.metric("Last 30 Days", f"{day['sum_30d']:,.0f}")
+    with col3:
+        on_track = None if target is None or pd.isna(day['mtd_target_pct']) else \
+            f"{day['mtd_target_pct']:.1f}% of target to date"
+        st.metric("Month to Date", f"{day['mtd']:,.0f}", on_track)
+    with col4:
+        st.metric(f"{period['as_of']:%d %b} vs Day Before", f"{day['value']:,.0f}", f"{day['dod']:,.0f}")
+    with col5:
+        st.metric("vs Same Day Last Month", f"{day['value']:,.0f}", f"{day['last_month']:,.0f}")
+    if target is not None:
+        st.line_chart(frame[['mtd', 'mtd_target']].rename(columns={'mtd': 'MTD', 'mtd_target': 'MTD Target'}))
+
 
-# --- FUNCTIONS TO LOAD DATA (placeholder) ---
+# --- PERFORMANCE PANEL ---
+# Shown below the page when the app is opened with ?admin=1
+def performance_panel(run):
+    """Stage timings of this rerun, p50/p95 of recent reruns and cache counters"""
+    with st.expander("Performance", expanded=True):
+        if run is not None:
+            st.markdown(f"**This rerun** ({run['page']}): {run['total'] * 1000:,.1f} ms")
+            stages = pd.Series(run['stages'], name='ms').reindex(timings.STAGES + [timings.OTHER]).fillna(0) * 1000
+            st.dataframe(stages.round(1).to_frame(), use_container_width=True)
+        summary = timings.summarize(timings.recent_runs())
+        if summary:
+            st.markdown("**Recent reruns in this server process** (p50 / p95 ms)")
+            rows = {}
+            for (_, page), row in summary.items():
+                rows[page] = {'runs': row.pop('runs')}
+                rows[page].update({name: f"{p50 * 1000:,.1f} / {p95 * 1000:,.1f}" for name, (p50, p95) in row.items()})
+            st.dataframe(pd.DataFrame(rows).T, use_container_width=True)
+        loader, shared, charts, store = loader_cache_info(), registry_info(), chart_cache_info(), store_info()
+        uploads, views = upload_cache_info(), table_cache_info()
+        st.caption(f"Loader cache: {loader['hits']} hits, {loader['misses']} misses | "
+                   f"Datasets: {shared['hits']} hits, {shared['builds']} builds, {shared['waits']} waits, "
+                   f"{shared['stale']} stale, {shared['refreshes']} background refreshes | "
+                   f"Partitions: {store['hits']} hits, {store['reads']} reads, {store['cached']} cached | "
+                   f"Chart cache: {charts['hits']} hits, {charts['misses']} misses, {charts['evictions']} evictions, "
+                   f"{charts['cached']} cached | "
+                   f"Uploads: {uploads['hits']} hits, {uploads['spill_hits']} from disk, {uploads['misses']} parsed, "
+                   f"{uploads['cached']} cached ({uploads['bytes'] / 1e6:,.1f} MB) | "
+                   f"Table views: {views['hits']} hits, {views['misses']} misses | Timings log: {timings.LOG_PATH}")
+
+def data_as_of(name):
+    """Caption with the time of the source files behind the data shown, and any refresh in progress"""
+    status = dataset_status(name)
+    if status is None:
+        return
+    text = f"🕒 Data as of {pd.Timestamp.fromtimestamp(status['as_of']):%d %b %Y, %H:%M}"
+    if status['refreshing']:
+        text += " · newer exports found, refreshing in the background"
+    if status['error']:
+        text += f" · could not load the newer exports ({status['error']})"
+    st.caption(text)
+
+# --- FUNCTIONS TO LOAD DATA ---
 def load_excel_data(file):
+    """Uploaded workbook as a frame, parsed once per file content (see ``uploads``)"""
     try:
-        return pd.read_excel(file)
+        return load_upload(file)
     except Exception:
         return pd.DataFrame()
 
-def get_branch_name(branch_id):
-    """Convert branch ID to branch name"""
-    return BRANCH_MAPPING.get(branch_id, f"Branch {branch_id}")
-
 # --- PAGE CONTENT ---
+timings.start_run(menu)
+# On a cold start, parse every source at once; changed exports are picked up in the background
+start_watcher()
+try:
+    preload()
+except Exception:
+    # Pages load their dataset again and report what failed
+    pass
+# Dataset each menu reads, for its "as of" line
+MENU_DATASETS = {"Logbook": 'logbook', "Zidisha": 'zidisha', "Advans": 'zidisha'}
+if menu in MENU_DATASETS:
+    data_as_of(MENU_DATASETS[menu])
 if menu == "Logbook":
-    tab_dashboard, tab1, tab2, tab3, tab4 = st.tabs(["Dashboard", "Disbursements", "Collections", "PAR", "Productivity"])
+    view = view_selector(menu, ["Dashboard", "Disbursements", "Collections", "PAR", "Productivity"])
 
-    with tab_dashboard:
+    if view == "Dashboard":
         st.subheader("Logbook Dashboard")
-        # Load data
+        # Load data (shared by every session until the source files change)
         try:
-            df_disb = pd.read_excel("logbook_disbursements.xlsx")
+            logbook = get_dataset('logbook')
         except Exception:
-            df_disb = pd.DataFrame()
-        try:
-            df_coll = pd.read_csv("logbookrepayments.csv")
-        except Exception:
-            df_coll = pd.DataFrame()
+            logbook = None
 
         # Guard: show message if missing
-        if df_disb.empty or df_coll.empty:
+        if logbook is None or logbook['disbursements'].empty or logbook['repayments'].empty:
             st.warning("Missing data: ensure logbook_disbursements.xlsx and logbookrepayments.csv are present.")
         else:
-            # Prepare dates
-            df_disb['Disbursed Date'] = pd.to_datetime(df_disb['Disbursed Date'], format='%d/%m/%Y', errors='coerce')
-            df_coll['repayment_collected_date'] = pd.to_datetime(df_coll['repayment_collected_date'], format='%d/%m/%Y', errors='coerce')
-            # Map branch ids for collections
-            df_coll['Branch Name'] = df_coll['branch_id'].map(get_branch_name)
-            # Add branch name to disbursements
-            df_disb['Branch Name'] = df_disb['Branch'].map(get_branch_name)
-
-            # Use current month and all branches by default (no filters)
-            today = pd.Timestamp.today()
-            sel_month = today.strftime('%Y-%m')
-            all_branches = sorted(set(df_disb['Branch Name'].dropna().unique()) | set(df_coll['Branch Name'].dropna().unique()))
-            # Filter out any branches that contain "nan" or are invalid
-            sel_branches = [b for b in all_branches if pd.notna(b) and 'nan' not in str(b).lower() and str(b).strip() != '']
+            # Dates are parsed and branch ids mapped to 'Branch Name' by the loader;
+            # KPIs, trends and branch totals are slices of the daily aggregate cube
+            df_coll = logbook['repayments']
+            cube = logbook['cube']
 
-            # Month filter ranges
-            month_start = pd.to_datetime(sel_month + '-01')
-            month_end = (month_start + pd.offsets.MonthEnd(0))
-            month_mask_disb = (df_disb['Disbursed Date'] >= month_start) & (df_disb['Disbursed Date'] <= month_end)
-            month_mask_coll = (df_coll['repayment_collected_date'] >= month_start) & (df_coll['repayment_collected_date'] <= month_end)
-            branch_mask_disb = df_disb['Branch Name'].isin(sel_branches)
-            branch_mask_coll = df_coll['Branch Name'].isin(sel_branches)
-
-            disb_mtd = df_disb[month_mask_disb & branch_mask_disb]
-            coll_mtd = df_coll[month_mask_coll & branch_mask_coll]
+            # Selected reporting period and all branches by default (no filters)
+            today, month_start, month_end = period['as_of'], period['start'], period['end']
+            # Filter out any branches that contain "nan" or are invalid
+            sel_branches = valid_branches(cube, 'Logbook')
 
-            # KPIs
-            total_disb_mtd = float(disb_mtd['Disbursed'].sum()) if 'Disbursed' in disb_mtd else 0.0
-            total_coll_mtd = float(coll_mtd['repayment_amount'].sum()) if 'repayment_amount' in coll_mtd else 0.0
-            total_outstanding = float(df_disb[branch_mask_disb]['Outstanding'].sum()) if 'Outstanding' in df_disb else 0.0
-            total_principal = float(df_disb[branch_mask_disb]['Principal'].sum()) if 'Principal' in df_disb else 0.0
-            par_pct = (total_outstanding / total_principal * 100) if total_principal > 0 else 0.0
+            # KPIs (from the precompute store when it is current, otherwise computed live)
+            kpis = precomputed('logbook') or logbook_kpis(
+                cube, today, sel_branches, period=(month_start, month_end),
+                par=par_summary(loan_aging(logbook['par'], today)))
+            total_disb_mtd = kpis['mtd_disbursed']
+            total_coll_mtd = kpis['mtd_collected']
+            par_pct = kpis['par_pct']
             # Targets (Disbursement MTD target sum for selected branches)
-            mtd_target_sum = 0.0
-            for b in sel_branches:
-                t = BRANCH_TARGETS.get(b, {}).get('mtd_target', 0.0)
-                mtd_target_sum += t
-            disb_target_ach = (total_disb_mtd / mtd_target_sum * 100) if mtd_target_sum > 0 else 0.0
+            disb_target_ach = kpis['target_achievement_pct']
 
             col1, col2, col3, col4, col5 = st.columns(5)
             with col1:
@@ -229,7 +382,7 @@ if menu == "Logbook":
             with col3:
                 st.metric("MTD Collections", f"{total_coll_mtd:,.0f}")
             with col4:
-                st.metric("PAR %", f"{par_pct:.1f}%")
+                st.metric("PAR30 %", f"{par_pct:.1f}%")
             with col5:
                 st.metric("MTD Target Achieved", f"{disb_target_ach:.1f}%")
 
@@ -237,8 +390,9 @@ if menu == "Logbook":
 
             # Daily Collections vs Disbursements
             st.subheader("Daily Collections vs Disbursements")
-            daily_disb = disb_mtd.groupby(disb_mtd['Disbursed Date'].dt.date)['Disbursed'].sum().sort_index()
-            daily_coll = coll_mtd.groupby(coll_mtd['repayment_collected_date'].dt.date)['repayment_amount'].sum().sort_index()
+            mtd = dict(unit='Logbook', start=month_start, end=month_end, branches=sel_branches)
+            daily_disb = daily_series(cube, metric='disbursed', **mtd)
+            daily_coll = daily_series(cube, metric='collected', **mtd)
             trend_idx = sorted(set(daily_disb.index) | set(daily_coll.index))
             if len(trend_idx) > 0:
                 plot_df = pd.DataFrame({
@@ -246,86 +400,44 @@ if menu == "Logbook":
                     'Disbursed': pd.Series(daily_disb, index=trend_idx).fillna(0),
                     'Collections': pd.Series(daily_coll, index=trend_idx).fillna(0)
                 })
-                # Use Altair for smooth interpolation
-                import altair as alt
-                chart = alt.Chart(plot_df).transform_fold(
-                    ['Disbursed', 'Collections'],
-                    as_=['Metric', 'Value']
-                ).mark_line(
-                    interpolate='monotone',
-                    strokeWidth=2
-                ).encode(
-                    x=alt.X('Date:T', title='Date'),
-                    y=alt.Y('Value:Q', title='Amount'),
-                    color=alt.Color('Metric:N', scale=alt.Scale(domain=['Disbursed', 'Collections'], range=['#1f77b4', '#ff7f0e']))
-                ).properties(
-                    height=300
-                )
-                st.altair_chart(chart, use_container_width=True)
+                show_chart('daily_trend', plot_df, daily_trend_chart)
             else:
                 st.info("No disbursements/collections for the selected period/branches.")
 
             # Branch scatter: Disbursed vs Collection Rate sized by Outstanding
             st.subheader("Branch Performance: Disbursed vs Collection Rate")
-            disb_by_branch = disb_mtd.groupby('Branch Name')['Disbursed'].sum()
-            coll_by_branch = coll_mtd.groupby('Branch Name')['repayment_amount'].sum()
-            out_by_branch = df_disb.groupby('Branch Name')['Outstanding'].sum() if 'Outstanding' in df_disb else pd.Series(dtype=float)
-            scatter_df = pd.DataFrame({
-                'Disbursed': disb_by_branch,
-                'Collections': coll_by_branch,
-                'Outstanding': out_by_branch
-            }).fillna(0.0)
-            scatter_df = scatter_df.loc[[b for b in sel_branches if b in scatter_df.index]]
-            # Compute collection rate
-            scatter_df['Collection Rate %'] = (scatter_df['Collections'] / scatter_df['Disbursed'].replace({0: np.nan}) * 100).fillna(0)
+            scatter_df = branch_scatter(cube, 'Logbook', 'disbursed', 'collected', month_start, month_end, branches=sel_branches)
 
             if not scatter_df.empty:
-                fig, ax = plt.subplots(figsize=(8, 5))
-                # Safely scale bubble sizes; handle zero/NaN max outstanding
-                max_out = scatter_df['Outstanding'].max()
-                try:
-                    max_out = float(max_out)
-                except Exception:
-                    max_out = 0.0
-                if max_out and max_out > 0:
-                    sizes = (scatter_df['Outstanding'] / max_out * 800).fillna(200)
-                else:
-                    sizes = pd.Series(200, index=scatter_df.index)
-                ax.scatter(scatter_df['Disbursed'], scatter_df['Collection Rate %'], s=sizes, alpha=0.6, c='#1f77b4')
-                for name, row in scatter_df.iterrows():
-                    ax.text(row['Disbursed'], row['Collection Rate %'], name, fontsize=8, ha='left', va='bottom')
-                ax.set_xlabel('MTD Disbursed')
-                ax.set_ylabel('Collection Rate %')
-                ax.grid(True, alpha=0.3)
-                st.pyplot(fig)
+                show_chart('branch_scatter', scatter_df, branch_scatter_figure)
             else:
                 st.info("No data available for selected filters.")
 
             st.markdown("---")
 
-            # Collector leaderboard
+            # Collector leaderboard, from the drill-down index built at load time
             st.subheader("Top Collectors (MTD)")
-            if 'collector_id' in coll_mtd:
-                top_collectors = coll_mtd.groupby('collector_id')['repayment_amount'].sum().sort_values(ascending=False).head(10).reset_index()
-                top_collectors.columns = ['Collector ID', 'Total Collected']
-                st.dataframe(top_collectors, use_container_width=True)
-            else:
-                st.info("Collector information not available in collections data.")
+            collector_index = logbook['collector_index']
+            top_collectors = leaderboard(collector_index, 'collector_id', month_start, month_end, branches=sel_branches)
+            top_collectors.columns = ['Collector ID', 'Total Collected']
+            st.dataframe(top_collectors, use_container_width=True)
+
+            st.subheader("Drill Down: Branch → Collector → Repayments")
+            drill_down("logbook_collections", df_coll, collector_index, month_start, month_end, logbook['signature'],
+                       branches=sel_branches)
 
-    with tab1:
+    elif view == "Disbursements":
         st.subheader("Logbook Disbursements")
         
         # Load the disbursements data automatically
         try:
-            df = pd.read_excel("logbook_disbursements.xlsx")
-            
-            # Calculate disbursements per branch
-            branch_disbursements = df.groupby('Branch')['Disbursed'].agg(['sum', 'count', 'mean']).round(2)
-            branch_disbursements.columns = ['Total Disbursed', 'Number of Loans', 'Average Disbursement']
+            logbook = get_dataset('logbook')
+            cube = logbook['cube']
+            month_start, month_end = period['start'], period['end']
             
-            # Add branch names and replace index
-            branch_disbursements['Branch Name'] = branch_disbursements.index.map(get_branch_name)
-            branch_disbursements = branch_disbursements.set_index('Branch Name').sort_values('Total Disbursed', ascending=False)
+            # Calculate disbursements per branch for the reporting period
+            branch_disbursements = branch_table(cube, 'Logbook', 'disbursed', ['Total Disbursed', 'Number of Loans', 'Average Disbursement'],
+                                                start=month_start, end=month_end)
             
             # Display summary metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -341,87 +453,26 @@ if menu == "Logbook":
             st.markdown("---")
             
             # Display disbursements per branch
-            st.subheader("Disbursements by Branch")
+            st.subheader(f"Disbursements by Branch - {period['label']}")
             st.dataframe(branch_disbursements, use_container_width=True)
             
             # Create clustered bar chart with targets
             st.subheader("Branch Disbursement vs Targets Comparison")
             
-            # Prepare data for clustered chart
-            chart_data = branch_disbursements[['Total Disbursed']].copy()
-            
-            # Add target data for branches that have targets
-            chart_data['Target'] = chart_data.index.map(lambda x: BRANCH_TARGETS.get(x, {}).get('target', 0))
-            chart_data['MTD Target'] = chart_data.index.map(lambda x: BRANCH_TARGETS.get(x, {}).get('mtd_target', 0))
+            # Targets of the reporting month joined with the branch totals
+            achievement = target_achievement(cube, 'Logbook', 'disbursed', month_start, month_end, period['as_of'])
+            achievement = achievement.rename(columns={
+                'target': 'Target', 'mtd_target': 'MTD Target', 'achievement_pct': 'Target Achievement %',
+                'mtd_achievement_pct': 'MTD Achievement %', 'run_rate': 'Run-rate Projection',
+                'projected_achievement_pct': 'Projected Achievement %'})
             
             # Only show branches that have target data
+            chart_data = branch_disbursements[['Total Disbursed']].join(achievement[['Target', 'MTD Target']], how='inner')
             chart_data = chart_data[chart_data['Target'] > 0]
             
             if not chart_data.empty:
-                # Create proper clustered bar chart using matplotlib
-
-                
-                # Prepare data for clustered chart
-                branches = chart_data.index.tolist()
-                actual = chart_data['Total Disbursed'].values
-                target = chart_data['Target'].values
-                mtd_target = chart_data['MTD Target'].values
-                
-                # Create the clustered bar chart
-                fig, ax = plt.subplots(figsize=(12, 6))
-                
-                # Remove frame/border
-                ax.spines['top'].set_visible(False)
-                ax.spines['right'].set_visible(False)
-                ax.spines['bottom'].set_visible(False)
-                ax.spines['left'].set_visible(False)
-                
-                # Set the width of bars and positions
-                bar_width = 0.25
-                x = np.arange(len(branches))
-                
-                # Create bars in order: Monthly Target, MTD Target, Actual Disbursement
-                bars1 = ax.bar(x - bar_width, target, bar_width, label='Monthly Target', color='#ff7f0e', alpha=0.8)
-                bars2 = ax.bar(x, mtd_target, bar_width, label='MTD Target', color='#2ca02c', alpha=0.8)
-                bars3 = ax.bar(x + bar_width, actual, bar_width, label='Actual Disbursed', color='#1f77b4', alpha=0.8)
-                
-                # Customize the chart
-                ax.set_xlabel('Branches')
-                ax.set_ylabel('Amount (KSh)')
-                ax.set_title('Branch Disbursement vs Targets Comparison')
-                ax.set_xticks(x)
-                ax.set_xticklabels(branches, rotation=45, ha='right')
-                ax.legend()
-                
-                # Format y-axis to show values in millions
-                ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
-                
-                # Add value labels on bars
-                def add_value_labels(bars):
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax.text(bar.get_x() + bar.get_width()/2., height,
-                               f'{height/1e6:.1f}M',
-                               ha='center', va='bottom', fontsize=8)
-                
-                add_value_labels(bars1)
-                add_value_labels(bars2)
-                add_value_labels(bars3)
-                
-                # Add MTD achievement percentage bars on the same plot
-                # Calculate MTD achievement percentages
-                mtd_achievement = (actual / mtd_target * 100).round(1)
-                
-                # Add percentage text above each actual bar (bars3 is now the actual disbursement)
-                for i, (bar, achievement) in enumerate(zip(bars3, mtd_achievement)):
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width()/2., height + 500000,  # Half a centimeter above (500,000 units)
-                           f'{achievement:.1f}%',
-                           ha='center', va='bottom', fontsize=9, fontweight='bold', color='#1f77b4')
-                
-                # Adjust layout and display
-                plt.tight_layout()
-                st.pyplot(fig)
+                # Monthly target, MTD target and actual per branch, with MTD achievement %
+                show_chart('disbursement_targets', chart_data, disbursement_targets_figure)
                 
                 # Add a comparison table for better readability
                 st.subheader("Detailed Comparison Table")
@@ -430,14 +481,16 @@ if menu == "Logbook":
                 comparison_table['MTD Gap'] = (comparison_table['MTD Target'] - comparison_table['Total Disbursed']).round(0)
                 st.dataframe(comparison_table, use_container_width=True)
                 
-                # Add target performance metrics
+                # Add target performance metrics, with the month's projection at the current pace
                 st.subheader("Target Performance")
-                performance_data = chart_data.copy()
-                performance_data['Target Achievement %'] = (performance_data['Total Disbursed'] / performance_data['Target'] * 100).round(1)
-                performance_data['MTD Achievement %'] = (performance_data['Total Disbursed'] / performance_data['MTD Target'] * 100).round(1)
+                performance_data = chart_data.join(achievement[[
+                    'Target Achievement %', 'MTD Achievement %', 'Run-rate Projection', 'Projected Achievement %']])
+                performance_data[['Target Achievement %', 'MTD Achievement %', 'Projected Achievement %']] = \
+                    performance_data[['Target Achievement %', 'MTD Achievement %', 'Projected Achievement %']].round(1)
+                performance_data['Run-rate Projection'] = performance_data['Run-rate Projection'].round(0)
                 
                 # Display performance table
-                st.dataframe(performance_data[['Total Disbursed', 'Target', 'MTD Target', 'Target Achievement %', 'MTD Achievement %']], use_container_width=True)
+                st.dataframe(performance_data, use_container_width=True)
             else:
                 st.info("No target data available for current branches.")
                 st.bar_chart(branch_disbursements['Total Disbursed'])
@@ -446,16 +499,11 @@ if menu == "Logbook":
             st.markdown("---")
             st.subheader("📈 Daily Disbursement Trends")
             
-            # Convert date column to datetime
-            df['Disbursed Date'] = pd.to_datetime(df['Disbursed Date'], format='%d/%m/%Y')
-            
-            # Daily trend (last 30 days)
-            daily_trend = df.groupby(df['Disbursed Date'].dt.date)['Disbursed'].sum().sort_index()
-            st.subheader("Daily Disbursement Trend (Last 30 Days)")
+            # Daily trend for the reporting period
+            daily_trend = daily_series(cube, unit='Logbook', metric='disbursed', start=month_start, end=month_end)
+            st.subheader(f"Daily Disbursement Trend - {period['label']}")
             if len(daily_trend) > 0:
-                # Get last 30 days or all available days
-                recent_days = daily_trend.tail(30)
-                st.line_chart(recent_days)
+                st.line_chart(daily_trend)
                 
                 # Daily metrics
                 col1, col2, col3 = st.columns(3)
@@ -465,26 +513,27 @@ if menu == "Logbook":
                     st.metric("Peak Day", f"{daily_trend.max():,.0f}")
                 with col3:
                     st.metric("Active Days", len(daily_trend[daily_trend > 0]))
+                
+                # Rolling windows, MTD and deltas from the series kept with the dataset
+                rolling_trend(logbook['series'][('Logbook', 'disbursed')], period, target=achievement['Target'].sum())
             
         except FileNotFoundError:
             st.error("logbook_disbursements.xlsx file not found in the current directory.")
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
 
-    with tab2:
+    elif view == "Collections":
         st.subheader("Logbook Collections")
         
         # Load the collections data automatically
         try:
-            df_collections = pd.read_csv("logbookrepayments.csv")
-            
-            # Calculate collections per branch
-            branch_collections = df_collections.groupby('branch_id')['repayment_amount'].agg(['sum', 'count', 'mean']).round(2)
-            branch_collections.columns = ['Total Collections', 'Number of Repayments', 'Average Repayment']
+            logbook = get_dataset('logbook')
+            cube = logbook['cube']
+            month_start, month_end = period['start'], period['end']
             
-            # Add branch names and replace index
-            branch_collections['Branch Name'] = branch_collections.index.map(get_branch_name)
-            branch_collections = branch_collections.set_index('Branch Name').sort_values('Total Collections', ascending=False)
+            # Calculate collections per branch for the reporting period
+            branch_collections = branch_table(cube, 'Logbook', 'collected', ['Total Collections', 'Number of Repayments', 'Average Repayment'],
+                                              start=month_start, end=month_end)
             
             # Display summary metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -500,78 +549,33 @@ if menu == "Logbook":
             st.markdown("---")
             
             # Display collections per branch
-            st.subheader("Collections by Branch")
+            st.subheader(f"Collections by Branch - {period['label']}")
             st.dataframe(branch_collections, use_container_width=True)
             
             # Create clustered bar chart with targets
             st.subheader("Branch Collection vs Targets Comparison")
             
-            # Prepare data for clustered chart
-            chart_data = branch_collections[['Total Collections']].copy()
-            
-            # Add target data for branches that have targets
-            chart_data['Collection Target'] = chart_data.index.map(lambda x: LOGBOOK_COLLECTION_TARGETS.get(x, 0))
+            # Targets of the reporting month joined with the branch totals
+            achievement = target_achievement(cube, 'Logbook', 'collected', month_start, month_end, period['as_of'])
             
             # Only show branches that have target data
+            chart_data = branch_collections[['Total Collections']].join(
+                achievement['target'].rename('Collection Target'), how='inner')
             chart_data = chart_data[chart_data['Collection Target'] > 0]
             
             if not chart_data.empty:
                 # Create proper clustered bar chart using matplotlib
                 st.subheader("Clustered Bar Chart - Actual vs Targets")
                 
-                # Prepare data for clustered chart
-                branches = chart_data.index.tolist()
-                actual = chart_data['Total Collections'].values
-                target = chart_data['Collection Target'].values
-                
-                # Create the clustered bar chart
-                fig, ax = plt.subplots(figsize=(12, 6))
-                
-                # Set the width of bars and positions
-                bar_width = 0.35
-                x = np.arange(len(branches))
-                
-                # Create bars
-                bars1 = ax.bar(x - bar_width/2, actual, bar_width, label='Actual Collections', color='#1f77b4', alpha=0.8)
-                bars2 = ax.bar(x + bar_width/2, target, bar_width, label='Collection Target', color='#ff7f0e', alpha=0.8)
-                
-                # Remove frame/border
-                ax.spines['top'].set_visible(False)
-                ax.spines['right'].set_visible(False)
-                ax.spines['bottom'].set_visible(False)
-                ax.spines['left'].set_visible(False)
-                
-                # Customize the chart
-                ax.set_xlabel('Branches')
-                ax.set_ylabel('Amount')
-                ax.set_title('Logbook Collections vs Targets Comparison')
-                ax.set_xticks(x)
-                ax.set_xticklabels(branches, rotation=45, ha='right')
-                ax.legend()
-                
-                # Format y-axis to show values in millions
-                ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x/1e6:.1f}M'))
-                
-                # Add value labels on bars
-                def add_value_labels(bars):
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax.text(bar.get_x() + bar.get_width()/2., height,
-                               f'{height/1e6:.1f}M',
-                               ha='center', va='bottom', fontsize=8)
-                
-                add_value_labels(bars1)
-                add_value_labels(bars2)
-                
-                # Adjust layout and display
-                plt.tight_layout()
-                st.pyplot(fig)
+                show_chart('collection_targets', chart_data, collection_targets_figure)
                 
                 # Add a comparison table for better readability
                 st.subheader("Detailed Comparison Table")
                 comparison_table = chart_data.copy()
                 comparison_table['Target Gap'] = (comparison_table['Collection Target'] - comparison_table['Total Collections']).round(0)
-                comparison_table['Achievement %'] = (comparison_table['Total Collections'] / comparison_table['Collection Target'] * 100).round(1)
+                comparison_table['Achievement %'] = achievement['achievement_pct'].round(1)
+                comparison_table['Run-rate Projection'] = achievement['run_rate'].round(0)
+                comparison_table['Projected Achievement %'] = achievement['projected_achievement_pct'].round(1)
                 st.dataframe(comparison_table, use_container_width=True)
             else:
                 st.info("No collection target data available for current branches.")
@@ -581,16 +585,11 @@ if menu == "Logbook":
             st.markdown("---")
             st.subheader("📈 Daily Collection Trends")
             
-            # Convert date column to datetime
-            df_collections['repayment_collected_date'] = pd.to_datetime(df_collections['repayment_collected_date'], format='%d/%m/%Y')
-            
-            # Daily trend (last 30 days)
-            daily_collections = df_collections.groupby(df_collections['repayment_collected_date'].dt.date)['repayment_amount'].sum().sort_index()
-            st.subheader("Daily Collection Trend (Last 30 Days)")
+            # Daily trend for the reporting period
+            daily_collections = daily_series(cube, unit='Logbook', metric='collected', start=month_start, end=month_end)
+            st.subheader(f"Daily Collection Trend - {period['label']}")
             if len(daily_collections) > 0:
-                # Get last 30 days or all available days
-                recent_days = daily_collections.tail(30)
-                st.line_chart(recent_days)
+                st.line_chart(daily_collections)
                 
                 # Daily metrics
                 col1, col2, col3 = st.columns(3)
@@ -600,69 +599,93 @@ if menu == "Logbook":
                     st.metric("Peak Day", f"{daily_collections.max():,.0f}")
                 with col3:
                     st.metric("Active Days", len(daily_collections[daily_collections > 0]))
+                
+                # Rolling windows, MTD and deltas from the series kept with the dataset
+                rolling_trend(logbook['series'][('Logbook', 'collected')], period, target=achievement['target'].sum())
             
         except FileNotFoundError:
             st.error("logbookrepayments.csv file not found in the current directory.")
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
 
-    with tab3:
+    elif view == "PAR":
         st.subheader("Portfolio at Risk (PAR)")
-        file = st.file_uploader("Upload PAR Excel File", type=["xlsx"])
-        if file:
-            df = load_excel_data(file)
-            st.dataframe(df)
+        try:
+            logbook = get_dataset('logbook')
+        except Exception:
+            logbook = None
 
-    with tab4:
+        if logbook is None or logbook['disbursements'].empty:
+            st.warning("Missing data: ensure logbook_disbursements.xlsx and logbookrepayments.csv are present.")
+        else:
+            # Days past due per loan from its instalment schedule and the repayments collected by the reporting date
+            as_of = period['as_of']
+            aging = loan_aging(logbook['par'], as_of)
+            par_by_branch = par_summary(aging, 'branch')
+            totals = par_totals(par_by_branch)
+            par_labels = {'loans': 'Loans', 'portfolio': 'Outstanding Principal',
+                          'par1': 'PAR1', 'par30': 'PAR30', 'par60': 'PAR60', 'par90': 'PAR90',
+                          'par1_pct': 'PAR1 %', 'par30_pct': 'PAR30 %', 'par60_pct': 'PAR60 %', 'par90_pct': 'PAR90 %'}
+
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric("Outstanding Principal", f"{totals['portfolio']:,.0f}")
+            for col, name in zip((col2, col3, col4, col5), ('par1', 'par30', 'par60', 'par90')):
+                with col:
+                    st.metric(par_labels[f'{name}_pct'], f"{totals[f'{name}_pct']:.1f}%", f"{totals[name]:,.0f}",
+                              delta_color="off")
+            st.caption(f"As of {as_of:%d %b %Y}: {int(totals['loans']):,} loans with principal outstanding; "
+                       f"{logbook['par']['unmatched']:,} repayments match no loan in the disbursements export.")
+
+            st.markdown("---")
+            st.subheader("PAR by Branch")
+            st.dataframe(par_by_branch.rename(columns=par_labels).round(1), use_container_width=True)
+
+            st.subheader("Outstanding Principal by Days Past Due")
+            st.dataframe(aging_buckets(aging, 'branch').round(0), use_container_width=True)
+
+            st.subheader("PAR by Loan Officer")
+            par_by_officer = par_summary(aging, 'officer').sort_values('par30', ascending=False)
+            st.dataframe(par_by_officer.rename(columns=par_labels).round(1), use_container_width=True)
+
+    elif view == "Productivity":
         st.subheader("Productivity Report")
         file = st.file_uploader("Upload Productivity Excel File", type=["xlsx"])
         if file:
             df = load_excel_data(file)
-            st.dataframe(df)
+            paged_table("logbook_productivity", df)
 
 elif menu == "Zidisha":
-    tab_dashboard, tab1, tab2, tab3 = st.tabs(["Dashboard", "Disbursements", "Collections", "Productivity"])
+    view = view_selector(menu, ["Dashboard", "Disbursements", "Collections", "Productivity"])
 
-    with tab_dashboard:
+    if view == "Dashboard":
         st.subheader("Zidisha Dashboard")
         
-        # Load data
+        # Load data (shared by every session until the source file changes)
         try:
-            df_zidisha = pd.read_excel("zidisha.xlsx")
+            zidisha = get_dataset('zidisha')
         except Exception:
-            df_zidisha = pd.DataFrame()
+            zidisha = None
 
         # Guard: show message if missing
-        if df_zidisha.empty:
+        if zidisha is None or zidisha['loans'].empty:
             st.warning("Missing data: ensure zidisha.xlsx is present.")
         else:
-            # Prepare dates
-            df_zidisha['Disbursed On Date'] = pd.to_datetime(df_zidisha['Disbursed On Date'], errors='coerce')
-            df_zidisha['Expected Matured On Date'] = pd.to_datetime(df_zidisha['Expected Matured On Date'], errors='coerce')
-            
-            # Use current month and exclude Advans Branch by default
-            today = pd.Timestamp.today()
-            sel_month = today.strftime('%Y-%m')
-            month_start = pd.to_datetime(sel_month + '-01')
-            month_end = (month_start + pd.offsets.MonthEnd(0))
+            # Selected reporting period, excluding Advans Branch by default
+            today, month_start, month_end = period['as_of'], period['start'], period['end']
             
-            # Filter for current month, excluding Advans Branch
-            month_mask_disb = (df_zidisha['Disbursed On Date'] >= month_start) & (df_zidisha['Disbursed On Date'] <= month_end)
-            month_mask_coll = (df_zidisha['Expected Matured On Date'] >= month_start) & (df_zidisha['Expected Matured On Date'] <= month_end)
-            advans_mask = df_zidisha['Branch Name'] != 'Advans Branch'
-            
-            disb_mtd = df_zidisha[month_mask_disb & advans_mask]
-            coll_mtd = df_zidisha[month_mask_coll & advans_mask]
+            # Filter for the reporting period, excluding Advans Branch (its own unit in the cube)
+            cube = zidisha['cube']
 
             # KPIs
-            total_disb_mtd = float(disb_mtd['Principal Amount'].sum()) if 'Principal Amount' in disb_mtd else 0.0
-            total_coll_mtd = float(coll_mtd['Total Repayment Derived'].sum()) if 'Total Repayment Derived' in coll_mtd else 0.0
-            total_outstanding = float(df_zidisha[advans_mask]['Total Outstanding Derived'].sum()) if 'Total Outstanding Derived' in df_zidisha else 0.0
-            total_expected = float(df_zidisha[advans_mask]['Total Expected Repayment Derived'].sum()) if 'Total Expected Repayment Derived' in df_zidisha else 0.0
-            repayment_rate = (total_coll_mtd / total_expected * 100) if total_expected > 0 else 0.0
+            kpis = loan_book_kpis(cube, 'Zidisha', today, period=(month_start, month_end))
+            total_disb_mtd = kpis['mtd_disbursed']
+            total_coll_mtd = kpis['mtd_collections']
+            total_outstanding = kpis['outstanding']
+            repayment_rate = kpis['repayment_rate']
 
             # Count unique branches (excluding Advans)
-            unique_branches = df_zidisha[df_zidisha['Branch Name'] != 'Advans Branch']['Branch Name'].nunique()
+            unique_branches = kpis['branches']
             
             col1, col2, col3, col4, col5 = st.columns(5)
             with col1:
@@ -678,8 +701,9 @@ elif menu == "Zidisha":
 
             # Daily Collections vs Disbursements
             st.subheader("Daily Collections vs Disbursements")
-            daily_disb = disb_mtd.groupby(disb_mtd['Disbursed On Date'].dt.date)['Principal Amount'].sum().sort_index()
-            daily_coll = coll_mtd.groupby(coll_mtd['Expected Matured On Date'].dt.date)['Total Repayment Derived'].sum().sort_index()
+            mtd = dict(unit='Zidisha', start=month_start, end=month_end)
+            daily_disb = daily_series(cube, metric='disbursed', **mtd)
+            daily_coll = daily_series(cube, metric='collections', **mtd)
             trend_idx = sorted(set(daily_disb.index) | set(daily_coll.index))
             if len(trend_idx) > 0:
                 plot_df = pd.DataFrame({
@@ -687,91 +711,48 @@ elif menu == "Zidisha":
                     'Disbursed': pd.Series(daily_disb, index=trend_idx).fillna(0),
                     'Collections': pd.Series(daily_coll, index=trend_idx).fillna(0)
                 })
-                # Use Altair for smooth interpolation
-                import altair as alt
-                chart = alt.Chart(plot_df).transform_fold(
-                    ['Disbursed', 'Collections'],
-                    as_=['Metric', 'Value']
-                ).mark_line(
-                    interpolate='monotone',
-                    strokeWidth=2
-                ).encode(
-                    x=alt.X('Date:T', title='Date'),
-                    y=alt.Y('Value:Q', title='Amount'),
-                    color=alt.Color('Metric:N', scale=alt.Scale(domain=['Disbursed', 'Collections'], range=['#1f77b4', '#ff7f0e']))
-                ).properties(
-                    height=300
-                )
-                st.altair_chart(chart, use_container_width=True)
+                show_chart('daily_trend', plot_df, daily_trend_chart)
             else:
                 st.info("No disbursements/collections for the selected period.")
 
             # Branch scatter: Disbursed vs Collection Rate sized by Outstanding
             st.subheader("Branch Performance: Disbursed vs Collection Rate")
-            disb_by_branch = disb_mtd.groupby('Branch Name')['Principal Amount'].sum()
-            coll_by_branch = coll_mtd.groupby('Branch Name')['Total Repayment Derived'].sum()
-            out_by_branch = df_zidisha.groupby('Branch Name')['Total Outstanding Derived'].sum() if 'Total Outstanding Derived' in df_zidisha else pd.Series(dtype=float)
-            scatter_df = pd.DataFrame({
-                'Disbursed': disb_by_branch,
-                'Collections': coll_by_branch,
-                'Outstanding': out_by_branch
-            }).fillna(0.0)
-            # Compute collection rate
-            scatter_df['Collection Rate %'] = (scatter_df['Collections'] / scatter_df['Disbursed'].replace({0: np.nan}) * 100).fillna(0)
+            scatter_df = branch_scatter(cube, 'Zidisha', 'disbursed', 'collections', month_start, month_end,
+                                        outstanding_unit=['Zidisha', 'Advans'])
 
             if not scatter_df.empty:
-                fig, ax = plt.subplots(figsize=(8, 5))
-                # Safely scale bubble sizes; handle zero/NaN max outstanding
-                max_out = scatter_df['Outstanding'].max()
-                try:
-                    max_out = float(max_out)
-                except Exception:
-                    max_out = 0.0
-                if max_out and max_out > 0:
-                    sizes = (scatter_df['Outstanding'] / max_out * 800).fillna(200)
-                else:
-                    sizes = pd.Series(200, index=scatter_df.index)
-                ax.scatter(scatter_df['Disbursed'], scatter_df['Collection Rate %'], s=sizes, alpha=0.6, c='#1f77b4')
-                for name, row in scatter_df.iterrows():
-                    ax.text(row['Disbursed'], row['Collection Rate %'], name, fontsize=8, ha='left', va='bottom')
-                ax.set_xlabel('MTD Disbursed')
-                ax.set_ylabel('Collection Rate %')
-                ax.grid(True, alpha=0.3)
-                st.pyplot(fig)
+                show_chart('branch_scatter', scatter_df, branch_scatter_figure)
             else:
                 st.info("No data available for selected filters.")
 
-            # Loan Officer leaderboard
+            # Loan Officer leaderboard, from the drill-down index built at load time
             st.subheader("Top Loan Officers (MTD)")
-            if 'Loan Officer Name' in disb_mtd:
-                top_officers = disb_mtd.groupby('Loan Officer Name')['Principal Amount'].sum().sort_values(ascending=False).head(10).reset_index()
-                top_officers.columns = ['Loan Officer', 'Total Disbursed']
-                st.dataframe(top_officers, use_container_width=True)
-            else:
-                st.info("Loan Officer information not available in disbursements data.")
+            officer_index = zidisha['officer_index']
+            top_officers = leaderboard(officer_index, 'Loan Officer Name', month_start, month_end,
+                                       except_branches=[ADVANS_BRANCH])
+            top_officers.columns = ['Loan Officer', 'Total Disbursed']
+            st.dataframe(top_officers, use_container_width=True)
+
+            st.subheader("Drill Down: Branch → Loan Officer → Loans")
+            drill_down("zidisha_loans", zidisha['loans'], officer_index, month_start, month_end, zidisha['signature'],
+                       except_branches=[ADVANS_BRANCH])
 
-    with tab1:
+    elif view == "Disbursements":
         st.subheader("Zidisha Disbursements")
         
         # Load the Zidisha disbursements data automatically
         try:
-            from datetime import datetime
-            df_zidisha = pd.read_excel("zidisha.xlsx")
+            zidisha = get_dataset('zidisha')
+            cube = zidisha['cube']
             
-            # Filter for current month data, excluding Advans Branch
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            current_month_data = df_zidisha[
-                (df_zidisha['Disbursed On Date'].dt.month == current_month) & 
-                (df_zidisha['Disbursed On Date'].dt.year == current_year) &
-                (df_zidisha['Branch Name'] != 'Advans Branch')
-            ]
+            # Filter for the reporting period, excluding Advans Branch
+            month_start, month_end = period['start'], period['end']
+            month_filter = dict(unit='Zidisha', metric='disbursed', start=month_start, end=month_end)
             
-            if not current_month_data.empty:
-                # Calculate disbursements per branch for current month
-                branch_disbursements = current_month_data.groupby('Branch Name')['Principal Amount'].agg(['sum', 'count', 'mean']).round(2)
-                branch_disbursements.columns = ['Total Disbursed', 'Number of Loans', 'Average Disbursement']
-                branch_disbursements = branch_disbursements.sort_values('Total Disbursed', ascending=False)
+            if not cube_slice(cube, **month_filter).empty:
+                # Calculate disbursements per branch for the reporting period
+                branch_disbursements = branch_table(cube, 'Zidisha', 'disbursed', ['Total Disbursed', 'Number of Loans', 'Average Disbursement'],
+                                                    start=month_start, end=month_end)
                 
                 # Display summary metrics
                 col1, col2, col3, col4 = st.columns(4)
@@ -787,20 +768,20 @@ elif menu == "Zidisha":
                 st.markdown("---")
                 
                 # Display disbursements per branch
-                st.subheader(f"Disbursements by Branch - {datetime.now().strftime('%B %Y')}")
+                st.subheader(f"Disbursements by Branch - {period['label']}")
                 st.dataframe(branch_disbursements, use_container_width=True)
                 
                 # Create a bar chart
                 st.subheader("Branch Disbursement Comparison")
                 st.bar_chart(branch_disbursements['Total Disbursed'])
                 
-                # Daily Trends for current month
+                # Daily Trends for the reporting period
                 st.markdown("---")
-                st.subheader("📈 Daily Disbursement Trends (Current Month)")
+                st.subheader("📈 Daily Disbursement Trends (Reporting Period)")
                 
-                # Daily trend for current month
-                daily_trend = current_month_data.groupby(current_month_data['Disbursed On Date'].dt.date)['Principal Amount'].sum().sort_index()
-                st.subheader(f"Daily Disbursement Trend - {datetime.now().strftime('%B %Y')}")
+                # Daily trend for the reporting period
+                daily_trend = daily_series(cube, **month_filter)
+                st.subheader(f"Daily Disbursement Trend - {period['label']}")
                 if len(daily_trend) > 0:
                     st.line_chart(daily_trend)
                     
@@ -812,78 +793,52 @@ elif menu == "Zidisha":
                         st.metric("Peak Day", f"{daily_trend.max():,.0f}")
                     with col3:
                         st.metric("Active Days", len(daily_trend[daily_trend > 0]))
+                    
+                    # Rolling windows, MTD and deltas from the series kept with the dataset
+                    rolling_trend(zidisha['series'][('Zidisha', 'disbursed')], period)
             else:
-                st.info(f"No disbursement data available for {datetime.now().strftime('%B %Y')}")
+                st.info(f"No disbursement data available for {period['label']}")
                 
         except FileNotFoundError:
             st.error("zidisha.xlsx file not found in the current directory.")
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
 
-    with tab2:
+    elif view == "Collections":
         st.subheader("Zidisha Collections")
         
         # Load the Zidisha collections data automatically
         try:
-            from datetime import datetime
-            df_zidisha = pd.read_excel("zidisha.xlsx")
+            zidisha = get_dataset('zidisha')
+            cube = zidisha['cube']
             
-            # Filter for current month data using Expected Matured On Date, excluding Advans Branch
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            current_month_data = df_zidisha[
-                (df_zidisha['Expected Matured On Date'].dt.month == current_month) & 
-                (df_zidisha['Expected Matured On Date'].dt.year == current_year) &
-                (df_zidisha['Branch Name'] != 'Advans Branch')
-            ]
+            # Filter for the reporting period using Expected Matured On Date, excluding Advans Branch
+            month_start, month_end = period['start'], period['end']
+            month_filter = dict(unit='Zidisha', metric='collections', start=month_start, end=month_end)
             
-            if not current_month_data.empty:
-                # Calculate collections per branch for current month
-                branch_collections = current_month_data.groupby('Branch Name')['Total Repayment Derived'].agg(['sum', 'count', 'mean']).round(2)
-                branch_collections.columns = ['Total Collections', 'Number of Loans', 'Average Collection']
-                branch_collections = branch_collections.sort_values('Total Collections', ascending=False)
-                
-                # Calculate expected collections for October
-                october_expected = df_zidisha[
-                    (df_zidisha['Expected Matured On Date'].dt.month == 10) & 
-                    (df_zidisha['Expected Matured On Date'].dt.year == 2025) &
-                    (df_zidisha['Branch Name'] != 'Advans Branch')
-                ]
-                total_expected = october_expected['Total Expected Repayment Derived'].sum() if not october_expected.empty else 0
-                
+            if not cube_slice(cube, **month_filter).empty:
+                # Calculate collections per branch for the reporting period
+                branch_collections = branch_table(cube, 'Zidisha', 'collections', ['Total Collections', 'Number of Loans', 'Average Collection'],
+                                                  start=month_start, end=month_end)
                 
                 # Current Period KPIs (Same Period Last Month)
                 st.subheader("📊 Current Period KPIs (Same Period Last Month)")
                 
-                # Calculate current period and same period last month
-                current_date = datetime.now()
-                current_month = current_date.month
-                current_year = current_date.year
-                current_day = current_date.day
-                
-                # Same period last month
-                if current_month == 1:
-                    last_month = 12
-                    last_year = current_year - 1
-                else:
-                    last_month = current_month - 1
-                    last_year = current_year
-                
-                # Filter for same period last month (disbursed loans)
-                same_period_last_month = df_zidisha[
-                    (df_zidisha['Disbursed On Date'].dt.month == last_month) & 
-                    (df_zidisha['Disbursed On Date'].dt.year == last_year) &
-                    (df_zidisha['Disbursed On Date'].dt.day <= current_day) &
-                    (df_zidisha['Branch Name'] != 'Advans Branch')
-                ]
-                
-                if not same_period_last_month.empty:
-                    # Calculate KPIs for same period last month
-                    total_loans_disbursed = same_period_last_month['Principal Amount'].sum()
-                    total_amount_repaid = same_period_last_month['Total Repayment Derived'].sum()
-                    total_outstanding = same_period_last_month['Total Outstanding Derived'].sum()
-                    total_expected_repayment = same_period_last_month['Total Expected Repayment Derived'].sum()
-                    repayment_rate = (total_amount_repaid / total_expected_repayment * 100) if total_expected_repayment > 0 else 0
+                # Same period last month and previous full month, by disbursement date
+                # (from the precompute store when it is current, otherwise computed live)
+                today = period['as_of']
+                kpis = precomputed('zidisha') or period_comparison_kpis(cube, 'Zidisha', today)
+                same_period_last_month = kpis['same_period_last_month']
+                previous_month_full = kpis['previous_month']
+                last_month_start = pd.Timestamp(previous_month_full['start'])
+                
+                if same_period_last_month['loans'] > 0:
+                    # KPIs for same period last month
+                    total_loans_disbursed = same_period_last_month['disbursed']
+                    total_amount_repaid = same_period_last_month['repaid']
+                    total_outstanding = same_period_last_month['outstanding']
+                    total_expected_repayment = same_period_last_month['expected']
+                    repayment_rate = same_period_last_month['repayment_rate']
                     
                     # Display Row 1 KPIs
                     col1, col2, col3, col4, col5 = st.columns(5)
@@ -903,51 +858,44 @@ elif menu == "Zidisha":
                 # Previous Month Full Month Snapshot
                 st.subheader("📈 Previous Month Full Month Snapshot")
                 
-                # Filter for full previous month (disbursed loans)
-                previous_month_full = df_zidisha[
-                    (df_zidisha['Disbursed On Date'].dt.month == last_month) & 
-                    (df_zidisha['Disbursed On Date'].dt.year == last_year) &
-                    (df_zidisha['Branch Name'] != 'Advans Branch')
-                ]
-                
-                if not previous_month_full.empty:
-                    # Calculate KPIs for full previous month
-                    pm_total_disbursed = previous_month_full['Principal Amount'].sum()
-                    pm_total_repaid = previous_month_full['Total Repayment Derived'].sum()
-                    pm_total_outstanding = previous_month_full['Total Outstanding Derived'].sum()
-                    pm_total_expected = previous_month_full['Total Expected Repayment Derived'].sum()
-                    pm_repayment_rate = (pm_total_repaid / pm_total_expected * 100) if pm_total_expected > 0 else 0
+                if previous_month_full['loans'] > 0:
+                    # KPIs for full previous month
+                    pm_total_disbursed = previous_month_full['disbursed']
+                    pm_total_repaid = previous_month_full['repaid']
+                    pm_total_outstanding = previous_month_full['outstanding']
+                    pm_total_expected = previous_month_full['expected']
+                    pm_repayment_rate = previous_month_full['repayment_rate']
                     
                     # Display Row 2 KPIs
                     col1, col2, col3, col4, col5 = st.columns(5)
                     with col1:
-                        st.metric(f"{datetime(last_year, last_month, 1).strftime('%b %Y')} — Total Disbursed", f"{pm_total_disbursed:,.0f}")
+                        st.metric(f"{last_month_start.strftime('%b %Y')} — Total Disbursed", f"{pm_total_disbursed:,.0f}")
                     with col2:
-                        st.metric(f"{datetime(last_year, last_month, 1).strftime('%b %Y')} — Total Repaid", f"{pm_total_repaid:,.0f}")
+                        st.metric(f"{last_month_start.strftime('%b %Y')} — Total Repaid", f"{pm_total_repaid:,.0f}")
                     with col3:
-                        st.metric(f"{datetime(last_year, last_month, 1).strftime('%b %Y')} — Total Outstanding", f"{pm_total_outstanding:,.0f}")
+                        st.metric(f"{last_month_start.strftime('%b %Y')} — Total Outstanding", f"{pm_total_outstanding:,.0f}")
                     with col4:
-                        st.metric(f"{datetime(last_year, last_month, 1).strftime('%b %Y')} — Total Expected", f"{pm_total_expected:,.0f}")
+                        st.metric(f"{last_month_start.strftime('%b %Y')} — Total Expected", f"{pm_total_expected:,.0f}")
                     with col5:
-                        st.metric(f"{datetime(last_year, last_month, 1).strftime('%b %Y')} — Repayment Rate", f"{pm_repayment_rate:.1f}%")
+                        st.metric(f"{last_month_start.strftime('%b %Y')} — Repayment Rate", f"{pm_repayment_rate:.1f}%")
                 
                 st.markdown("---")
                 
                 # Display collections per branch
-                st.subheader(f"Collections by Branch - {datetime.now().strftime('%B %Y')}")
+                st.subheader(f"Collections by Branch - {period['label']}")
                 st.dataframe(branch_collections, use_container_width=True)
                 
                 # Create a bar chart
                 st.subheader("Branch Collection Comparison")
                 st.bar_chart(branch_collections['Total Collections'])
                 
-                # Daily Trends for current month
+                # Daily Trends for the reporting period
                 st.markdown("---")
-                st.subheader("📈 Daily Collection Trends (Current Month)")
+                st.subheader("📈 Daily Collection Trends (Reporting Period)")
                 
-                # Daily trend for current month
-                daily_trend = current_month_data.groupby(current_month_data['Expected Matured On Date'].dt.date)['Total Repayment Derived'].sum().sort_index()
-                st.subheader(f"Daily Collection Trend - {datetime.now().strftime('%B %Y')}")
+                # Daily trend for the reporting period
+                daily_trend = daily_series(cube, **month_filter)
+                st.subheader(f"Daily Collection Trend - {period['label']}")
                 if len(daily_trend) > 0:
                     st.line_chart(daily_trend)
                     
@@ -959,27 +907,30 @@ elif menu == "Zidisha":
                         st.metric("Peak Day", f"{daily_trend.max():,.0f}")
                     with col3:
                         st.metric("Active Days", len(daily_trend[daily_trend > 0]))
+                    
+                    # Rolling windows, MTD and deltas from the series kept with the dataset
+                    rolling_trend(zidisha['series'][('Zidisha', 'collections')], period)
             else:
-                st.info(f"No collection data available for {datetime.now().strftime('%B %Y')}")
+                st.info(f"No collection data available for {period['label']}")
                 
         except FileNotFoundError:
             st.error("zidisha.xlsx file not found in the current directory.")
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
 
-    with tab3:
+    elif view == "Productivity":
         st.subheader("Zidisha Productivity")
         file = st.file_uploader("Upload Zidisha Productivity Excel File", type=["xlsx"])
         if file:
             df = load_excel_data(file)
-            st.dataframe(df)
+            paged_table("zidisha_productivity", df)
 
 elif menu == "Kajea - Tech":
     st.info("Upload and visualize Kajea vehicle tracking data here.")
     file = st.file_uploader("Upload Kajea Tracking Excel File", type=["xlsx"])
     if file:
         df = load_excel_data(file)
-        st.dataframe(df)
+        paged_table("kajea_tracking", df)
 
 elif menu == "Insurance":
     st.header("🛡️ Insurance Reports")
@@ -987,33 +938,30 @@ elif menu == "Insurance":
     file = st.file_uploader("Upload Insurance Excel File", type=["xlsx"])
     if file:
         df = load_excel_data(file)
-        st.dataframe(df)
+        paged_table("insurance", df)
 
 elif menu == "Advans":
-    tab1, tab2 = st.tabs(["Disbursements", "Collections"])
+    view = view_selector(menu, ["Disbursements", "Collections"])
 
-    with tab1:
+    if view == "Disbursements":
         st.subheader("Advans Disbursements")
         
         # Load the Advans disbursements data from Zidisha file
         try:
-            from datetime import datetime
-            df_zidisha = pd.read_excel("zidisha.xlsx")
+            zidisha = get_dataset('zidisha')
             
-            # Filter for Advans Branch data for current month
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            advans_data = df_zidisha[
-                (df_zidisha['Branch Name'] == 'Advans Branch') &
-                (df_zidisha['Disbursed On Date'].dt.month == current_month) & 
-                (df_zidisha['Disbursed On Date'].dt.year == current_year)
-            ]
+            # Filter for Advans Branch data for the reporting period
+            month_start, month_end = period['start'], period['end']
+            advans_data = read_period(zidisha['loans_store'], month_start, month_end, columns=zidisha['loans'].columns,
+                                      branches=[ADVANS_BRANCH])
             
             if not advans_data.empty:
-                # Calculate disbursements for Advans Branch
-                total_disbursed = advans_data['Principal Amount'].sum()
-                total_loans = len(advans_data)
-                average_disbursement = advans_data['Principal Amount'].mean()
+                # Disbursements for Advans Branch
+                kpis = (precomputed('advans') or {}).get('disbursements') or \
+                    month_totals(zidisha['cube'], 'Advans', 'disbursed', period['as_of'], period=(month_start, month_end))
+                total_disbursed = kpis['total']
+                total_loans = kpis['loans']
+                average_disbursement = kpis['average']
                 
                 # Display summary metrics
                 col1, col2, col3, col4 = st.columns(4)
@@ -1029,18 +977,19 @@ elif menu == "Advans":
                 st.markdown("---")
                 
                 # Display detailed loan data
-                st.subheader(f"Advans Branch Disbursements - {datetime.now().strftime('%B %Y')}")
-                display_data = advans_data[['Client Name', 'Principal Amount', 'Disbursed On Date', 'Loan Officer Name', 'Product Name']].copy()
-                display_data = display_data.sort_values('Principal Amount', ascending=False)
-                st.dataframe(display_data, use_container_width=True)
+                st.subheader(f"Advans Branch Disbursements - {period['label']}")
+                display_data = advans_data[['Client Name', 'Principal Amount', 'Disbursed On Date', 'Loan Officer Name', 'Product Name']]
+                paged_table("advans_disbursements", display_data, sort='Principal Amount', ascending=False,
+                            key=(zidisha['signature'], month_start, month_end))
                 
-                # Daily Trends for current month
+                # Daily Trends for the reporting period
                 st.markdown("---")
-                st.subheader("📈 Daily Disbursement Trends (Current Month)")
+                st.subheader("📈 Daily Disbursement Trends (Reporting Period)")
                 
-                # Daily trend for current month
-                daily_trend = advans_data.groupby(advans_data['Disbursed On Date'].dt.date)['Principal Amount'].sum().sort_index()
-                st.subheader(f"Daily Disbursement Trend - {datetime.now().strftime('%B %Y')}")
+                # Daily trend for the reporting period
+                daily_trend = daily_series(zidisha['cube'], unit='Advans', metric='disbursed',
+                                           start=month_start, end=month_end)
+                st.subheader(f"Daily Disbursement Trend - {period['label']}")
                 if len(daily_trend) > 0:
                     st.line_chart(daily_trend)
                     
@@ -1052,36 +1001,36 @@ elif menu == "Advans":
                         st.metric("Peak Day", f"{daily_trend.max():,.0f}")
                     with col3:
                         st.metric("Active Days", len(daily_trend[daily_trend > 0]))
+                    
+                    # Rolling windows, MTD and deltas from the series kept with the dataset
+                    rolling_trend(zidisha['series'][('Advans', 'disbursed')], period)
             else:
-                st.info(f"No Advans Branch disbursement data available for {datetime.now().strftime('%B %Y')}")
+                st.info(f"No Advans Branch disbursement data available for {period['label']}")
                 
         except FileNotFoundError:
             st.error("zidisha.xlsx file not found in the current directory.")
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
 
-    with tab2:
+    elif view == "Collections":
         st.subheader("Advans Collections")
         
         # Load the Advans collections data from Zidisha file
         try:
-            from datetime import datetime
-            df_zidisha = pd.read_excel("zidisha.xlsx")
+            zidisha = get_dataset('zidisha')
             
-            # Filter for Advans Branch data for current month using Expected Matured On Date
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            advans_data = df_zidisha[
-                (df_zidisha['Branch Name'] == 'Advans Branch') &
-                (df_zidisha['Expected Matured On Date'].dt.month == current_month) & 
-                (df_zidisha['Expected Matured On Date'].dt.year == current_year)
-            ]
+            # Filter for Advans Branch data for the reporting period using Expected Matured On Date
+            month_start, month_end = period['start'], period['end']
+            advans_data = read_period(zidisha['loans_store'], month_start, month_end, date_col='Expected Matured On Date',
+                                      columns=zidisha['loans'].columns, branches=[ADVANS_BRANCH])
             
             if not advans_data.empty:
-                # Calculate collections for Advans Branch
-                total_collections = advans_data['Total Repayment Derived'].sum()
-                total_loans = len(advans_data)
-                average_collection = advans_data['Total Repayment Derived'].mean()
+                # Collections for Advans Branch
+                kpis = (precomputed('advans') or {}).get('collections') or \
+                    month_totals(zidisha['cube'], 'Advans', 'collections', period['as_of'], period=(month_start, month_end))
+                total_collections = kpis['total']
+                total_loans = kpis['loans']
+                average_collection = kpis['average']
                 
                 # Display summary metrics
                 col1, col2, col3, col4 = st.columns(4)
@@ -1097,18 +1046,19 @@ elif menu == "Advans":
                 st.markdown("---")
                 
                 # Display detailed loan data
-                st.subheader(f"Advans Branch Collections - {datetime.now().strftime('%B %Y')}")
-                display_data = advans_data[['Client Name', 'Total Repayment Derived', 'Expected Matured On Date', 'Loan Officer Name', 'Product Name']].copy()
-                display_data = display_data.sort_values('Total Repayment Derived', ascending=False)
-                st.dataframe(display_data, use_container_width=True)
+                st.subheader(f"Advans Branch Collections - {period['label']}")
+                display_data = advans_data[['Client Name', 'Total Repayment Derived', 'Expected Matured On Date', 'Loan Officer Name', 'Product Name']]
+                paged_table("advans_collections", display_data, sort='Total Repayment Derived', ascending=False,
+                            key=(zidisha['signature'], month_start, month_end))
                 
-                # Daily Trends for current month
+                # Daily Trends for the reporting period
                 st.markdown("---")
-                st.subheader("📈 Daily Collection Trends (Current Month)")
+                st.subheader("📈 Daily Collection Trends (Reporting Period)")
                 
-                # Daily trend for current month
-                daily_trend = advans_data.groupby(advans_data['Expected Matured On Date'].dt.date)['Total Repayment Derived'].sum().sort_index()
-                st.subheader(f"Daily Collection Trend - {datetime.now().strftime('%B %Y')}")
+                # Daily trend for the reporting period
+                daily_trend = daily_series(zidisha['cube'], unit='Advans', metric='collections',
+                                           start=month_start, end=month_end)
+                st.subheader(f"Daily Collection Trend - {period['label']}")
                 if len(daily_trend) > 0:
                     st.line_chart(daily_trend)
                     
@@ -1120,8 +1070,11 @@ elif menu == "Advans":
                         st.metric("Peak Day", f"{daily_trend.max():,.0f}")
                     with col3:
                         st.metric("Active Days", len(daily_trend[daily_trend > 0]))
+                    
+                    # Rolling windows, MTD and deltas from the series kept with the dataset
+                    rolling_trend(zidisha['series'][('Advans', 'collections')], period)
             else:
-                st.info(f"No Advans Branch collection data available for {datetime.now().strftime('%B %Y')}")
+                st.info(f"No Advans Branch collection data available for {period['label']}")
                 
         except FileNotFoundError:
             st.error("zidisha.xlsx file not found in the current directory.")
@@ -1131,3 +1084,7 @@ elif menu == "Advans":
 # --- FOOTER ---
 st.markdown("<hr>", unsafe_allow_html=True)
 st.caption("© 2025 Phoenix Capital | Exco Report App")
+
+run = timings.finish_run()
+if st.query_params.get("admin") == "1":
+    performance_panel(run)
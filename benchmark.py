@@ -0,0 +1,621 @@
+"""Performance benchmarks for the Exco Report App data layer.
+
+Run from the repository root, e.g.:
+
+    python benchmark.py loaders snapshots append memory sessions charts ingest
+    python benchmark.py analytics --sizes 10000 100000 1000000 --save bench.json
+    python benchmark.py merge --sizes 10000 100000 1000000
+    python benchmark.py stream --sizes 100000 1000000 3000000
+    python benchmark.py par --sizes 10000 100000 1000000
+    python benchmark.py drilldown --sizes 10000 100000 1000000
+    python benchmark.py uploads --sizes 5000 20000 100000
+    python benchmark.py tables --sizes 10000 100000 1000000
+    python benchmark.py timeseries --sizes 10000 100000 1000000
+    python benchmark.py analytics --compare bench.json
+    python benchmark.py loaders snapshots append --data /tmp/books
+
+``--data`` runs against another directory of source files, e.g. a loan book
+written by ``synthetic.py``.
+
+``--compare`` exits non-zero when any analytics timing is more than
+``REGRESSION_TOLERANCE`` slower than the saved baseline.
+"""
+import argparse
+import inspect
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import analytics
+import charts
+import data_loader
+import drilldown
+import par
+import periods
+import registry
+import synthetic
+import tables
+import timeseries
+import uploads
+
+# Source reads a single rerun used to make per menu (one per tab that loads it).
+RERUN_READS = {
+    "Logbook": [data_loader.LOGBOOK_DISBURSEMENTS, data_loader.LOGBOOK_REPAYMENTS,
+                data_loader.LOGBOOK_DISBURSEMENTS, data_loader.LOGBOOK_REPAYMENTS],
+    "Zidisha": [data_loader.ZIDISHA] * 3,
+    "Advans": [data_loader.ZIDISHA] * 2,
+}
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _print_row(label, *values):
+    print(f"{label:<28}" + "".join(f"{v:>14}" for v in values))
+
+
+def _rerun(paths):
+    for path in paths:
+        data_loader.load_source(path)
+
+
+def _rerun_uncached(paths):
+    for path in paths:
+        data_loader._read(path)
+
+
+def bench_loaders(reruns=5):
+    """Compare uncached, cold (empty cache) and warm reruns for each menu"""
+    _print_row("menu", "uncached (s)", "cold (s)", "warm (s)", "warm speedup")
+    for menu, paths in RERUN_READS.items():
+        uncached, _ = _timed(_rerun_uncached, paths)
+        data_loader.clear_cache()
+        cold, _ = _timed(_rerun, paths)
+        warm = min(_timed(_rerun, paths)[0] for _ in range(reruns))
+        _print_row(menu, f"{uncached:.4f}", f"{cold:.4f}", f"{warm:.6f}", f"{uncached / max(warm, 1e-9):.0f}x")
+    print(data_loader.cache_info())
+
+
+def bench_memory():
+    """Per-frame memory of each source parsed as plain objects/float64 and with the loader schema"""
+    _print_row("source", "untyped (MB)", "typed (MB)", "saved")
+    data_loader.clear_cache()
+    for path in data_loader.SOURCES:
+        before = data_loader._read_prepared(path, typed=False).memory_usage(deep=True).sum()
+        after = data_loader.load_source(path).memory_usage(deep=True).sum()
+        _print_row(path, f"{before / 1e6:.2f}", f"{after / 1e6:.2f}", f"{1 - after / before:.0%}")
+    data_loader.clear_cache()
+
+
+# Columns the Zidisha/Advans and Logbook pages read from each snapshot.
+PAGE_COLUMNS = {
+    data_loader.ZIDISHA: ['Branch Name', 'Disbursed On Date', 'Expected Matured On Date', 'Principal Amount',
+                          'Total Repayment Derived', 'Total Outstanding Derived', 'Total Expected Repayment Derived'],
+    data_loader.LOGBOOK_DISBURSEMENTS: ['Branch', 'Branch Name', 'Disbursed Date', 'Disbursed', 'Outstanding', 'Principal'],
+}
+
+
+def bench_snapshots():
+    """Compare parsing each workbook against full and projected Parquet snapshot reads"""
+    _print_row("source", "excel (s)", "parquet (s)", "projected (s)", "speedup")
+    for path in data_loader.SNAPSHOT_SOURCES:
+        excel, _ = _timed(pd.read_excel, path)
+        data_loader.ingest(path)
+        snap = data_loader.snapshot_path(path)
+        full = min(_timed(pd.read_parquet, snap)[0] for _ in range(3))
+        projected = min(_timed(pd.read_parquet, snap, columns=PAGE_COLUMNS[path])[0] for _ in range(3))
+        _print_row(path, f"{excel:.4f}", f"{full:.4f}", f"{projected:.4f}", f"{excel / max(projected, 1e-9):.0f}x")
+
+
+def bench_append(new_rows=50):
+    """Full repayments parse against folding in a day's worth of appended rows"""
+    with open(data_loader.LOGBOOK_REPAYMENTS, "rb") as fh:
+        lines = fh.read().splitlines(keepends=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, data_loader.LOGBOOK_REPAYMENTS)
+        with open(path, "wb") as fh:
+            fh.writelines(lines[:-new_rows])
+        data_loader.clear_cache()
+        full, _ = _timed(data_loader.load_source, path)
+        with open(path, "ab") as fh:
+            fh.writelines(lines[-new_rows:])
+        incremental, frame = _timed(data_loader.load_source, path)
+        _print_row("rows", "full (s)", "append (s)", "speedup")
+        _print_row(f"{len(frame)} (+{new_rows})", f"{full:.4f}", f"{incremental:.4f}", f"{full / max(incremental, 1e-9):.1f}x")
+    data_loader.clear_cache()
+
+
+def _cold_load(workers):
+    """Seconds to parse every source from scratch (no snapshots, empty caches) and load it"""
+    shutil.rmtree(data_loader.SNAPSHOT_DIR, ignore_errors=True)
+    data_loader.clear_cache()
+    start = time.perf_counter()
+    data_loader.prefetch_sources(data_loader.SOURCES, workers)
+    for path in data_loader.SOURCES:
+        data_loader.load_source(path)
+    return time.perf_counter() - start
+
+
+def bench_ingest(workers=len(data_loader.SOURCES)):
+    """Cold start parsing the sources one after another against a process pool"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in data_loader.SOURCES:
+            shutil.copy(path, tmp)
+        os.chdir(tmp)
+        try:
+            serial = min(_cold_load(1) for _ in range(2))
+            parallel = min(_cold_load(workers) for _ in range(2))
+        finally:
+            data_loader.clear_cache()
+            os.chdir(cwd)
+    _print_row("cpus", "serial (s)", f"{workers} workers (s)", "speedup")
+    _print_row(os.cpu_count(), f"{serial:.3f}", f"{parallel:.3f}", f"{serial / max(parallel, 1e-9):.2f}x")
+    return {"ingest serial": serial, "ingest parallel": parallel}
+
+
+# --- CONCURRENT SESSIONS ---
+def _check_dataset(logbook, zidisha):
+    """True when each cube was built from exactly the frames it was handed out with"""
+    collected = aggregates.cube_total(logbook['cube'], metric='collected')
+    disbursed = aggregates.cube_total(zidisha['cube'], metric='disbursed')
+    return (abs(collected - logbook['repayments']['repayment_amount'].sum()) < 0.01
+            and abs(disbursed - zidisha['loans']['Principal Amount'].astype('float64').sum()) < 0.01)
+
+
+def bench_sessions(sessions=32, reruns=10, appends=5):
+    """Simulate many sessions rerunning the dashboards while repayments are appended.
+
+    Fails if any session sees a cube that does not match its frames, or if
+    sessions end up holding more than one copy of a dataset version.
+    """
+    with open(data_loader.LOGBOOK_REPAYMENTS, "rb") as fh:
+        lines = fh.read().splitlines(keepends=True)
+    held_back = len(lines) // 10
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in data_loader.SOURCES:
+            shutil.copy(path, tmp)
+        os.chdir(tmp)
+        try:
+            with open(data_loader.LOGBOOK_REPAYMENTS, "wb") as fh:
+                fh.writelines(lines[:-held_back])
+            data_loader.clear_cache()
+            registry.clear()
+            seen, errors = {}, []
+            seen_lock = threading.Lock()
+
+            def session():
+                for _ in range(reruns):
+                    logbook = registry.get_dataset('logbook')
+                    zidisha = registry.get_dataset('zidisha')
+                    analytics.logbook_kpis(logbook['cube'], REPORTING_DATE)
+                    analytics.loan_book_kpis(zidisha['cube'], 'Zidisha', REPORTING_DATE)
+                    if not _check_dataset(logbook, zidisha):
+                        errors.append(logbook['signature'])
+                    with seen_lock:
+                        for dataset in (logbook, zidisha):
+                            seen.setdefault((dataset['name'], dataset['signature']), set()).add(id(dataset['cube']))
+
+            def writer():
+                # Append while sessions are rerunning, not during the first load
+                while registry.registry_info()['builds'] < len(registry.DATASETS):
+                    time.sleep(0.01)
+                step = held_back // appends
+                for i in range(appends):
+                    time.sleep(0.2)
+                    with open(data_loader.LOGBOOK_REPAYMENTS, "ab") as fh:
+                        fh.writelines(lines[-held_back + i * step:len(lines) - held_back + (i + 1) * step])
+
+            threads = [threading.Thread(target=session) for _ in range(sessions)] + [threading.Thread(target=writer)]
+            elapsed, _ = _timed(lambda: ([t.start() for t in threads], [t.join() for t in threads]))
+        finally:
+            # Background refreshes read the sources from the temporary directory
+            while registry.registry_info()['refreshing']:
+                time.sleep(0.05)
+            os.chdir(cwd)
+    info = registry.registry_info()
+    registry.clear()
+    data_loader.clear_cache()
+    copies = max(len(ids) for ids in seen.values())
+    _print_row("sessions x reruns", "wall (s)", "reruns/s", "builds", "waits", "stale", "versions")
+    _print_row(f"{sessions} x {reruns}", f"{elapsed:.3f}", f"{sessions * reruns / elapsed:.0f}",
+               info['builds'], info['waits'], info['stale'], len(seen))
+    if errors or copies > 1:
+        raise AssertionError(f"{len(errors)} inconsistent dataset(s); up to {copies} copies of one version")
+    print("every session saw consistent, shared datasets")
+
+
+# --- ANALYTICS SCALING ---
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+REGRESSION_TOLERANCE = 0.25
+REPORTING_DATE = pd.Timestamp("2025-10-21")
+
+
+def bench_charts(reruns=10):
+    """Rendering the Logbook dashboard charts on every rerun against serving them from the chart cache"""
+    cube = registry.get_dataset('logbook')['cube']
+    start, end = periods.month_bounds(cube['date'].max())
+    mtd = dict(unit='Logbook', start=start, end=end)
+    daily = pd.DataFrame({'Disbursed': aggregates.daily_series(cube, metric='disbursed', **mtd),
+                          'Collections': aggregates.daily_series(cube, metric='collected', **mtd)}).fillna(0)
+    cases = {
+        'daily_trend': (daily.rename_axis('Date').reset_index(), charts.daily_trend_chart),
+        'branch_scatter': (analytics.branch_scatter(cube, 'Logbook', 'disbursed', 'collected', start, end),
+                           charts.branch_scatter_figure),
+    }
+    _print_row("chart", "render (s)", "cached (s)", "speedup")
+    charts.clear_chart_cache()
+    for kind, (data, build) in cases.items():
+        render = min(_timed(charts._render, build(data))[0] for _ in range(3))
+        charts.cached_chart(kind, data, lambda: build(data))
+        cached = min(_timed(charts.cached_chart, kind, data, lambda: build(data))[0] for _ in range(reruns))
+        _print_row(kind, f"{render:.4f}", f"{cached:.4f}", f"{render / max(cached, 1e-9):.0f}x")
+    info = charts.chart_cache_info()
+    print(f"cache: {info['hits']} hits, {info['misses']} misses, {info['open_figures']} open figures")
+    charts.clear_chart_cache()
+
+
+def _logbook_books(rows, seed=0):
+    """Prepared Logbook disbursements with ``rows`` loans and ``rows`` repayments against them"""
+    df_disb = synthetic.logbook_disbursements(rows, REPORTING_DATE, seed=seed)
+    df_coll = synthetic.logbook_repayments(rows, df_disb, REPORTING_DATE, seed=seed)
+    return (data_loader.PREPARERS[data_loader.LOGBOOK_DISBURSEMENTS](df_disb),
+            data_loader.PREPARERS[data_loader.LOGBOOK_REPAYMENTS](df_coll.reset_index(drop=True)))
+
+
+def _synthetic_books(rows, seed=0):
+    """Prepared Logbook disbursements/repayments and a Zidisha book with ``rows`` loans each"""
+    df_zidisha = synthetic.zidisha(rows, REPORTING_DATE, seed=seed)
+    return _logbook_books(rows, seed) + (data_loader.PREPARERS[data_loader.ZIDISHA](df_zidisha),)
+
+
+def _analytics_cases(df_disb, df_coll, df_zidisha):
+    month_start, month_end = periods.month_bounds(REPORTING_DATE)
+    logbook = aggregates.build_logbook_cube(df_disb, df_coll)
+    zidisha = aggregates.build_zidisha_cube(df_zidisha)
+    return {
+        "build_logbook_cube": lambda: aggregates.build_logbook_cube(df_disb, df_coll),
+        "build_zidisha_cube": lambda: aggregates.build_zidisha_cube(df_zidisha),
+        "logbook_kpis": lambda: analytics.logbook_kpis(logbook, REPORTING_DATE),
+        "loan_book_kpis": lambda: analytics.loan_book_kpis(zidisha, 'Zidisha', REPORTING_DATE),
+        "period_comparison_kpis": lambda: analytics.period_comparison_kpis(zidisha, 'Zidisha', REPORTING_DATE),
+        "month_totals (Advans)": lambda: analytics.month_totals(zidisha, 'Advans', 'disbursed', REPORTING_DATE),
+        "branch_table": lambda: analytics.branch_table(zidisha, 'Zidisha', 'disbursed', ['Total', 'Loans', 'Average'],
+                                                       start=month_start, end=month_end),
+        "branch_scatter": lambda: analytics.branch_scatter(zidisha, 'Zidisha', 'disbursed', 'collections',
+                                                           month_start, month_end),
+        "top_n (raw officers)": lambda: analytics.top_n(df_zidisha, 'Loan Officer Name', 'Principal Amount'),
+    }
+
+
+def bench_analytics(sizes=DEFAULT_SIZES, repeat=3):
+    """Time cube builds and KPI functions on synthetic loan books of each size"""
+    results = {}
+    for rows in sizes:
+        cases = _analytics_cases(*_synthetic_books(rows))
+        print(f"-- {rows:,} rows --")
+        _print_row("function", "best (ms)")
+        for name, fn in cases.items():
+            best = min(_timed(fn)[0] for _ in range(repeat))
+            results[f"{name}@{rows}"] = best
+            _print_row(name, f"{best * 1000:.2f}")
+    return results
+
+
+def _overlapping_exports(df, deltas=5, overlap=0.1, amended=0.01, seed=0):
+    """``df`` split into a full dump and daily deltas that each re-send ``overlap`` of the rows before them"""
+    rng = np.random.default_rng(seed)
+    bounds = np.linspace(len(df) // 2, len(df), deltas + 1).astype(int)
+    frames = [df.iloc[:bounds[0]]]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        delta = df.iloc[max(0, start - int(len(df) * overlap)):end].copy()
+        changed = rng.random(len(delta)) < amended
+        delta.loc[changed, 'Total Repayment Derived'] += 100
+        frames.append(delta)
+    return frames
+
+
+def bench_drilldown(sizes=DEFAULT_SIZES, repeat=3):
+    """Top-N officers and one officer's loans for a month: raw frame masks against the drill-down index"""
+    results = {}
+    _print_row("loans", "index (ms)", "top_n (ms)", "board (ms)", "mask (ms)", "drill (ms)")
+    month_start, month_end = periods.month_bounds(REPORTING_DATE)
+    for rows in sizes:
+        df = data_loader.apply_schema(data_loader.PREPARERS[data_loader.ZIDISHA](synthetic.zidisha(rows, REPORTING_DATE)),
+                                      data_loader.SCHEMAS[data_loader.ZIDISHA])
+        levels = ['Branch Name', 'Loan Officer Name']
+        build, index = _timed(drilldown.build_drill_index, df, levels, 'Disbursed On Date', 'Principal Amount')
+        path = tuple(index['leaves'].iloc[0][levels])
+        days = df['Disbursed On Date'].dt.normalize()
+
+        def month_rows():
+            return df[(days >= month_start) & (days <= month_end) & (df['Branch Name'] != aggregates.ADVANS_BRANCH)]
+
+        cases = {
+            "top_n": lambda: analytics.top_n(month_rows(), 'Loan Officer Name', 'Principal Amount'),
+            "leaderboard": lambda: drilldown.leaderboard(index, 'Loan Officer Name', month_start, month_end,
+                                                         except_branches=[aggregates.ADVANS_BRANCH]),
+            "mask": lambda: df[(days >= month_start) & (days <= month_end) & (df['Branch Name'] == path[0])
+                               & (df['Loan Officer Name'] == path[1])],
+            "drill_rows": lambda: drilldown.drill_rows(df, index, path, month_start, month_end),
+        }
+        best = {name: min(_timed(fn)[0] for _ in range(repeat)) for name, fn in cases.items()}
+        results[f"build_drill_index@{rows}"] = build
+        results.update({f"{name}@{rows}": seconds for name, seconds in best.items()})
+        _print_row(f"{rows:,}", f"{build * 1000:.1f}", *(f"{best[name] * 1000:.2f}" for name in cases))
+    return results
+
+
+def bench_merge(sizes=DEFAULT_SIZES, repeat=3):
+    """Merge a full dump plus overlapping daily deltas of a synthetic Zidisha book of each size"""
+    results = {}
+    _print_row("loans", "rows read", "best (ms)", "ns/row")
+    for rows in sizes:
+        frames = _overlapping_exports(data_loader.PREPARERS[data_loader.ZIDISHA](
+            synthetic.zidisha(rows, REPORTING_DATE)))
+        best = min(_timed(data_loader.merge_exports, data_loader.ZIDISHA, frames)[0] for _ in range(repeat))
+        read = sum(len(frame) for frame in frames)
+        results[f"merge_exports@{rows}"] = best
+        _print_row(f"{rows:,}", f"{read:,}", f"{best * 1000:.2f}", f"{best / read * 1e9:.0f}")
+    return results
+
+
+def _peak(fn, *args, **kwargs):
+    """Seconds of one call and peak traced allocation (bytes) of another; tracing slows the call down"""
+    seconds, _ = _timed(fn, *args, **kwargs)
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return seconds, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _full_repayment_totals(path):
+    df = data_loader._read_prepared(path)
+    return df.groupby(['Branch Name', 'collector_id', 'repayment_collected_date'], dropna=False,
+                      observed=True)['repayment_amount'].agg(['sum', 'count'])
+
+
+def bench_stream(sizes=DEFAULT_SIZES):
+    """Peak memory and time of loading a synthetic repayments CSV whole against streaming its aggregates"""
+    results = {}
+    _print_row("repayments", "full (s)", "full MB", "stream (s)", "stream MB")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, data_loader.LOGBOOK_REPAYMENTS)
+        disbursements = synthetic.logbook_disbursements(5000, REPORTING_DATE)
+        for rows in sizes:
+            synthetic.logbook_repayments(rows, disbursements, REPORTING_DATE).to_csv(
+                path, index_label='', encoding='utf-8-sig')
+            full, full_peak = _peak(_full_repayment_totals, path)
+            stream, stream_peak = _peak(aggregates.stream_repayments, path)
+            results[f"stream_repayments@{rows}"] = stream
+            _print_row(f"{rows:,}", f"{full:.3f}", f"{full_peak / 1e6:.1f}", f"{stream:.3f}", f"{stream_peak / 1e6:.1f}")
+    return results
+
+
+def _check_par():
+    """Raise if the PAR engine disagrees with a hand-aged loan that is partly repaid"""
+    # 90-day term: 3 instalments of (60,000 + 30,000) / 3 = 30,000, due on days 30, 60 and 90.
+    # The one repayment covers the first instalment, so on 15 Mar the loan is 13 days past
+    # the 2 Mar due date with 75,000 - 25,000 = 50,000 principal outstanding.
+    df_loans = pd.DataFrame({
+        'Loan Id': [1.0], 'Branch Name': ['TOWN BRANCH'], 'LoanOfficer': ['Officer'],
+        'Disbursed Date': [pd.Timestamp('2026-01-01')], 'Maturity': [pd.Timestamp('2026-04-01')],
+        'Outstanding': [60_000.0], 'Paid': [30_000.0], 'Principal': [75_000.0]})
+    df_coll = pd.DataFrame({
+        'loan_id': [1], 'repayment_collected_date': [pd.Timestamp('2026-02-01')],
+        'repayment_amount': [30_000.0], 'principal_repayment_amount': [25_000.0]})
+    aging = par.loan_aging(par.build_book(df_loans, df_coll), '2026-03-15')
+    assert aging['dpd'].tolist() == [13] and aging['outstanding'].tolist() == [50_000.0], aging
+    totals = par.par_totals(par.par_summary(aging))
+    assert (totals['portfolio'], totals['par1'], totals['par30']) == (50_000.0, 50_000.0, 0.0), totals
+
+
+def bench_par(sizes=DEFAULT_SIZES, repeat=3):
+    """Build, age and summarise the PAR book of synthetic Logbook books of each size, and fold a 1% append"""
+    _check_par()
+    results = {}
+    for rows in sizes:
+        df_disb, df_coll = _logbook_books(rows)
+        df_loans = data_loader.apply_schema(df_disb, data_loader.SCHEMAS[data_loader.LOGBOOK_DISBURSEMENTS])[
+            data_loader.LOGBOOK_LOAN_COLUMNS]
+        df_coll = data_loader.apply_schema(df_coll, data_loader.SCHEMAS[data_loader.LOGBOOK_REPAYMENTS])
+        book = par.build_book(df_loans, df_coll)
+        aging = par.loan_aging(book, REPORTING_DATE)
+        delta = df_coll.tail(max(rows // 100, 1))
+        cases = {
+            "build_book": lambda: par.build_book(df_loans, df_coll),
+            "loan_aging": lambda: par.loan_aging(book, REPORTING_DATE),
+            "loan_aging (60 days back)": lambda: par.loan_aging(book, REPORTING_DATE - pd.Timedelta(days=60)),
+            "par_summary (branch)": lambda: par.par_summary(aging, 'branch'),
+            "par_summary (officer)": lambda: par.par_summary(aging, 'officer'),
+            "aging_buckets": lambda: par.aging_buckets(aging, 'branch'),
+            "fold_repayments (1%)": lambda: par.fold_repayments(book, delta, df_coll),
+        }
+        print(f"-- {rows:,} loans --")
+        _print_row("function", "best (ms)")
+        for name, fn in cases.items():
+            best = min(_timed(fn)[0] for _ in range(repeat))
+            results[f"{name}@{rows}"] = best
+            _print_row(name, f"{best * 1000:.2f}")
+    return results
+
+
+def bench_uploads(sizes=(20_000,), repeat=5):
+    """Parse an uploaded workbook of each size, then serve it again from memory and from its spill file"""
+    results = {}
+    _print_row("rows", "MB", "parse (s)", "memory (ms)", "spill (ms)")
+    spill_dir = uploads.SPILL_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads.SPILL_DIR = tmp
+        try:
+            for rows in sizes:
+                buffer = io.BytesIO()
+                synthetic.zidisha(rows, REPORTING_DATE).to_excel(buffer, index=False)
+                data = buffer.getvalue()
+                uploads.clear_upload_cache()
+                parse, _ = _timed(uploads.load_upload, data)
+                memory = min(_timed(uploads.load_upload, data)[0] for _ in range(repeat))
+                spill = []
+                for _ in range(repeat):
+                    uploads.clear_upload_cache()
+                    spill.append(_timed(uploads.load_upload, data)[0])
+                results[f"upload_parse@{rows}"] = parse
+                results[f"upload_memory@{rows}"] = memory
+                results[f"upload_spill@{rows}"] = min(spill)
+                _print_row(f"{rows:,}", f"{len(data) / 1e6:.1f}", f"{parse:.3f}", f"{memory * 1000:.2f}",
+                           f"{min(spill) * 1000:.2f}")
+        finally:
+            uploads.SPILL_DIR = spill_dir
+            uploads.clear_upload_cache()
+    return results
+
+
+def bench_tables(sizes=DEFAULT_SIZES, repeat=3):
+    """Arrow payload and serialisation time of a whole loan list against one sorted or searched page of it"""
+    from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+    results = {}
+    _print_row("rows", "full KB", "full (ms)", "view (ms)", "page KB", "page (ms)", "search (ms)")
+    for rows in sizes:
+        df = data_loader.apply_schema(
+            data_loader.PREPARERS[data_loader.ZIDISHA](synthetic.zidisha(rows, REPORTING_DATE)),
+            data_loader.SCHEMAS[data_loader.ZIDISHA])[
+            ['Client Name', 'Principal Amount', 'Disbursed On Date', 'Loan Officer Name', 'Product Name']]
+        full, payload = min((_timed(convert_pandas_df_to_arrow_bytes, df) for _ in range(repeat)),
+                            key=lambda timed: timed[0])
+        view = min(_timed(tables.build_view, df, 'Principal Amount', False)[0] for _ in range(repeat))
+        tables.clear_table_cache()
+        tables.view_positions(df, 'Principal Amount', False)
+
+        def page():
+            shown = tables.table_page(df, page=2, sort='Principal Amount', ascending=False)['frame']
+            return convert_pandas_df_to_arrow_bytes(shown)
+
+        paged, page_payload = min((_timed(page) for _ in range(repeat)), key=lambda timed: timed[0])
+        search = min(_timed(tables.build_view, df, 'Principal Amount', False, 'mar')[0] for _ in range(repeat))
+        results[f"table_full@{rows}"] = full
+        results[f"table_view@{rows}"] = view
+        results[f"table_page@{rows}"] = paged
+        results[f"table_search@{rows}"] = search
+        _print_row(f"{rows:,}", f"{len(payload) / 1e3:,.0f}", f"{full * 1000:.1f}", f"{view * 1000:.1f}",
+                   f"{len(page_payload) / 1e3:,.1f}", f"{paged * 1000:.2f}", f"{search * 1000:.1f}")
+    tables.clear_table_cache()
+    return results
+
+
+def _trend_recompute(cube, start, end):
+    """Rolling, MTD and delta columns recomputed from the cube's whole daily history"""
+    daily = aggregates.daily_series(cube, unit='Logbook', metric='collected')
+    daily.index = pd.to_datetime(daily.index)
+    daily = daily.reindex(pd.date_range(daily.index.min(), end), fill_value=0.0)
+    frame = pd.DataFrame({'value': daily, 'sum_7d': daily.rolling(7, min_periods=1).sum(),
+                          'sum_30d': daily.rolling(30, min_periods=1).sum(),
+                          'mtd': daily.groupby([daily.index.year, daily.index.month]).cumsum(),
+                          'dod': daily.diff()})
+    return frame.loc[start:end]
+
+
+def bench_timeseries(sizes=DEFAULT_SIZES, repeat=5):
+    """Month of rolling/MTD columns and a one-day append: series lookups against recomputing the history"""
+    results = {}
+    month_start, month_end = periods.month_bounds(REPORTING_DATE)
+    _print_row("repayments", "recompute (ms)", "frame (ms)", "build (ms)", "append (ms)")
+    for rows in sizes:
+        df_disb, df_coll = _logbook_books(rows)
+        cube = aggregates.build_logbook_cube(df_disb, df_coll)
+        series = timeseries.build_series(cube, 'Logbook', 'collected')
+        # The last day's collections arrive after the rest
+        last_day = pd.Timestamp(series['first'] + timeseries.series_days(series) - 1, unit='D')
+        is_last = (cube['metric'] == 'collected') & (cube['date'] == last_day)
+        before = cube[~is_last].reset_index(drop=True)
+        recompute = min(_timed(_trend_recompute, cube, month_start, month_end)[0] for _ in range(repeat))
+        frame = min(_timed(timeseries.series_frame, series, month_start, month_end)[0] for _ in range(repeat))
+        build = min(_timed(timeseries.build_series, cube, 'Logbook', 'collected')[0] for _ in range(repeat))
+        # A fresh base each time, so every append extends its buffer in place
+        bases = [timeseries.build_series(before, 'Logbook', 'collected') for _ in range(repeat)]
+        append = min(_timed(timeseries.append_rows, base, cube[is_last])[0] for base in bases)
+        results.update({f"recompute@{rows}": recompute, f"series_frame@{rows}": frame,
+                        f"build_series@{rows}": build, f"append_rows@{rows}": append})
+        _print_row(f"{rows:,}", *(f"{seconds * 1000:.2f}" for seconds in (recompute, frame, build, append)))
+    return results
+
+
+def compare_results(results, baseline_path, tolerance=REGRESSION_TOLERANCE):
+    """Print timings that regressed against a saved baseline; returns True if any did"""
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    regressed = False
+    for key, seconds in sorted(results.items()):
+        before = baseline.get(key)
+        if before and seconds > before * (1 + tolerance):
+            print(f"REGRESSION {key}: {before * 1000:.2f} ms -> {seconds * 1000:.2f} ms")
+            regressed = True
+    return regressed
+
+
+BENCHMARKS = {
+    "analytics": bench_analytics,
+    "append": bench_append,
+    "charts": bench_charts,
+    "drilldown": bench_drilldown,
+    "ingest": bench_ingest,
+    "loaders": bench_loaders,
+    "memory": bench_memory,
+    "merge": bench_merge,
+    "par": bench_par,
+    "sessions": bench_sessions,
+    "snapshots": bench_snapshots,
+    "stream": bench_stream,
+    "tables": bench_tables,
+    "timeseries": bench_timeseries,
+    "uploads": bench_uploads,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exco Report App benchmarks")
+    parser.add_argument("names", nargs="*",
+                        help=f"benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, help="synthetic loan book sizes (rows)")
+    parser.add_argument("--save", help="write timings to this JSON file")
+    parser.add_argument("--compare", help="fail if timings regressed against this JSON file")
+    parser.add_argument("--data", help="directory holding the source files (default: current directory)")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.names) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    if args.data:
+        args.save = args.save and os.path.abspath(args.save)
+        args.compare = args.compare and os.path.abspath(args.compare)
+        os.chdir(args.data)
+
+    results = {}
+    for name in args.names or sorted(BENCHMARKS):
+        print(f"== {name} ==")
+        fn = BENCHMARKS[name]
+        kwargs = {"sizes": args.sizes} if args.sizes and "sizes" in inspect.signature(fn).parameters else {}
+        results.update(fn(**kwargs) or {})
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare and compare_results(results, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
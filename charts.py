@@ -0,0 +1,194 @@
+"""Dashboard charts and a rendered-chart cache.
+
+Chart builders draw one chart from a small, already aggregated DataFrame and
+never touch Streamlit. ``cached_chart`` renders a builder's result once per
+(chart type, data fingerprint): matplotlib figures become PNG bytes and are
+closed straight away, Altair charts become their Vega-Lite spec. Reruns and
+other sessions showing the same data reuse the rendered chart, and the least
+recently used ones are evicted beyond ``MAX_CHARTS``.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from PIL import Image
+
+MAX_CHARTS = 64
+# Same output as st.pyplot
+SAVEFIG_OPTIONS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+# Streamlit's maximum content width; st.image shrinks and re-encodes wider
+# images on every call, so cached PNGs are stored at most this wide
+MAX_IMAGE_WIDTH = 1460
+
+
+# --- CHART BUILDERS ---
+def daily_trend_chart(plot_df):
+    """Altair line chart of daily Disbursed vs Collections ('Date', 'Disbursed', 'Collections' columns)"""
+    import altair as alt
+    return alt.Chart(plot_df).transform_fold(
+        ['Disbursed', 'Collections'],
+        as_=['Metric', 'Value']
+    ).mark_line(
+        interpolate='monotone',
+        strokeWidth=2
+    ).encode(
+        x=alt.X('Date:T', title='Date'),
+        y=alt.Y('Value:Q', title='Amount'),
+        color=alt.Color('Metric:N', scale=alt.Scale(domain=['Disbursed', 'Collections'], range=['#1f77b4', '#ff7f0e']))
+    ).properties(
+        height=300
+    )
+
+
+def branch_scatter_figure(scatter_df):
+    """Bubble scatter of MTD disbursed vs collection rate per branch, sized by outstanding"""
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    # Safely scale bubble sizes; handle zero/NaN max outstanding
+    max_out = scatter_df['Outstanding'].max()
+    try:
+        max_out = float(max_out)
+    except Exception:
+        max_out = 0.0
+    if max_out and max_out > 0:
+        sizes = (scatter_df['Outstanding'] / max_out * 800).fillna(200)
+    else:
+        sizes = pd.Series(200, index=scatter_df.index)
+    ax.scatter(scatter_df['Disbursed'], scatter_df['Collection Rate %'], s=sizes, alpha=0.6, c='#1f77b4')
+    for name, row in scatter_df.iterrows():
+        ax.text(row['Disbursed'], row['Collection Rate %'], name, fontsize=8, ha='left', va='bottom')
+    ax.set_xlabel('MTD Disbursed')
+    ax.set_ylabel('Collection Rate %')
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def _clustered_bars(title, ylabel, branches, bars, bar_width):
+    """Frameless clustered bar chart; ``bars`` is a list of (values, label, color)"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    for side in ('top', 'right', 'bottom', 'left'):
+        ax.spines[side].set_visible(False)
+    x = np.arange(len(branches))
+    offsets = (np.arange(len(bars)) - (len(bars) - 1) / 2) * bar_width
+    drawn = [ax.bar(x + offset, values, bar_width, label=label, color=color, alpha=0.8)
+             for offset, (values, label, color) in zip(offsets, bars)]
+    ax.set_xlabel('Branches')
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.set_xticks(x)
+    ax.set_xticklabels(branches, rotation=45, ha='right')
+    ax.legend()
+    # Format y-axis to show values in millions
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda v, p: f'{v/1e6:.1f}M'))
+    for group, (values, _, _) in zip(drawn, bars):
+        ax.bar_label(group, labels=[f'{v/1e6:.1f}M' for v in values], fontsize=8)
+    return fig, ax, drawn
+
+
+def disbursement_targets_figure(chart_data):
+    """Monthly target, MTD target and actual disbursed per branch, with MTD achievement %"""
+    actual = chart_data['Total Disbursed'].values
+    mtd_target = chart_data['MTD Target'].values
+    fig, ax, drawn = _clustered_bars(
+        'Branch Disbursement vs Targets Comparison', 'Amount (KSh)', chart_data.index.tolist(),
+        [(chart_data['Target'].values, 'Monthly Target', '#ff7f0e'),
+         (mtd_target, 'MTD Target', '#2ca02c'),
+         (actual, 'Actual Disbursed', '#1f77b4')], bar_width=0.25)
+    mtd_achievement = (actual / mtd_target * 100).round(1)
+    # Above the amount label of the actual bar
+    ax.bar_label(drawn[-1], labels=[f'{a:.1f}%' for a in mtd_achievement], padding=12,
+                 fontsize=9, fontweight='bold', color='#1f77b4')
+    fig.tight_layout()
+    return fig
+
+
+def collection_targets_figure(chart_data):
+    """Actual collections vs collection target per branch"""
+    fig, _, _ = _clustered_bars(
+        'Logbook Collections vs Targets Comparison', 'Amount', chart_data.index.tolist(),
+        [(chart_data['Total Collections'].values, 'Actual Collections', '#1f77b4'),
+         (chart_data['Collection Target'].values, 'Collection Target', '#ff7f0e')], bar_width=0.35)
+    fig.tight_layout()
+    return fig
+
+
+# --- RENDERED CHART CACHE ---
+# (chart type, fingerprint) -> PNG bytes or Vega-Lite spec, least recently used first
+_charts = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def data_fingerprint(data):
+    """SHA-1 of a DataFrame's values, index and column labels"""
+    sha = hashlib.sha1(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    sha.update(repr((list(data.columns), data.index.name)).encode())
+    return sha.hexdigest()
+
+
+def _render(chart):
+    if not isinstance(chart, Figure):
+        return chart.to_dict()
+    # Closed as soon as it is drawn, even if saving fails
+    try:
+        buffer = io.BytesIO()
+        chart.savefig(buffer, **SAVEFIG_OPTIONS)
+        return _fit_width(buffer.getvalue())
+    finally:
+        chart.clear()
+        plt.close(chart)
+
+
+def _fit_width(png):
+    image = Image.open(io.BytesIO(png))
+    width, height = image.size
+    if width <= MAX_IMAGE_WIDTH:
+        return png
+    # Same resampling st.image applies
+    image = image.resize((MAX_IMAGE_WIDTH, int(1.0 * height * MAX_IMAGE_WIDTH / width)), resample=Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def cached_chart(kind, data, build):
+    """Rendered chart for ``data``: PNG bytes for matplotlib, a Vega-Lite spec dict for Altair.
+
+    ``build`` is only called on a miss; ``kind`` must be unique per builder.
+    """
+    key = (kind, data_fingerprint(data))
+    with _lock:
+        if key in _charts:
+            _charts.move_to_end(key)
+            _stats["hits"] += 1
+            return _charts[key]
+        _stats["misses"] += 1
+    rendered = _render(build())
+    with _lock:
+        _charts[key] = rendered
+        while len(_charts) > MAX_CHARTS:
+            _charts.popitem(last=False)
+            _stats["evictions"] += 1
+    return rendered
+
+
+def chart_cache_info():
+    """Hit/miss/eviction counts, cached chart count and open matplotlib figures"""
+    with _lock:
+        return dict(_stats, cached=len(_charts), open_figures=len(plt.get_fignums()))
+
+
+def clear_chart_cache():
+    """Drop every rendered chart and reset the counters"""
+    with _lock:
+        _charts.clear()
+        for stat in _stats:
+            _stats[stat] = 0
+
@@ -0,0 +1,42 @@
+"""Branch reference data and targets shared by the dashboard and the data layer."""
+
+# --- BRANCH MAPPING ---
+BRANCH_MAPPING = {
+    12936: "BURUBURU BRANCH",
+    27504: "Kentsewe Branch", 
+    63796: "Kiambu Branch",
+    27133: "KIlimani Branch",
+    77791: "Kitengela Branch",
+    8678: "Mombasa Road",
+    75092: "P.C Insurance Agency",
+    59535: "TECH AND DEMO ACCOUNT",
+    75350: "Thika Branch",
+    8550: "TOWN BRANCH",
+    55886: "Utawala Branch"
+}
+
+# --- BRANCH TARGETS ---
+BRANCH_TARGETS = {
+    "BURUBURU BRANCH": {"target": 19000000.00, "mtd_target": 11952952.96},
+    "Kiambu Branch": {"target": 19000000.00, "mtd_target": 11256256.30},
+    "KIlimani Branch": {"target": 16000000.00, "mtd_target": 10074074.07},
+    "Kitengela Branch": {"target": 7000000.00, "mtd_target": 4407407.41},
+    "Thika Branch": {"target": 7000000.00, "mtd_target": 4407407.41},
+    "TOWN BRANCH": {"target": 19000000.00, "mtd_target": 11952952.96},
+    "Utawala Branch": {"target": 19000000.00, "mtd_target": 11952952.96}
+}
+
+# --- LOGBOOK COLLECTION TARGETS ---
+LOGBOOK_COLLECTION_TARGETS = {
+    "BURUBURU BRANCH": 17656540.5,
+    "Kiambu Branch": 11088520.2,
+    "KIlimani Branch": 13803121.6,
+    "Thika Branch": 1049290.77,
+    "TOWN BRANCH": 18708150.1,
+    "Utawala Branch": 8869743.78
+}
+
+
+def get_branch_name(branch_id):
+    """Convert branch ID to branch name"""
+    return BRANCH_MAPPING.get(branch_id, f"Branch {branch_id}")
@@ -0,0 +1,770 @@
+"""Cached loaders for the dashboard data sources.
+
+Each source file is parsed once per file version and the parsed frame is
+served to every page and tab until the file changes on disk. Frames returned
+from here are shared, so callers must copy before adding or changing columns.
+
+Excel workbooks are ingested once per version into a typed Parquet snapshot
+(dates parsed, branch ids mapped to names, ``SCHEMAS`` dtypes applied) under
+``SNAPSHOT_DIR``; pages then read only the columns they need from the snapshot
+instead of re-running openpyxl. Run ``python data_loader.py`` to ingest every
+workbook ahead of time. Repeated strings are held as categoricals and ids and
+whole-shilling amounts are downcast (see ``SCHEMAS``), so cast or copy before
+doing arithmetic that needs float64.
+
+The repayments CSV is an append-only Loandisk export: once loaded, only the
+bytes appended after the last seen offset are parsed and folded into the
+cached frame (see ``appended_rows`` for consumers that update incrementally).
+
+``prefetch_sources`` parses several sources at once in a process pool (each
+workbook, the repayments CSV and each export file is an independent task) so
+a cold start or refresh waits for the slowest source instead of all of them.
+
+A source can instead be a directory of overlapping exports (daily deltas plus
+occasional full dumps) under ``EXPORT_DIR``, e.g. ``exports/zidisha/``. The
+exports are merged into one frame keyed on the source's natural key
+(``NATURAL_KEYS``), later exports replacing earlier versions of a row; see
+``load_merged``.
+"""
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import timings
+from config import get_branch_name
+
+# --- SOURCE FILES ---
+LOGBOOK_DISBURSEMENTS = "logbook_disbursements.xlsx"
+LOGBOOK_REPAYMENTS = "logbookrepayments.csv"
+ZIDISHA = "zidisha.xlsx"
+
+SOURCES = [LOGBOOK_DISBURSEMENTS, LOGBOOK_REPAYMENTS, ZIDISHA]
+SNAPSHOT_SOURCES = [LOGBOOK_DISBURSEMENTS, ZIDISHA]
+APPEND_SOURCES = [LOGBOOK_REPAYMENTS]
+
+SNAPSHOT_DIR = ".snapshots"
+EXPORT_DIR = "exports"
+
+# --- COLUMNS READ BY THE DASHBOARD PAGES ---
+LOGBOOK_DISBURSEMENT_COLUMNS = ['Branch', 'Branch Name', 'Disbursed Date', 'Disbursed', 'Outstanding', 'Principal']
+# Per-loan columns the PAR engine reads (see ``par``)
+LOGBOOK_LOAN_COLUMNS = [
+    'Loan Id', 'Branch Name', 'LoanOfficer', 'Disbursed Date', 'Maturity',
+    'Outstanding', 'Paid', 'Principal'
+]
+ZIDISHA_COLUMNS = [
+    'Branch Name', 'Client Name', 'Loan Officer Name', 'Product Name',
+    'Disbursed On Date', 'Expected Matured On Date', 'Principal Amount',
+    'Total Repayment Derived', 'Total Outstanding Derived', 'Total Expected Repayment Derived'
+]
+
+# --- IN-MEMORY SCHEMA ---
+# Repeated strings are categoricals and ids int32. Zidisha amounts are whole
+# shillings, which float32 holds exactly; Logbook amounts carry cents on
+# balances above float32's exact range, so they stay float64. Every cast is
+# skipped when it would change a value (e.g. an id beyond int32).
+SCHEMAS = {
+    LOGBOOK_DISBURSEMENTS: {
+        'Branch Name': 'category', 'Loan Product': 'category', 'Product': 'category', 'Interest Rate': 'category',
+        'Status': 'category', 'Status.1': 'category', 'Sales Agent': 'category', 'Sales Person': 'category',
+        'LoanOfficer': 'category',
+    },
+    LOGBOOK_REPAYMENTS: {
+        'repayment_id': 'int32', 'loan_id': 'int32', 'loan_repayment_method_id': 'int32', 'collector_id': 'int32',
+        'branch_id': 'int32', 'Branch Name': 'category',
+    },
+    ZIDISHA: {
+        'Branch Name': 'category', 'Client Name': 'category', 'Loan Officer Name': 'category',
+        'Product Name': 'category', 'Client Id': 'int32', 'Loan ID': 'int32', 'Principal Amount': 'float32',
+        'Total Repayment Derived': 'float32', 'Total Outstanding Derived': 'float32',
+        'Total Expected Repayment Derived': 'float32', 'Penalties Overdue Derived': 'float32',
+    },
+}
+# Columns no page reads; they are skipped while parsing
+DROP_COLUMNS = {
+    LOGBOOK_REPAYMENTS: [
+        'Unnamed: 0', 'repayment_backdate', 'repayment_adjust_remaining_schedule',
+        'repayment_adjust_remaining_schedule_pro_rata', 'repayment_manual_composition', 'borrower_access_ids',
+        'repayment_description', 'dea_cash_bank_account', 'custom_field_23214', 'repayment_backdated_date',
+    ],
+}
+# Bump when SCHEMAS, DROP_COLUMNS or the preparers change so existing snapshots are rebuilt
+SCHEMA_VERSION = 2
+# Columns identifying one loan or repayment across exports
+NATURAL_KEYS = {
+    LOGBOOK_DISBURSEMENTS: ['Loan Id'],
+    LOGBOOK_REPAYMENTS: ['repayment_id'],
+    ZIDISHA: ['Loan ID'],
+}
+
+# (path, columns) -> {"signature": (mtime_ns, size), "digest": sha1, "frame": DataFrame}
+_cache = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) for a source file; raises FileNotFoundError if missing.
+
+    For a source merged from an export directory this is the newest mtime of
+    the directory and its exports and their total size, so adding, replacing
+    or removing an export changes it.
+    """
+    files = export_files(path)
+    if not files:
+        info = os.stat(path)
+        return (info.st_mtime_ns, info.st_size)
+    infos = [os.stat(export_dir(path))] + [os.stat(f) for f in files]
+    return (max(i.st_mtime_ns for i in infos), sum(i.st_size for i in infos[1:]))
+
+
+def source_exists(path):
+    """Whether a source file or a directory of its exports is present"""
+    return os.path.exists(path) or bool(export_files(path))
+
+
+def file_digest(path):
+    """Return the SHA-1 of a file's contents"""
+    sha = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+@timings.timed('map branches')
+def map_branch_names(branch_ids):
+    """Map a Series of branch ids to names, calling get_branch_name once per distinct id"""
+    names = {b: get_branch_name(b) for b in pd.unique(branch_ids)}
+    return branch_ids.map(names)
+
+
+def _cast(values, dtype):
+    if dtype == 'category':
+        return values.astype('category')
+    try:
+        cast = values.astype(dtype)
+    except (TypeError, ValueError):
+        return values
+    # Keep the original column if the round trip changes any value
+    return cast if np.array_equal(cast.to_numpy(values.dtype), values.to_numpy(), equal_nan=True) else values
+
+
+def apply_schema(df, schema):
+    """Cast columns to their declared in-memory dtypes where the values allow it"""
+    for col, dtype in schema.items():
+        if col in df and df[col].dtype != dtype:
+            df[col] = _cast(df[col], dtype)
+    return df
+
+
+# --- NORMALISATION ---
+def _prepare_logbook_disbursements(df):
+    with timings.stage('parse dates'):
+        df['Disbursed Date'] = pd.to_datetime(df['Disbursed Date'], format='%d/%m/%Y', errors='coerce')
+        df['Maturity'] = pd.to_datetime(df['Maturity'], format='%d/%m/%Y', errors='coerce')
+    df['Branch Name'] = map_branch_names(df['Branch'])
+    return df
+
+
+def _prepare_logbook_repayments(df):
+    with timings.stage('parse dates'):
+        df['repayment_collected_date'] = pd.to_datetime(df['repayment_collected_date'], format='%d/%m/%Y', errors='coerce')
+    df['Branch Name'] = map_branch_names(df['branch_id'])
+    return df
+
+
+def _prepare_zidisha(df):
+    with timings.stage('parse dates'):
+        df['Disbursed On Date'] = pd.to_datetime(df['Disbursed On Date'], errors='coerce')
+        df['Expected Matured On Date'] = pd.to_datetime(df['Expected Matured On Date'], errors='coerce')
+    return df
+
+
+PREPARERS = {
+    LOGBOOK_DISBURSEMENTS: _prepare_logbook_disbursements,
+    LOGBOOK_REPAYMENTS: _prepare_logbook_repayments,
+    ZIDISHA: _prepare_zidisha,
+}
+
+
+def _read_prepared(path, source=None, typed=True, **kwargs):
+    source = path if source is None else source
+    name = os.path.basename(path)
+    dropped = set(DROP_COLUMNS.get(name, ())) if typed else set()
+    if dropped:
+        kwargs.setdefault("usecols", lambda col: col not in dropped)
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(source, **kwargs)
+    else:
+        df = pd.read_excel(source, **kwargs)
+    prepare = PREPARERS.get(name)
+    df = prepare(df) if prepare else df
+    return apply_schema(df, SCHEMAS.get(name, {})) if typed else df
+
+
+def _read(path):
+    return _read_prepared(path)
+
+
+# --- PARQUET SNAPSHOTS ---
+def snapshot_path(path):
+    """Location of the Parquet snapshot for a source file"""
+    return os.path.join(SNAPSHOT_DIR, os.path.basename(path) + ".parquet")
+
+
+def _snapshot_meta_path(path):
+    return os.path.join(SNAPSHOT_DIR, os.path.basename(path) + ".json")
+
+
+def _read_snapshot_meta(path):
+    try:
+        with open(_snapshot_meta_path(path)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _to_parquet_safe(df):
+    # Loandisk exports mix ints and strings in some object columns (e.g. Borrower#)
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def replace_file(target, write):
+    """Write ``target`` through ``write(tmp_path)`` and move it into place.
+
+    The temp file sits next to ``target`` and is unique to this call, so
+    concurrent writers of the same file (e.g. a precompute run next to the
+    app) never publish each other's half-written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target) or ".", prefix=os.path.basename(target) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def ingest(path, digest=None):
+    """Parse a source workbook once and write its typed Parquet snapshot.
+
+    Returns the snapshot metadata (source digest and ingestion timing).
+    """
+    signature = file_signature(path)
+    digest = digest or file_digest(path)
+    start = time.perf_counter()
+    df = _to_parquet_safe(_read(path))
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    replace_file(snapshot_path(path), lambda tmp: df.to_parquet(tmp, index=False))
+    meta = {
+        "source": path,
+        "signature": list(signature),
+        "digest": digest,
+        "rows": len(df),
+        "columns": list(df.columns),
+        "schema_version": SCHEMA_VERSION,
+        "ingest_seconds": round(time.perf_counter() - start, 4),
+    }
+    _write_snapshot_meta(path, meta)
+    return meta
+
+
+def _write_snapshot_meta(path, meta):
+    def write(tmp):
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh, indent=2)
+    replace_file(_snapshot_meta_path(path), write)
+
+
+def _load_snapshot(path, signature, digest, columns):
+    meta = _read_snapshot_meta(path)
+    current = meta is not None and os.path.exists(snapshot_path(path)) and (
+        meta.get("schema_version") == SCHEMA_VERSION
+    ) and (tuple(meta["signature"]) == signature or meta["digest"] == digest)
+    if not current:
+        ingest(path, digest)
+    return pd.read_parquet(snapshot_path(path), columns=list(columns) if columns else None)
+
+
+# --- INCREMENTAL APPEND INGESTION ---
+# path -> {"offset", "tail_digest", "columns", "frame", "max_repayment_id",
+#          "last_system_date", "parent", "delta"}
+_append_state = {}
+# Serialises loads of appended exports, so rows appended once are folded in once;
+# ``_lock`` is only taken to swap in the new state
+_append_lock = threading.Lock()
+_TAIL_CHECK_BYTES = 4096
+# Loandisk mixes '01/10/2025 04:36' and '21/10/2025 2:16pm'
+SYSTEM_DATE_FORMATS = ('%d/%m/%Y %H:%M', '%d/%m/%Y %I:%M%p')
+
+
+def _read_complete_lines(path, start):
+    """Bytes from ``start`` up to the last newline, and the offset just past it"""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read()
+    end = data.rfind(b"\n") + 1
+    return data[:end], start + end
+
+
+def _tail_digest(path, offset):
+    # Hash of the bytes just before ``offset``: if they are unchanged the file was
+    # only appended to, so there is no need to re-hash or re-parse the history.
+    with open(path, "rb") as fh:
+        fh.seek(max(0, offset - _TAIL_CHECK_BYTES))
+        return hashlib.sha1(fh.read(min(offset, _TAIL_CHECK_BYTES))).hexdigest()
+
+
+def _parse_system_dates(values):
+    """Datetimes of loandisk_system_date strings; unparseable values become NaT"""
+    parsed = pd.to_datetime(values, format=SYSTEM_DATE_FORMATS[0], errors='coerce')
+    for fmt in SYSTEM_DATE_FORMATS[1:]:
+        # Each later format is only tried on the values the earlier ones missed
+        missed = parsed.isna() & values.notna()
+        if missed.any():
+            parsed = parsed.fillna(pd.to_datetime(values[missed], format=fmt, errors='coerce'))
+    return parsed
+
+
+def _last_system_date(df, previous=None):
+    if 'loandisk_system_date' not in df or df.empty:
+        return previous
+    latest = _parse_system_dates(df['loandisk_system_date']).max()
+    if pd.isna(latest):
+        return previous
+    return latest if previous is None else max(latest, previous)
+
+
+def _full_append_load(path):
+    data, offset = _read_complete_lines(path, 0)
+    frame = _read_prepared(path, io.BytesIO(data))
+    return {
+        "offset": offset,
+        "tail_digest": _tail_digest(path, offset),
+        "columns": list(pd.read_csv(io.BytesIO(data), nrows=0).columns),
+        "frame": frame,
+        "max_repayment_id": frame['repayment_id'].max() if len(frame) else None,
+        "last_system_date": _last_system_date(frame),
+        "parent": None,
+        "delta": None,
+    }
+
+
+def _drop_seen_repayments(delta, state):
+    if state["max_repayment_id"] is None:
+        return delta
+    # Ids mostly increase, so only rows at or below the high-water mark need a lookup
+    older = delta['repayment_id'] <= state["max_repayment_id"]
+    if not older.any():
+        return delta
+    frame = state["frame"]
+    seen = frame.loc[frame['repayment_id'].isin(delta.loc[older, 'repayment_id']), 'repayment_id']
+    return delta[~delta['repayment_id'].isin(seen)]
+
+
+def _widen_categories(frame, delta):
+    """``frame`` with its categoricals extended by values first seen in ``delta``"""
+    widened = {}
+    for col in frame.columns[frame.dtypes == 'category']:
+        if col in delta:
+            new = pd.Index(delta[col].dropna().unique()).difference(frame[col].cat.categories)
+            if len(new):
+                widened[col] = frame[col].cat.add_categories(new)
+    return frame.assign(**widened) if widened else frame
+
+
+def _cast_like(delta, frame):
+    """``delta`` with ``frame``'s dtypes, or None if a column's values do not fit them"""
+    cast = {}
+    for col, dtype in frame.dtypes.items():
+        if col not in delta or delta[col].dtype == dtype:
+            continue
+        if isinstance(dtype, pd.CategoricalDtype):
+            # The categories were widened to include the delta's values
+            values = delta[col].astype(dtype)
+        else:
+            values = _cast(delta[col], dtype)
+        if values.dtype != dtype:
+            return None
+        cast[col] = values
+    return delta.assign(**cast) if cast else delta
+
+
+def _fold_append(path, state, data, offset):
+    """New state with the rows in ``data`` appended to ``state``'s frame, or None if they do not fit its dtypes"""
+    delta = _read_prepared(path, io.BytesIO(data), header=None, names=state["columns"])
+    previous = state["frame"]
+    widened = _widen_categories(previous, delta)
+    delta = _cast_like(delta, widened)
+    if delta is None:
+        return None
+    delta = _drop_seen_repayments(delta, state)
+    return dict(
+        state,
+        offset=offset,
+        tail_digest=_tail_digest(path, offset),
+        frame=pd.concat([widened, delta], ignore_index=True) if len(delta) else previous,
+        max_repayment_id=max(state["max_repayment_id"], delta['repayment_id'].max()) if len(delta) else state["max_repayment_id"],
+        last_system_date=_last_system_date(delta, state["last_system_date"]),
+        parent=previous,
+        delta=delta,
+    )
+
+
+def _load_appended(path, signature):
+    """Frame for an append-only CSV, parsing only rows added since the last load"""
+    with _lock:
+        state = _append_state.get(path)
+    size = signature[1]
+    if state is None or size < state["offset"] or _tail_digest(path, state["offset"]) != state["tail_digest"]:
+        state = _full_append_load(path)
+    else:
+        data, offset = _read_complete_lines(path, state["offset"])
+        if not data:
+            return state["frame"]
+        # Rows that do not fit the loaded dtypes (e.g. an id beyond int32) need a full reload
+        state = _fold_append(path, state, data, offset) or _full_append_load(path)
+    with _lock:
+        _append_state[path] = state
+    return state["frame"]
+
+
+def appended_rows(path, previous):
+    """Rows appended to ``previous`` to produce the current frame for ``path``.
+
+    Returns None when the current frame is not a single append on top of
+    ``previous`` (first load, full reload, or several appends in between), in
+    which case callers should rebuild from the full frame.
+    """
+    with _lock:
+        state = _append_state.get(path)
+        if state is not None and state["parent"] is previous and state["delta"] is not None:
+            return state["delta"]
+    return None
+
+
+def append_watermark(path=LOGBOOK_REPAYMENTS):
+    """Byte offset, highest repayment_id and latest loandisk_system_date ingested so far"""
+    with _lock:
+        state = _append_state.get(path)
+        if state is None:
+            return None
+        return {key: state[key] for key in ("offset", "max_repayment_id", "last_system_date")}
+
+
+# --- MULTI-EXPORT MERGE ---
+# export file -> {"signature", "frame"}: each export is parsed once per version
+_export_frames = {}
+# source -> report of its last merge
+_merge_reports = {}
+EXPORT_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+def export_dir(path):
+    """Directory of exports merged into a source, e.g. exports/zidisha for zidisha.xlsx"""
+    return os.path.join(EXPORT_DIR, os.path.splitext(os.path.basename(path))[0])
+
+
+def export_files(path):
+    """Exports of a source in the order they are applied (file name order)"""
+    directory = export_dir(path)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(EXPORT_EXTENSIONS) and not name.startswith(('.', '~$'))]
+
+
+def _export_signature(export):
+    info = os.stat(export)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _parse_export(path, export):
+    return {"signature": _export_signature(export), "frame": _read_prepared(path, export)}
+
+
+def _read_export(path, export):
+    with _lock:
+        entry = _export_frames.get(export)
+    if entry is None or entry["signature"] != _export_signature(export):
+        entry = _parse_export(path, export)
+        with _lock:
+            _export_frames[export] = entry
+    return entry["frame"]
+
+
+def merge_exports(path, frames):
+    """One row per natural key from ``frames`` (oldest export first), keeping each key's last version.
+
+    Rows with a missing key cannot be matched across exports and are all
+    kept. Duplicates are found by hashing the key columns and then the whole
+    row, so the merge is linear in the number of rows read. Returns the merged
+    frame and a report of rows read, kept, identical repeats dropped and
+    amended rows (keys whose content changed between versions).
+    """
+    name = os.path.basename(path)
+    keys = NATURAL_KEYS[name]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+    keyed = df[keys].notna().all(axis=1).to_numpy()
+    key_hash = pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    superseded = keyed & pd.Series(key_hash).duplicated(keep='last').to_numpy()
+    # Identical repeats of a version vs older versions of an amended row
+    repeats = keyed & pd.DataFrame({'key': key_hash, 'row': row_hash}).duplicated(keep='last').to_numpy()
+    amended_keys = pd.unique(key_hash[superseded & ~repeats])
+    merged = df[~superseded].reset_index(drop=True)
+    # Exports can disagree on category sets or fail a downcast, which concat widens
+    merged = apply_schema(merged, SCHEMAS.get(name, {}))
+    report = {
+        "files": len(frames),
+        "rows_read": len(df),
+        "rows": len(merged),
+        "repeats_dropped": int(repeats.sum()),
+        "versions_replaced": int((superseded & ~repeats).sum()),
+        "amended_rows": len(amended_keys),
+    }
+    return merged, report
+
+
+def load_merged(path):
+    """The consolidated frame for a source from every export in its export directory"""
+    start = time.perf_counter()
+    files = export_files(path)
+    if not files:
+        raise FileNotFoundError(export_dir(path))
+    merged, report = merge_exports(path, [_read_export(path, export) for export in files])
+    report.update(exports=[os.path.basename(f) for f in files],
+                  merge_seconds=round(time.perf_counter() - start, 4))
+    with _lock:
+        _merge_reports[path] = report
+    return merged
+
+
+def merge_report(path):
+    """Report of the last merge of a source's exports, or None"""
+    with _lock:
+        return _merge_reports.get(path)
+
+
+def load_source(path, columns=None):
+    """Return the prepared frame for a source file, re-parsing only on a new version.
+
+    ``columns`` limits the frame to the listed columns; for workbooks only those
+    columns are read from the Parquet snapshot. The cheap (mtime, size)
+    signature is checked first; if it changed, the content hash decides whether
+    the file really differs (e.g. a re-copied export with identical bytes keeps
+    the cached frame). A source with an export directory is merged from its
+    exports instead.
+    """
+    key = (path, tuple(columns) if columns else None)
+    signature = file_signature(path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["signature"] == signature:
+            _stats["hits"] += 1
+            return entry["frame"]
+
+    if export_files(path):
+        # One merge per version, shared by every column subset
+        frame = load_source(path)[list(columns)] if columns else load_merged(path)
+        with _lock:
+            _cache[key] = {"signature": signature, "digest": None, "frame": frame}
+            _stats["misses"] += 1
+        return frame
+
+    if os.path.basename(path) in APPEND_SOURCES:
+        # Appended exports are never re-hashed in full; the tail check decides
+        # between folding in the new rows and a full reload.
+        with _append_lock:
+            frame = _load_appended(path, signature)
+        if columns:
+            frame = frame[list(columns)]
+        with _lock:
+            _cache[key] = {"signature": signature, "digest": None, "frame": frame}
+            _stats["misses"] += 1
+        return frame
+
+    digest = file_digest(path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["digest"] == digest:
+            entry["signature"] = signature
+            _stats["hits"] += 1
+            return entry["frame"]
+
+    if os.path.basename(path) in SNAPSHOT_SOURCES:
+        frame = _load_snapshot(path, signature, digest, columns)
+    else:
+        frame = _read(path)
+        if columns:
+            frame = frame[list(columns)]
+    with _lock:
+        _cache[key] = {"signature": signature, "digest": digest, "frame": frame}
+        _stats["misses"] += 1
+    return frame
+
+
+def read_source(path):
+    """Prepared frame of a source file with every column, without keeping it in the frame cache.
+
+    For one-off full reads (e.g. partitioning a workbook) next to the
+    column-pruned frames the pages hold; workbooks are read straight from
+    their snapshot. Other sources go through ``load_source``.
+    """
+    if os.path.basename(path) not in SNAPSHOT_SOURCES or export_files(path):
+        return load_source(path)
+    signature = file_signature(path)
+    meta = _read_snapshot_meta(path)
+    # The content hash is only needed when the file's signature moved
+    unchanged = meta is not None and tuple(meta.get("signature", ())) == signature
+    return _load_snapshot(path, signature, meta["digest"] if unchanged else file_digest(path), None)
+
+
+def load_logbook_disbursements(columns=None):
+    """Logbook disbursements export (Loandisk)"""
+    return load_source(LOGBOOK_DISBURSEMENTS, columns)
+
+
+def load_logbook_repayments(columns=None):
+    """Logbook repayments export (Loandisk)"""
+    return load_source(LOGBOOK_REPAYMENTS, columns)
+
+
+def load_zidisha(columns=None):
+    """Zidisha loans export, including the Advans Branch rows"""
+    return load_source(ZIDISHA, columns)
+
+
+def _refresh_snapshot(path):
+    """Snapshot metadata of a workbook, ingesting it first if the snapshot is stale"""
+    meta = _read_snapshot_meta(path)
+    digest = file_digest(path)
+    if meta is not None and meta["digest"] == digest and meta.get("schema_version") == SCHEMA_VERSION \
+            and os.path.exists(snapshot_path(path)):
+        signature = list(file_signature(path))
+        if meta["signature"] != signature:
+            # Same bytes under a new mtime (e.g. re-copied): record it so the signature check passes next time
+            meta = dict(meta, signature=signature)
+            _write_snapshot_meta(path, meta)
+        return meta
+    return ingest(path, digest)
+
+
+def ingest_all(workers=1):
+    """Refresh the Parquet snapshot of every workbook whose source changed, ``workers`` at a time"""
+    paths = sorted((path for path in SNAPSHOT_SOURCES if os.path.exists(path)), key=os.path.getsize, reverse=True)
+    return dict(zip(paths, _run_tasks(_refresh_snapshot, [(path,) for path in paths], workers)))
+
+
+# --- PARALLEL INGESTION ---
+# Parsing is CPU-bound (openpyxl), so sources are parsed in separate processes.
+# Workers are spawned rather than forked: forking the threaded Streamlit
+# server can deadlock the child.
+INGEST_WORKERS = min(len(SOURCES), os.cpu_count() or 1)
+
+
+def _run_tasks(fn, tasks, workers):
+    """``fn(*task)`` for each task, ``workers`` at a time; this process runs the first task itself"""
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(*task) for task in tasks]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)) - 1, mp_context=context) as pool:
+        futures = [pool.submit(fn, *task) for task in tasks[1:]]
+        first = fn(*tasks[0])
+        return [first] + [future.result() for future in futures]
+
+
+def _task_size(task):
+    kind, path, export = task
+    return os.path.getsize(export or path)
+
+
+def _parse_task(kind, path, export):
+    # Runs in a worker; returns only picklable results
+    if kind == "export":
+        return _parse_export(path, export)
+    if kind == "append":
+        return _full_append_load(path)
+    return _refresh_snapshot(path)
+
+
+def _pending_tasks(path):
+    """Parse work still needed before ``load_source(path)`` can be served without parsing"""
+    files = export_files(path)
+    if files:
+        with _lock:
+            cached = {export: entry["signature"] for export, entry in _export_frames.items()}
+        return [("export", path, export) for export in files if cached.get(export) != _export_signature(export)]
+    name = os.path.basename(path)
+    if not os.path.exists(path):
+        return []
+    if name in APPEND_SOURCES:
+        # Once loaded, appended rows are folded in faster than a full parse
+        with _lock:
+            return [] if path in _append_state else [("append", path, None)]
+    if name in SNAPSHOT_SOURCES:
+        meta = _read_snapshot_meta(path)
+        current = meta is not None and tuple(meta["signature"]) == file_signature(path) \
+            and meta.get("schema_version") == SCHEMA_VERSION and os.path.exists(snapshot_path(path))
+        return [] if current else [("snapshot", path, None)]
+    return []
+
+
+def prefetch_sources(paths=SOURCES, workers=INGEST_WORKERS):
+    """Parse the given sources concurrently so the next ``load_source`` of each needs no parsing.
+
+    Workbooks are ingested into their Parquet snapshots by the workers; the
+    typed frames of the repayments CSV and of export files come back to this
+    process and are cached. Returns the wall-clock seconds and tasks run.
+    """
+    start = time.perf_counter()
+    # Largest first, so the longest parse starts straight away
+    tasks = sorted((task for path in paths for task in _pending_tasks(path)), key=_task_size, reverse=True)
+    results = _run_tasks(_parse_task, tasks, workers)
+    with _lock:
+        for (kind, path, export), result in zip(tasks, results):
+            if kind == "export":
+                _export_frames[export] = result
+            elif kind == "append":
+                _append_state[path] = result
+    return {"tasks": [(kind, export or path) for kind, path, export in tasks],
+            "workers": min(workers, len(tasks)), "seconds": round(time.perf_counter() - start, 4)}
+
+
+def clear_cache():
+    """Drop every cached frame and reset the hit/miss counters"""
+    with _lock:
+        _cache.clear()
+        _append_state.clear()
+        _export_frames.clear()
+        _merge_reports.clear()
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def cache_info():
+    """Return hit/miss counts and the cached paths"""
+    with _lock:
+        return {"hits": _stats["hits"], "misses": _stats["misses"],
+                "cached": sorted({path for path, _ in _cache})}
+
+
+if __name__ == "__main__":
+    for source, meta in ingest_all(INGEST_WORKERS).items():
+        print(f"{source}: {meta['rows']} rows -> {snapshot_path(source)} ({meta['ingest_seconds']}s)")
@@ -0,0 +1,117 @@
+"""Drill-down indexes: unit -> branch -> officer/collector -> rows.
+
+Each unit's rows (Logbook repayments, Zidisha loans) get one index built at
+load time. Rows are grouped into *leaves*, one per (branch, officer or
+collector), sorted by branch then officer/collector. Within a leaf, row
+positions are sorted by date. The index keeps:
+
+- those positions;
+- a sorted ``leaf * KEY_SPAN + yyyymmdd`` key per position;
+- a running sum of the value column in the same order.
+
+A branch is therefore a contiguous run of leaves, and a leaf's rows in any
+period are one binary search away. Drilling into a branch or an officer for
+a period is a gather of exactly the rows shown. A leaderboard is two
+vectorised binary searches per leaf plus a difference of running sums,
+rather than a mask and group-by over the raw frame.
+"""
+import numpy as np
+import pandas as pd
+
+import timings
+from periods import date_keys, day_key
+
+# Larger than any yyyymmdd key + 1, so each leaf's keys stay in their own range
+KEY_SPAN = 10 ** 8
+
+
+# --- INDEX ---
+@timings.timed('aggregate')
+def build_drill_index(df, levels, date_col, value_col):
+    """Drill-down index of ``df`` over ``levels`` (e.g. ['Branch Name', 'collector_id']) by ``date_col``.
+
+    Returns ``{'levels', 'date_col', 'value_col', 'leaves', 'keys',
+    'positions', 'prefix'}``. ``leaves`` has one row per leaf with its level
+    values and the ``lo``/``hi`` range of its rows in ``positions``. Rows
+    without a date sort first in their leaf and are only returned for
+    unbounded periods.
+    """
+    grouped = df.groupby(levels, sort=True, dropna=False, observed=True)
+    codes = grouped.ngroup().to_numpy(dtype=np.int64)
+    leaves = grouped.size().index.to_frame(index=False)
+    # NaT keys are -1; shift so they stay inside their leaf's range
+    keys = codes * KEY_SPAN + date_keys(df[date_col]) + 1
+    positions = np.argsort(keys, kind='stable')
+    keys = keys[positions]
+    values = df[value_col].astype('float64').fillna(0).to_numpy()[positions]
+    starts = np.arange(len(leaves), dtype=np.int64) * KEY_SPAN
+    leaves['lo'] = np.searchsorted(keys, starts, 'left')
+    leaves['hi'] = np.searchsorted(keys, starts + KEY_SPAN, 'left')
+    return {
+        'levels': list(levels),
+        'date_col': date_col,
+        'value_col': value_col,
+        'leaves': leaves,
+        'keys': keys,
+        'positions': positions,
+        'prefix': np.concatenate([[0.0], np.cumsum(values)]),
+    }
+
+
+def _select_leaves(index, path=(), branches=None, except_branches=None):
+    """Row numbers of the leaves under ``path`` (values of the leading levels) and the branch filters"""
+    leaves = index['leaves']
+    mask = np.ones(len(leaves), dtype=bool)
+    for level, value in zip(index['levels'], path):
+        mask &= (leaves[level] == value).to_numpy()
+    branch = leaves[index['levels'][0]]
+    if branches is not None:
+        mask &= branch.isin(list(branches)).to_numpy()
+    if except_branches is not None:
+        mask &= ~branch.isin(list(except_branches)).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def _ranges(index, selected, start=None, end=None):
+    """``lo``/``hi`` bounds in ``positions`` of the selected leaves' rows dated ``start``..``end``"""
+    leaves = index['leaves']
+    lo, hi = leaves['lo'].to_numpy()[selected], leaves['hi'].to_numpy()[selected]
+    base = selected.astype(np.int64) * KEY_SPAN
+    if start is not None:
+        lo = np.searchsorted(index['keys'], base + day_key(start) + 1, 'left')
+    if end is not None:
+        hi = np.searchsorted(index['keys'], base + day_key(end) + 1, 'right')
+    return lo, np.maximum(hi, lo)
+
+
+# --- DRILL-DOWN ---
+@timings.timed('mask')
+def drill_positions(index, path=(), start=None, end=None, branches=None, except_branches=None):
+    """Row positions under ``path`` dated ``start``..``end``, leaf by leaf in date order"""
+    lo, hi = _ranges(index, _select_leaves(index, path, branches, except_branches), start, end)
+    parts = [index['positions'][a:b] for a, b in zip(lo, hi) if b > a]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def drill_rows(df, index, path=(), start=None, end=None, branches=None, except_branches=None):
+    """Rows of ``df`` under ``path`` (e.g. ``('TOWN BRANCH', 1234)``) dated ``start``..``end``"""
+    return df.take(drill_positions(index, path, start, end, branches, except_branches))
+
+
+@timings.timed('aggregate')
+def leaderboard(index, level, start=None, end=None, path=(), branches=None, except_branches=None, n=10):
+    """Largest value totals per ``level`` value for rows dated ``start``..``end``, like ``analytics.top_n``.
+
+    Only values with rows in the period are listed; ``n=None`` lists all.
+    Returns the ``level`` and value columns.
+    """
+    selected = _select_leaves(index, path, branches, except_branches)
+    lo, hi = _ranges(index, selected, start, end)
+    # Differences of running sums carry float noise below a cent
+    totals = pd.Series(index['prefix'][hi] - index['prefix'][lo], name=index['value_col']).round(2)
+    has_rows = hi > lo
+    names = index['leaves'][level].to_numpy()[selected]
+    totals = totals[has_rows].groupby(names[has_rows]).sum()
+    totals = totals.sort_values(ascending=False, kind='stable')
+    totals.index.name = level
+    return (totals if n is None else totals.head(n)).reset_index()
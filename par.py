@@ -0,0 +1,228 @@
+"""Portfolio at risk (PAR) for the Logbook loan book.
+
+Days past due are computed per loan from the disbursements export and the
+repayments export joined on ``loan_id``, instead of trusting the export's
+own ``DaysPast``. Each loan repays its total (``Outstanding`` + ``Paid`` in
+the export) in equal instalments due at even steps between its disbursement
+and maturity dates, one per month of the term (at least one). Repayments
+clear instalments oldest first; a loan is past due from the due date of its
+oldest instalment not fully covered by the repayments collected up to the
+reporting date.
+
+PARn is the outstanding principal of the loans more than n days past due
+(PAR1: any day), as an amount and as a share of the outstanding principal
+of every loan disbursed by the reporting date. The outstanding principal is
+the loan's original principal (the export's ``Principal``) less the
+principal repaid up to that date.
+
+The loan book is built once per loaded disbursements version with one row
+per loan and running repayment totals per loan, kept as plain arrays in
+loan order. Rows appended to the repayments export are added to those
+totals without re-reading the history (see ``par_book``), and a reporting
+date before the latest repayment only subtracts the repayments collected
+after it, so aging a 1M-loan book is a handful of array operations.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import timings
+
+# PAR measure -> loans counted when more than this many days past due
+PAR_DAYS = {'par1': 0, 'par30': 30, 'par60': 60, 'par90': 90}
+# Aging bucket -> upper bound of its days past due
+AGING_BUCKETS = {'Current': 0, '1-30': 30, '31-60': 60, '61-90': 90, '90+': np.inf}
+# Term assumed for loans with no maturity date, or one on or before disbursement
+DEFAULT_TERM_DAYS = 30
+DAYS_PER_MONTH = 365.25 / 12
+# Repayment columns the engine reads
+REPAYMENT_COLUMNS = ['loan_id', 'repayment_collected_date', 'repayment_amount', 'principal_repayment_amount']
+
+
+def _days(dates):
+    """Days since the epoch of a datetime Series or Timestamp (NaT -> min int64)"""
+    if isinstance(dates, pd.Series):
+        return dates.to_numpy('datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    return int(np.datetime64(pd.Timestamp(dates).normalize(), 'D').astype(np.int64))
+
+
+# --- LOAN BOOK ---
+def build_loans(df_loans):
+    """One row per loan with its instalment schedule, indexed by loan id.
+
+    ``df_loans`` is the prepared disbursements export with the
+    ``data_loader.LOGBOOK_LOAN_COLUMNS``. Loans without an id or disbursement
+    date (e.g. Loandisk's totals row) are left out; a loan listed twice keeps
+    its last row.
+    """
+    loans = df_loans[df_loans['Loan Id'].notna() & df_loans['Disbursed Date'].notna()]
+    loans = loans.drop_duplicates('Loan Id', keep='last')
+    disbursed = _days(loans['Disbursed Date'])
+    maturity = loans['Maturity']
+    term = np.where(maturity.notna().to_numpy(), _days(maturity) - disbursed, 0)
+    term = np.where(term > 0, term, DEFAULT_TERM_DAYS)
+    instalments = np.maximum(np.rint(term / DAYS_PER_MONTH), 1)
+    total = (loans['Outstanding'].fillna(0) + loans['Paid'].fillna(0)).to_numpy('float64')
+    # 'Principal' is the original principal: Principal - Principal Paid == Principal Balance
+    principal = loans['Principal'].fillna(0).to_numpy('float64')
+    return pd.DataFrame({
+        'branch': loans['Branch Name'].array,
+        'officer': loans['LoanOfficer'].array,
+        'disbursed': disbursed,
+        'term': term,
+        'instalments': instalments,
+        'instalment': total / instalments,
+        'principal': principal,
+    }, index=pd.Index(loans['Loan Id'].to_numpy().astype(np.int64), name='loan_id'))
+
+
+def _repayment_sums(loans, df_coll):
+    """(amount, principal) repaid per loan in ``loans`` order, and the repayments matching no loan"""
+    positions = loans.index.get_indexer(df_coll['loan_id'].to_numpy())
+    matched = positions >= 0
+    positions = positions[matched]
+    sums = [np.bincount(positions, weights=df_coll[col].fillna(0).to_numpy('float64')[matched],
+                        minlength=len(loans))
+            for col in ('repayment_amount', 'principal_repayment_amount')]
+    return sums[0], sums[1], int((~matched).sum())
+
+
+@timings.timed('aggregate')
+def build_book(df_loans, df_coll):
+    """PAR book: the loans with their repayment totals over every row of ``df_coll``"""
+    loans = build_loans(df_loans)
+    paid, principal_paid, unmatched = _repayment_sums(loans, df_coll)
+    return {'loans': loans, 'paid': paid, 'principal_paid': principal_paid,
+            'repayments': df_coll, 'unmatched': unmatched}
+
+
+def fold_repayments(book, delta, df_coll):
+    """New book with the repayments in ``delta`` (rows appended to give ``df_coll``) added to the totals"""
+    paid, principal_paid, unmatched = _repayment_sums(book['loans'], delta)
+    return dict(book, paid=book['paid'] + paid, principal_paid=book['principal_paid'] + principal_paid,
+                repayments=df_coll, unmatched=book['unmatched'] + unmatched)
+
+
+@timings.timed('aggregate')
+def stream_book(df_loans, as_of, path=data_loader.LOGBOOK_REPAYMENTS, chunksize=100_000):
+    """PAR book with repayment totals read from the CSV chunk by chunk, for aging at ``as_of`` only.
+
+    Only repayments collected by ``as_of`` (or undated) are summed, so the
+    book cannot be aged at an earlier date.
+    """
+    loans = build_loans(df_loans)
+    paid, principal_paid, unmatched = np.zeros(len(loans)), np.zeros(len(loans)), 0
+    as_of = pd.Timestamp(as_of).normalize()
+    for chunk in pd.read_csv(path, usecols=REPAYMENT_COLUMNS, chunksize=chunksize,
+                             dtype={'loan_id': 'float64', 'repayment_amount': 'float64',
+                                    'principal_repayment_amount': 'float64'}):
+        dates = pd.to_datetime(chunk['repayment_collected_date'], format='%d/%m/%Y', errors='coerce')
+        chunk = chunk[~(dates > as_of) & chunk['loan_id'].notna()]
+        part = _repayment_sums(loans, chunk.assign(loan_id=chunk['loan_id'].astype(np.int64)))
+        paid, principal_paid, unmatched = paid + part[0], principal_paid + part[1], unmatched + part[2]
+    return {'loans': loans, 'paid': paid, 'principal_paid': principal_paid, 'repayments': None,
+            'unmatched': unmatched}
+
+
+# --- CACHED BOOK ---
+# (loan frame, repayments frame, book); the loader hands out the same frames until a file changes
+_book = {}
+_lock = threading.Lock()
+
+
+def par_book(df_loans, df_coll):
+    """PAR book for these loaded frames.
+
+    When the only change since the cached book is rows appended to the
+    repayments export, just those rows are added to the loans' totals.
+    """
+    with _lock:
+        entry = _book.get('logbook')
+    if entry is not None and entry[0] is df_loans:
+        if entry[1] is df_coll:
+            return entry[2]
+        delta = data_loader.appended_rows(data_loader.LOGBOOK_REPAYMENTS, entry[1])
+        book = None if delta is None else fold_repayments(entry[2], delta, df_coll)
+    else:
+        book = None
+    if book is None:
+        book = build_book(df_loans, df_coll)
+    with _lock:
+        _book['logbook'] = (df_loans, df_coll, book)
+    return book
+
+
+def load_par_book():
+    """PAR book for the currently loaded Logbook sources"""
+    return par_book(data_loader.load_logbook_disbursements(data_loader.LOGBOOK_LOAN_COLUMNS),
+                    data_loader.load_logbook_repayments())
+
+
+# --- AGING ---
+@timings.timed('aggregate')
+def loan_aging(book, as_of):
+    """Branch, officer, days past due and outstanding principal at ``as_of`` of every loan disbursed by then"""
+    loans = book['loans']
+    as_of = pd.Timestamp(as_of).normalize()
+    paid, principal_paid = book['paid'], book['principal_paid']
+    repayments = book['repayments']
+    if repayments is not None and len(repayments):
+        later = repayments[repayments['repayment_collected_date'] > as_of]
+        if len(later):
+            paid_later, principal_later, _ = _repayment_sums(loans, later)
+            paid, principal_paid = paid - paid_later, principal_paid - principal_later
+
+    instalments, instalment = loans['instalments'].to_numpy(), loans['instalment'].to_numpy()
+    # Instalments fully covered, oldest first (a cent of rounding is forgiven)
+    covered = np.where(instalment > 0, np.floor((paid + 0.01) / np.where(instalment > 0, instalment, 1)),
+                       instalments).clip(0)
+    disbursed = loans['disbursed'].to_numpy()
+    due = disbursed + np.ceil(loans['term'].to_numpy() * (covered + 1) / instalments).astype(np.int64)
+    dpd = np.where(covered < instalments, np.maximum(_days(as_of) - due, 0), 0)
+    active = disbursed <= _days(as_of)
+    aging = pd.DataFrame({
+        'branch': loans['branch'].array,
+        'officer': loans['officer'].array,
+        'dpd': dpd,
+        'outstanding': np.maximum(loans['principal'].to_numpy() - principal_paid, 0),
+    }, index=loans.index)
+    return aging[active]
+
+
+def par_summary(aging, by='branch'):
+    """Loans, outstanding principal ('portfolio') and PAR amounts and percentages per ``by`` group.
+
+    Columns: loans, portfolio, then par1/par30/par60/par90 and their
+    ``_pct`` shares of the portfolio (NaN for an empty portfolio).
+    """
+    outstanding = aging['outstanding'].to_numpy()
+    dpd = aging['dpd'].to_numpy()
+    frame = pd.DataFrame({'loans': (outstanding > 0).astype(np.int64), 'portfolio': outstanding}, index=aging.index)
+    for name, days in PAR_DAYS.items():
+        frame[name] = np.where(dpd > days, outstanding, 0.0)
+    table = frame.groupby(aging[by], sort=True, observed=True, dropna=False).sum()
+    table.index.name = None
+    portfolio = table['portfolio'].where(table['portfolio'] > 0)
+    for name in PAR_DAYS:
+        table[f'{name}_pct'] = table[name] / portfolio * 100
+    return table
+
+
+def par_totals(table, groups=None):
+    """Book-wide totals and percentages of a ``par_summary`` table, optionally for some groups only"""
+    table = table if groups is None else table.reindex(list(groups)).dropna(how='all')
+    totals = table[['loans', 'portfolio'] + list(PAR_DAYS)].sum()
+    for name in PAR_DAYS:
+        totals[f'{name}_pct'] = totals[name] / totals['portfolio'] * 100 if totals['portfolio'] > 0 else 0.0
+    return totals
+
+
+def aging_buckets(aging, by='branch'):
+    """Outstanding principal per ``by`` group (rows) and days-past-due bucket (``AGING_BUCKETS`` columns)"""
+    bounds = np.array(list(AGING_BUCKETS.values()))
+    buckets = pd.Categorical.from_codes(np.searchsorted(bounds, aging['dpd'].to_numpy()), list(AGING_BUCKETS))
+    table = aging['outstanding'].groupby([aging[by].array, buckets], observed=True, dropna=False).sum().unstack()
+    table = table.reindex(columns=list(AGING_BUCKETS), fill_value=0.0).fillna(0.0)
+    return table.loc[table.sum(axis=1) > 0] if len(table) else table
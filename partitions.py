@@ -0,0 +1,268 @@
+"""Month-partitioned Parquet store for loan and repayment history.
+
+Each source is split by the month of its partition date column
+(``PARTITIONS``) into one Parquet file per month under ``STORE_DIR``, plus an
+``undated`` partition for rows without a date. A JSON manifest lists the
+partitions with their row counts and the date range each one covers for every
+date column the pages filter on, so a period read opens only the partitions
+that can hold rows in that period, e.g. Zidisha loans maturing in a month are
+found from the few disbursement months whose maturity range overlaps it.
+
+Partition files are named by a hash of their content. Updating the store
+after an export changes rewrites only the months whose rows changed; after an
+append to the repayments export only the months of the appended rows are
+split and hashed at all. A manifest that was read before an update keeps
+pointing at files that still exist: the files of the previous manifest are
+kept until the next update, and files written since it (possibly by a
+concurrent update) are never removed.
+Run ``python partitions.py`` to build or refresh every store ahead of time.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from periods import date_keys
+
+STORE_DIR = ".store"
+STORE_VERSION = 1
+UNDATED = "undated"
+MAX_CACHED_PARTITIONS = 64
+
+# source -> (partition date column, other date columns whose ranges the manifest records)
+PARTITIONS = {
+    data_loader.LOGBOOK_DISBURSEMENTS: ('Disbursed Date', []),
+    data_loader.LOGBOOK_REPAYMENTS: ('repayment_collected_date', []),
+    data_loader.ZIDISHA: ('Disbursed On Date', ['Expected Matured On Date']),
+}
+BRANCH_COLUMN = 'Branch Name'
+
+
+# --- LAYOUT ---
+def store_dir(path):
+    """Directory holding the partitions and manifest of a source file"""
+    return os.path.join(STORE_DIR, os.path.basename(path))
+
+
+def manifest_path(path):
+    return os.path.join(store_dir(path), "manifest.json")
+
+
+def read_manifest(path):
+    """The store manifest of a source file, or None if there is no usable store"""
+    try:
+        with open(manifest_path(path)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("store_version") != STORE_VERSION or \
+            manifest.get("schema_version") != data_loader.SCHEMA_VERSION:
+        return None
+    return manifest
+
+
+def is_current(path, manifest=None):
+    """Whether the store was built from the current version of the source file"""
+    manifest = read_manifest(path) if manifest is None else manifest
+    return manifest is not None and tuple(manifest["signature"]) == data_loader.file_signature(path)
+
+
+# --- WRITING ---
+def _month_keys(dates):
+    """yyyymm of each date, negative where the date is missing"""
+    return date_keys(dates) // 100
+
+
+def _month_name(key):
+    return UNDATED if key < 0 else f"{key // 100:04d}-{key % 100:02d}"
+
+
+def _date_range(dates):
+    dates = dates.dropna()
+    if dates.empty:
+        return None
+    return [dates.min().date().isoformat(), dates.max().date().isoformat()]
+
+
+def _content_hash(part):
+    sha = hashlib.sha1(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    sha.update(repr([(col, str(dtype)) for col, dtype in part.dtypes.items()]).encode())
+    return sha.hexdigest()
+
+
+def _appends_to(previous, df, appended):
+    """Whether ``df`` is the frame the ``previous`` store was built from with ``appended`` added"""
+    return previous is not None and appended is not None and previous["columns"] == list(df.columns) \
+        and previous["rows"] + len(appended) == len(df)
+
+
+def update_store(path, df=None, appended=None):
+    """Bring the month partitions of a source file up to date and return the new manifest.
+
+    ``df`` is the full prepared frame (all columns); it is read when not
+    given, without adding a full-column copy to the loader's frame cache.
+    ``appended`` is the rows added to the frame the current store was built
+    from (see ``data_loader.appended_rows``): only the months they fall in
+    are split and hashed again, the others keep their manifest entries.
+    Only months whose rows changed are written.
+    """
+    signature = data_loader.file_signature(path)
+    directory = store_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    # Taken before the manifest is read, so it is never newer than the manifest read
+    previous_written = os.stat(manifest_path(path)).st_mtime_ns if os.path.exists(manifest_path(path)) else 0
+    previous = read_manifest(path)
+    if is_current(path, previous):
+        return dict(previous, written=[])
+    start = time.perf_counter()
+    df = data_loader.read_source(path) if df is None else df
+    date_col, range_cols = PARTITIONS[os.path.basename(path)]
+    old = (previous or {}).get("partitions", {})
+
+    keys = _month_keys(df[date_col])
+    if _appends_to(previous, df, appended):
+        partitions = dict(old)
+        changed = np.isin(keys, _month_keys(appended[date_col]))
+        keys, rows = keys[changed], df[changed]
+    else:
+        partitions, rows = {}, df
+    written = []
+    for key, labels in pd.Series(keys, index=rows.index).groupby(keys).groups.items():
+        month = _month_name(key)
+        part = data_loader._to_parquet_safe(rows.loc[labels].copy())
+        digest = _content_hash(part)
+        name = f"{month}-{digest[:12]}.parquet"
+        if old.get(month, {}).get("hash") != digest or not os.path.exists(os.path.join(directory, name)):
+            data_loader.replace_file(os.path.join(directory, name), lambda tmp: part.to_parquet(tmp, index=True))
+            written.append(month)
+        partitions[month] = {
+            "file": name,
+            "rows": len(part),
+            "hash": digest,
+            "ranges": {col: _date_range(part[col]) for col in [date_col] + range_cols},
+        }
+
+    manifest = {
+        "source": path,
+        "signature": list(signature),
+        "store_version": STORE_VERSION,
+        "schema_version": data_loader.SCHEMA_VERSION,
+        "partition_column": date_col,
+        "columns": list(df.columns),
+        "rows": len(df),
+        "partitions": dict(sorted(partitions.items())),
+        "written": sorted(written),
+        "update_seconds": round(time.perf_counter() - start, 4),
+    }
+
+    def write(tmp):
+        with open(tmp, "w") as fh:
+            json.dump(manifest, fh, indent=2)
+    data_loader.replace_file(manifest_path(path), write)
+
+    # Readers may still hold the previous manifest, so its files are kept one
+    # more round. Files written after it may belong to a concurrent update
+    # whose manifest is not published yet; only older ones are removed.
+    keep = {p["file"] for p in partitions.values()} | {p["file"] for p in old.values()}
+    for name in os.listdir(directory):
+        file = os.path.join(directory, name)
+        if name.endswith(".parquet") and name not in keep:
+            try:
+                if os.stat(file).st_mtime_ns < previous_written:
+                    os.remove(file)
+            except FileNotFoundError:
+                # Removed by a concurrent update
+                pass
+    return manifest
+
+
+# --- READING ---
+# (store directory, file) -> frame; files are content-addressed, so entries never go stale
+_partitions = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "reads": 0}
+
+
+def _read_partition(directory, name):
+    key = (directory, name)
+    with _lock:
+        if key in _partitions:
+            _partitions.move_to_end(key)
+            _stats["hits"] += 1
+            return _partitions[key]
+    frame = pd.read_parquet(os.path.join(directory, name))
+    with _lock:
+        _partitions[key] = frame
+        _stats["reads"] += 1
+        while len(_partitions) > MAX_CACHED_PARTITIONS:
+            _partitions.popitem(last=False)
+    return frame
+
+
+def partitions_for(manifest, start, end, date_col=None):
+    """Names of the partitions that can hold rows with ``start <= date_col <= end``"""
+    date_col = date_col or manifest["partition_column"]
+    start, end = pd.Timestamp(start).date().isoformat(), pd.Timestamp(end).date().isoformat()
+    names = []
+    for month, entry in manifest["partitions"].items():
+        bounds = entry["ranges"].get(date_col)
+        if bounds is not None and bounds[0] <= end and bounds[1] >= start:
+            names.append(month)
+    return names
+
+
+def read_period(manifest, start, end, date_col=None, columns=None, branches=None, except_branches=None):
+    """Rows dated ``start``..``end`` (inclusive) on ``date_col``, read from the partitions that hold them.
+
+    Defaults to the partition column. ``branches`` keeps only those
+    'Branch Name' values and ``except_branches`` drops them. Rows keep their
+    source index and order.
+    """
+    date_col = date_col or manifest["partition_column"]
+    directory = os.path.dirname(manifest_path(manifest["source"]))
+    frames = [_read_partition(directory, manifest["partitions"][month]["file"])
+              for month in partitions_for(manifest, start, end, date_col)]
+    if not frames:
+        return pd.DataFrame(columns=list(manifest["columns"] if columns is None else columns))
+    df = pd.concat(frames).sort_index() if len(frames) > 1 else frames[0]
+    days = df[date_col].dt.normalize()
+    mask = (days >= pd.Timestamp(start).normalize()) & (days <= pd.Timestamp(end).normalize())
+    if branches is not None:
+        mask &= df[BRANCH_COLUMN].isin(list(branches))
+    if except_branches is not None:
+        mask &= ~df[BRANCH_COLUMN].isin(list(except_branches))
+    df = df.loc[mask, df.columns if columns is None else list(columns)]
+    # Partitions written at different times can disagree on category sets
+    schema = data_loader.SCHEMAS.get(os.path.basename(manifest["source"]), {})
+    return data_loader.apply_schema(df, {col: dtype for col, dtype in schema.items() if col in df})
+
+
+def store_info():
+    """Partition cache hits/reads and the partitions cached"""
+    with _lock:
+        return dict(_stats, cached=len(_partitions))
+
+
+def clear_cache():
+    """Drop every cached partition and reset the counters"""
+    with _lock:
+        _partitions.clear()
+        _stats["hits"] = 0
+        _stats["reads"] = 0
+
+
+def update_all():
+    """Refresh the store of every source file present on disk"""
+    return {path: update_store(path) for path in PARTITIONS if data_loader.source_exists(path)}
+
+
+if __name__ == "__main__":
+    for source, manifest in update_all().items():
+        print(f"{source}: {manifest['rows']} rows in {len(manifest['partitions'])} partitions, "
+              f"{len(manifest['written'])} written -> {store_dir(source)} ({manifest['update_seconds']}s)")
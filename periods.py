@@ -0,0 +1,120 @@
+"""Reporting periods and sorted date indexes.
+
+A period index stores each row's date as an integer ``yyyymmdd`` key (year-month
+is ``key // 100``, day-of-month ``key % 100``) and the row positions sorted by
+key, optionally partitioned by columns such as ('unit', 'metric'). The daily
+cube gets one (see ``aggregates.cube_index``), so a period slice is two binary
+searches per partition plus the rows returned, instead of a date mask over
+the whole frame. Raw loan rows for a period are read from the month
+partitions instead (see ``partitions.read_period``).
+"""
+import numpy as np
+import pandas as pd
+
+import timings
+
+
+# --- REPORTING PERIODS ---
+def month_bounds(day):
+    """First and last day of the month containing ``day``"""
+    start = pd.Timestamp(day).normalize().replace(day=1)
+    return start, start + pd.offsets.MonthEnd(0)
+
+
+def previous_month_bounds(day):
+    """First and last day of the month before the one containing ``day``"""
+    start, _ = month_bounds(day)
+    return month_bounds(start - pd.Timedelta(days=1))
+
+
+def same_period_last_month(day):
+    """Days 1..day-of-month of the previous month, clipped to its last day"""
+    day = pd.Timestamp(day).normalize()
+    start, end = previous_month_bounds(day)
+    return start, min(start + pd.Timedelta(days=day.day - 1), end)
+
+
+def recent_months(today=None, count=24):
+    """First days of the ``count`` months up to the one containing ``today``, newest first"""
+    start, _ = month_bounds(pd.Timestamp.today() if today is None else today)
+    return [start - pd.DateOffset(months=i) for i in range(count)]
+
+
+def reporting_period(start, end, today=None):
+    """A reporting period: inclusive ``start``/``end``, the ``as_of`` date KPIs are reported at and a label.
+
+    ``as_of`` is ``end`` clipped to today, so a running month reports month-to-date.
+    ``month`` is the month's first day when the period is exactly one calendar
+    month, otherwise None.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+    month_start, month_end = month_bounds(start)
+    whole_month = start == month_start and end == month_end
+    if whole_month:
+        label = start.strftime('%B %Y')
+    else:
+        label = f"{start.strftime('%d %b %Y')} – {end.strftime('%d %b %Y')}"
+    return {
+        'start': start,
+        'end': end,
+        'as_of': max(min(end, today), start),
+        'month': start if whole_month else None,
+        'label': label,
+    }
+
+
+def month_period(month, today=None):
+    """Reporting period for the calendar month containing ``month``"""
+    return reporting_period(*month_bounds(month), today=today)
+
+
+# --- PERIOD INDEX ---
+def date_keys(dates):
+    """``yyyymmdd`` integer keys for a datetime Series; NaT becomes -1"""
+    dates = pd.to_datetime(pd.Series(dates))
+    keys = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return keys.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def day_key(day):
+    """``yyyymmdd`` integer key of a single date, matching ``date_keys``"""
+    day = pd.Timestamp(day)
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def build_period_index(df, date_col, by=None):
+    """Row positions of ``df`` sorted by ``date_col`` (within each ``by`` value).
+
+    Returns ``{'keys', 'positions', 'groups'}`` where ``groups`` maps each
+    ``by`` value (None when not partitioned) to its ``[lo, hi)`` range. With a
+    list of columns for ``by`` the groups are keyed by tuples of their values.
+    """
+    keys = date_keys(df[date_col])
+    if by is None:
+        codes, uniques = np.zeros(len(df), dtype=np.int64), [None]
+    elif isinstance(by, (list, tuple)):
+        codes, uniques = pd.MultiIndex.from_arrays([df[col] for col in by]).factorize()
+    else:
+        codes, uniques = pd.factorize(df[by], use_na_sentinel=False)
+    positions = np.lexsort((keys, codes))
+    bounds = np.searchsorted(codes[positions], np.arange(len(uniques) + 1))
+    return {
+        'keys': keys[positions],
+        'positions': positions,
+        'groups': {group: (bounds[i], bounds[i + 1]) for i, group in enumerate(uniques)},
+    }
+
+
+@timings.timed('mask')
+def period_positions(index, start, end, groups=None):
+    """Sorted row positions with ``start <= date <= end``, limited to ``groups`` if given"""
+    lo_key, hi_key = day_key(start), day_key(end)
+    wanted = index['groups'] if groups is None else [g for g in groups if g in index['groups']]
+    parts = []
+    for group in wanted:
+        lo, hi = index['groups'][group]
+        keys = index['keys'][lo:hi]
+        parts.append(index['positions'][lo + np.searchsorted(keys, lo_key, 'left'):
+                                        lo + np.searchsorted(keys, hi_key, 'right')])
+    return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
@@ -0,0 +1,139 @@
+"""Headless precompute of the executive KPIs.
+
+Runs the same KPI computations the dashboard pages use, without Streamlit,
+and writes them to a JSON store that the app reads on first view. The store
+is only used while its reporting date is today and the source files are
+unchanged; otherwise pages compute the KPIs live. Schedule it before office
+hours so the snapshots, cubes and KPIs are warm, e.g. with cron:
+
+    30 6 * * 1-6  cd /srv/exco && python precompute.py
+
+``--stream`` aggregates the repayments CSV (collections and the PAR
+repayment totals) in chunks instead of loading it, keeping memory flat for
+long repayment histories. It also stores the month's collections per
+branch, collector and day from those aggregates ('logbook_repayments').
+"""
+import argparse
+import json
+import os
+
+import pandas as pd
+
+import data_loader
+from aggregates import (
+    build_streamed_logbook_cube, load_logbook_cube, load_zidisha_cube, stream_repayments, streamed_totals,
+)
+from analytics import logbook_kpis, month_totals, period_comparison_kpis
+from par import load_par_book, loan_aging, par_summary, stream_book
+from periods import month_bounds
+from targets import TARGETS_PATH
+
+STORE_PATH = os.path.join(".reports", "kpis.json")
+# Roll-ups of the streamed repayment aggregates stored by --stream
+REPAYMENT_ROLLUPS = ('branch', 'collector_id', 'date')
+
+
+def _rollup_records(rolled):
+    """{key: {'value', 'count'}} of a ``streamed_totals`` roll-up; dates as YYYY-MM-DD, missing keys as 'None'"""
+    return {(key.date().isoformat() if isinstance(key, pd.Timestamp) else 'None' if pd.isna(key) else str(key)):
+            {'value': round(float(row['value']), 2), 'count': int(row['count'])}
+            for key, row in rolled.iterrows()}
+
+
+def repayment_rollups(totals, today):
+    """Collections of the month containing ``today`` per branch, collector and day, as ``logbook_kpis`` counts them"""
+    month_start, month_end = month_bounds(today)
+    totals = totals[(totals['date'] >= month_start) & (totals['date'] <= month_end)]
+    return {by: _rollup_records(streamed_totals(totals, by)) for by in REPAYMENT_ROLLUPS}
+
+
+def compute_kpis(today=None, stream=False):
+    """Every precomputed KPI section; sections whose source file is missing are left out.
+
+    With ``stream`` the Logbook collections are aggregated from the repayments
+    CSV chunk by chunk instead of from the loaded frame, and their month's
+    roll-ups are added.
+    """
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today).normalize()
+    report = {'reporting_date': today.date().isoformat()}
+    try:
+        if stream:
+            totals = stream_repayments()
+            cube = build_streamed_logbook_cube(
+                data_loader.load_logbook_disbursements(data_loader.LOGBOOK_DISBURSEMENT_COLUMNS), totals=totals)
+            report['logbook_repayments'] = repayment_rollups(totals, today)
+            book = stream_book(data_loader.load_logbook_disbursements(data_loader.LOGBOOK_LOAN_COLUMNS), today)
+        else:
+            cube = load_logbook_cube()
+            book = load_par_book()
+        report['logbook'] = logbook_kpis(cube, today, par=par_summary(loan_aging(book, today)))
+    except FileNotFoundError:
+        pass
+    try:
+        zidisha_cube = load_zidisha_cube()
+        report['zidisha'] = period_comparison_kpis(zidisha_cube, 'Zidisha', today)
+        report['advans'] = {
+            'disbursements': month_totals(zidisha_cube, 'Advans', 'disbursed', today),
+            'collections': month_totals(zidisha_cube, 'Advans', 'collections', today),
+        }
+    except FileNotFoundError:
+        pass
+    return report
+
+
+# --- STORE ---
+def source_signatures():
+    """(mtime_ns, size) of each source file and of the targets file present on disk"""
+    signatures = {path: list(data_loader.file_signature(path))
+                  for path in data_loader.SOURCES if data_loader.source_exists(path)}
+    if os.path.exists(TARGETS_PATH):
+        signatures[TARGETS_PATH] = list(data_loader.file_signature(TARGETS_PATH))
+    return signatures
+
+
+def write_store(report, path=STORE_PATH):
+    """Atomically write a KPI report, stamped with the source file signatures"""
+    report = dict(report, generated_at=pd.Timestamp.now().isoformat(timespec='seconds'),
+                  sources=source_signatures())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(tmp):
+        with open(tmp, "w") as fh:
+            json.dump(report, fh, indent=2)
+    data_loader.replace_file(path, write)
+    return report
+
+
+def load_precomputed(section, today=None, path=STORE_PATH):
+    """A KPI section from the store, or None if it is missing or stale"""
+    try:
+        with open(path) as fh:
+            report = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    if report.get('reporting_date') != today.date().isoformat():
+        return None
+    if report.get('sources') != source_signatures():
+        return None
+    return report.get(section)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute Exco dashboard KPIs")
+    parser.add_argument("--date", help="reporting date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--store", default=STORE_PATH, help=f"output file (default: {STORE_PATH})")
+    parser.add_argument("--skip-ingest", action="store_true", help="do not refresh the Parquet snapshots first")
+    parser.add_argument("--stream", action="store_true",
+                        help="aggregate the repayments CSV in chunks instead of loading it whole")
+    args = parser.parse_args(argv)
+
+    if not args.skip_ingest:
+        data_loader.ingest_all(data_loader.INGEST_WORKERS)
+    report = write_store(compute_kpis(args.date, args.stream), args.store)
+    sections = [name for name in ('logbook', 'zidisha', 'advans') if name in report]
+    print(f"{args.store}: {', '.join(sections) or 'no sections'} for {report['reporting_date']}")
+
+
+if __name__ == "__main__":
+    main()
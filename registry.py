@@ -0,0 +1,277 @@
+"""Process-wide dataset registry shared by every Streamlit session.
+
+Streamlit re-runs ``app.py`` for each browser session but imports modules once
+per server process, so the datasets held here are built once and handed to
+every session. A dataset bundles the loaded source frames with everything
+derived from them (aggregate cube, PAR book, drill-down indexes, rolling
+daily series, month-partition store manifests) for one version of its source
+files. Sessions get a read-only mapping; the frames inside are shared and
+must not be modified in place.
+
+``preload`` parses the sources of every missing dataset concurrently (see
+``data_loader.prefetch_sources``) before building them, so a cold start
+waits for the slowest source rather than for each in turn.
+
+Once a dataset is loaded it is never rebuilt on the request path. When its
+source files change (noticed by a page asking for it, or by the watcher
+thread from ``start_watcher``), it is rebuilt on a background thread while
+every session keeps getting the previous version (stale-while-revalidate).
+The new dataset replaces the old one in a single assignment: a session sees
+either the old dataset or the new one, never frames from one version with
+the cube of another. ``dataset_status`` tells pages how fresh the served
+version is.
+"""
+import threading
+import time
+import types
+
+import aggregates
+import data_loader
+import drilldown
+import par
+import partitions
+import timeseries
+import timings
+
+# Seconds between the watcher's checks of the source files
+WATCH_INTERVAL = 30
+
+
+def _build_logbook():
+    df_disb = data_loader.load_logbook_disbursements(data_loader.LOGBOOK_DISBURSEMENT_COLUMNS)
+    df_loans = data_loader.load_logbook_disbursements(data_loader.LOGBOOK_LOAN_COLUMNS)
+    df_coll = data_loader.load_logbook_repayments()
+    cube = aggregates.logbook_cube(df_disb, df_coll)
+    # Rows appended since the served version, whose repayment months are all the store has to redo
+    served = _datasets.get('logbook')
+    appended = None if served is None else data_loader.appended_rows(data_loader.LOGBOOK_REPAYMENTS, served['repayments'])
+    return {
+        'disbursements': df_disb,
+        'repayments': df_coll,
+        'cube': cube,
+        'series': timeseries.logbook_series(df_disb, df_coll, cube),
+        'par': par.par_book(df_loans, df_coll),
+        'collector_index': drilldown.build_drill_index(
+            df_coll, ['Branch Name', 'collector_id'], 'repayment_collected_date', 'repayment_amount'),
+        'disbursements_store': partitions.update_store(data_loader.LOGBOOK_DISBURSEMENTS),
+        'repayments_store': partitions.update_store(data_loader.LOGBOOK_REPAYMENTS, df_coll, appended),
+    }
+
+
+def _build_zidisha():
+    df_zidisha = data_loader.load_zidisha(data_loader.ZIDISHA_COLUMNS)
+    cube = aggregates.zidisha_cube(df_zidisha)
+    return {
+        'loans': df_zidisha,
+        'cube': cube,
+        'series': timeseries.zidisha_series(df_zidisha, cube),
+        'officer_index': drilldown.build_drill_index(
+            df_zidisha, ['Branch Name', 'Loan Officer Name'], 'Disbursed On Date', 'Principal Amount'),
+        'loans_store': partitions.update_store(data_loader.ZIDISHA),
+    }
+
+
+# name -> (source files, builder)
+DATASETS = {
+    'logbook': ([data_loader.LOGBOOK_DISBURSEMENTS, data_loader.LOGBOOK_REPAYMENTS], _build_logbook),
+    'zidisha': ([data_loader.ZIDISHA], _build_zidisha),
+}
+
+# name -> read-only dataset; replaced whole, never updated in place
+_datasets = {}
+_locks = {name: threading.Lock() for name in DATASETS}
+_stats = {"hits": 0, "builds": 0, "waits": 0, "stale": 0, "refreshes": 0}
+_stats_lock = threading.Lock()
+# Background rebuilds: names being rebuilt, and name -> (signature, message) of the last failed one
+_refreshing = set()
+_errors = {}
+_refresh_lock = threading.Lock()
+_watcher = {"thread": None}
+
+
+def _count(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _signature(name):
+    return tuple(data_loader.file_signature(path) for path in DATASETS[name][0])
+
+
+def _build(name):
+    """Build a dataset for the current source files, unless another thread just did"""
+    lock = _locks[name]
+    if not lock.acquire(blocking=False):
+        # Another thread is already building it; use its result
+        _count("waits")
+        lock.acquire()
+    try:
+        signature = _signature(name)
+        dataset = _datasets.get(name)
+        if dataset is not None and dataset['signature'] == signature:
+            return dataset
+        start = time.perf_counter()
+        built = DATASETS[name][1]()
+        dataset = types.MappingProxyType(dict(
+            built, name=name, signature=signature, loaded_at=time.time(),
+            # Newest modification time of the source files this version was built from
+            as_of=max(mtime_ns for mtime_ns, _ in signature) / 1e9,
+            build_seconds=round(time.perf_counter() - start, 4)))
+        _datasets[name] = dataset
+        _count("builds")
+        return dataset
+    finally:
+        lock.release()
+
+
+@timings.timed('load')
+def get_dataset(name):
+    """The shared dataset, built on first use and afterwards refreshed in the background.
+
+    While a newer version of the source files is being loaded the previous
+    dataset is returned. Raises FileNotFoundError when a source file is
+    missing and the dataset was never loaded.
+    """
+    dataset = _datasets.get(name)
+    if dataset is None:
+        return _build(name)
+    try:
+        signature = _signature(name)
+    except FileNotFoundError:
+        # A source was removed (e.g. while being replaced); keep serving what was loaded
+        signature = None
+    if signature is None or dataset['signature'] == signature:
+        _count("hits")
+        return dataset
+    _count("stale")
+    refresh(name, signature)
+    return dataset
+
+
+# --- BACKGROUND REFRESH ---
+def refresh(name, signature=None):
+    """Rebuild a dataset on a background thread; returns False if none was started.
+
+    Nothing is started while a rebuild of ``name`` is running, or when
+    ``signature`` is the source version whose last rebuild failed (it is
+    retried once the files change again).
+    """
+    with _refresh_lock:
+        failed = _errors.get(name)
+        if name in _refreshing or (signature is not None and failed is not None and failed[0] == signature):
+            return False
+        _refreshing.add(name)
+    threading.Thread(target=_refresh, args=(name,), name=f"refresh-{name}", daemon=True).start()
+    return True
+
+
+def _refresh(name):
+    signature = None
+    try:
+        signature = _signature(name)
+        data_loader.prefetch_sources(DATASETS[name][0])
+        _build(name)
+        _count("refreshes")
+        with _refresh_lock:
+            _errors.pop(name, None)
+    except Exception as exc:
+        # Sessions keep the loaded dataset; pages show the error next to its as-of time
+        with _refresh_lock:
+            _errors[name] = (signature, f"{type(exc).__name__}: {exc}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(name)
+
+
+def check_sources():
+    """Start a background rebuild of every loaded dataset whose source files changed"""
+    started = []
+    for name, dataset in list(_datasets.items()):
+        try:
+            signature = _signature(name)
+        except FileNotFoundError:
+            continue
+        if dataset['signature'] == signature:
+            # Back to the served version (e.g. a bad export was removed)
+            with _refresh_lock:
+                _errors.pop(name, None)
+        elif refresh(name, signature):
+            started.append(name)
+    return started
+
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        check_sources()
+
+
+def start_watcher(interval=WATCH_INTERVAL):
+    """Start the thread checking loaded datasets' sources every ``interval`` seconds (once per process)"""
+    with _refresh_lock:
+        thread = _watcher["thread"]
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_watch, args=(interval,), name="dataset-watcher", daemon=True)
+            thread.start()
+            _watcher["thread"] = thread
+    return thread
+
+
+@timings.timed('load')
+def preload(names=None, workers=data_loader.INGEST_WORKERS):
+    """Build every dataset not loaded yet, parsing their sources in parallel first.
+
+    Loaded datasets whose sources changed are refreshed in the background
+    instead. Datasets with a missing source are skipped; their pages report it.
+    """
+    check_sources()
+    missing = []
+    for name in names or DATASETS:
+        if name in _datasets:
+            continue
+        try:
+            _signature(name)
+        except FileNotFoundError:
+            continue
+        missing.append(name)
+    if not missing:
+        return {}
+    paths = sorted({path for name in missing for path in DATASETS[name][0]})
+    report = data_loader.prefetch_sources(paths, workers)
+    for name in missing:
+        get_dataset(name)
+    return report
+
+
+def dataset_status(name):
+    """Source and load times of the served dataset, whether a newer one is being built and the last refresh error"""
+    dataset = _datasets.get(name)
+    if dataset is None:
+        return None
+    with _refresh_lock:
+        failed = _errors.get(name)
+        refreshing = name in _refreshing
+    return {'as_of': dataset['as_of'], 'loaded_at': dataset['loaded_at'], 'refreshing': refreshing,
+            'error': failed[1] if failed else None}
+
+
+def clear():
+    """Drop every shared dataset and reset the counters"""
+    _datasets.clear()
+    with _refresh_lock:
+        _errors.clear()
+    with _stats_lock:
+        for stat in _stats:
+            _stats[stat] = 0
+
+
+def registry_info():
+    """Hit/build/wait/stale counts, refreshes in progress and the version and build time of each shared dataset"""
+    with _stats_lock:
+        info = dict(_stats)
+    with _refresh_lock:
+        info['refreshing'] = sorted(_refreshing)
+    info['datasets'] = {name: {'signature': list(d['signature']), 'loaded_at': d['loaded_at'],
+                               'as_of': d['as_of'], 'build_seconds': d['build_seconds']}
+                        for name, d in list(_datasets.items())}
+    return info
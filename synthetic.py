@@ -0,0 +1,377 @@
+"""Synthetic loan books for load testing the dashboards.
+
+Writes ``logbook_disbursements.xlsx``, ``logbookrepayments.csv`` and
+``zidisha.xlsx`` with the exact column layout of the Loandisk and Zidisha
+exports, at any scale. Branch ids, branch mix, products, amounts and the
+weekday pattern follow the shipped samples; loan volume grows steadily over
+the generated period, which ends on the reporting date. Point the app or the
+benchmarks at the output directory, e.g.:
+
+    python synthetic.py /tmp/books --loans 20000 --repayments 1000000 --zidisha 500000 --years 3
+    python benchmark.py loaders snapshots append --data /tmp/books
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from config import BRANCH_MAPPING
+
+# Excel sheets hold 1,048,576 rows including the header (and the Loandisk totals row)
+EXCEL_MAX_ROWS = 1_048_574
+
+# --- SCHEMAS ---
+LOGBOOK_DISBURSEMENT_SCHEMA = [
+    'Branch', 'Disbursed Date', 'Name', 'Loan Product', 'Loan#', 'Disbursed', 'Outstanding', 'Mobile',
+    'Borrower#', 'First Name', 'Name.1', 'Interest Rate', 'Last Name', 'Last Payment', 'Loan#.1', 'Total Due',
+    'Fees Balance', 'Fees Paid', 'Interest Balance', 'Interest Paid', 'Penalty Balance', 'Penalty Paid',
+    'Principal Balance', 'Principal Paid', 'National ID', 'Sales Agent', 'Sales Person', 'DaysPast',
+    'Days Past Maturity', 'Days To Maturity', 'Loan Id', 'LoanOfficer', 'Maturity', 'NextDue', 'Paid', 'PastDue',
+    'Product', 'Status', 'Penalty', 'PendingDue', 'PendingFeesDue', 'PendingInterestDue', 'Principal', 'Status.1',
+]
+# Columns Loandisk sums into the trailing totals row
+LOGBOOK_TOTAL_COLUMNS = [
+    'Disbursed', 'Outstanding', 'Total Due', 'Fees Balance', 'Fees Paid', 'Interest Balance', 'Interest Paid',
+    'Penalty Balance', 'Penalty Paid', 'Principal Balance', 'Principal Paid', 'Paid', 'PastDue', 'Penalty',
+    'PendingDue', 'PendingFeesDue', 'PendingInterestDue', 'Principal',
+]
+LOGBOOK_REPAYMENT_SCHEMA = [
+    'repayment_id', 'loan_id', 'repayment_amount', 'loan_repayment_method_id', 'repayment_collected_date',
+    'collector_id', 'repayment_backdate', 'repayment_adjust_remaining_schedule',
+    'repayment_adjust_remaining_schedule_pro_rata', 'repayment_manual_composition', 'principal_repayment_amount',
+    'interest_repayment_amount', 'fees_repayment_amount', 'penalty_repayment_amount', 'loandisk_system_date',
+    'borrower_access_ids', 'repayment_description', 'dea_cash_bank_account', 'branch_id', 'custom_field_23214',
+    'repayment_backdated_date',
+]
+ZIDISHA_SCHEMA = [
+    'Branch Name', 'Client Id', 'Client Name', 'Disbursed On Date', 'Expected Matured On Date', 'Loan ID',
+    'Loan Officer Name', 'Matured On Date', 'Penalties Overdue Derived', 'Principal Amount', 'Product Name',
+    'Total Expected Repayment Derived', 'Total Outstanding Derived', 'Total Repayment Derived',
+]
+
+# --- DISTRIBUTIONS (from the shipped samples) ---
+LOGBOOK_BRANCH_WEIGHTS = {8550: 24, 27133: 20, 63796: 20, 12936: 18, 55886: 12, 77791: 3, 75350: 3}
+ZIDISHA_BRANCH_WEIGHTS = {
+    'Pipeline Branch': 20.5, 'Adams Branch': 15.4, 'Kasarani Branch': 15.3, 'Kiambu Branch': 14.1,
+    'Utawala Branch': 13.3, 'Kawangware Branch': 13.3, 'Advans Branch': 7.6, 'Kinoo Branch': 0.5,
+    'Kilimani Branch': 0.02,
+}
+# Monday..Sunday share of loans disbursed
+WEEKDAY_WEIGHTS = [3412, 3297, 3193, 3320, 2912, 1702, 436]
+# product -> (weight, term in days)
+LOGBOOK_PRODUCTS = {
+    'Logbook Loan One Month Product': (139, 30),
+    'Logbook Loan Long Term Product': (37, 730),
+    'Logbook Loan': (19, 180),
+    'Insurance Premium Financing -Logbook loan': (18, 300),
+    'Business Loan': (14, 180),
+    'Weekend Loan': (4, 7),
+    'Employee Loan': (1, 90),
+}
+LOGBOOK_MONTHLY_RATES = {15: 92, 4: 49, 10: 28, 2: 18, 13: 16, 12: 11, 7.5: 9, 5: 5}
+# product -> (weight, median principal, markup, term in days, Advans product)
+ZIDISHA_PRODUCTS = {
+    'Zidisha Express': (12556, 7000, 0.30, 30, False),
+    'Zidisha Simba': (4319, 6500, 0.30, 30, False),
+    'Zidisha Nyati': (15, 38000, 0.30, 30, False),
+    'Zidisha Kifaru': (1, 43000, 0.25, 30, False),
+    'Unsecured Loans': (16, 55000, 0.17, 60, False),
+    'Salary Advans': (1257, 7000, 0.11, 30, True),
+    'Advans Emergency Loan': (108, 20000, 0.19, 90, True),
+}
+# collector_id -> weight; most repayments are posted by the M-Pesa integration user
+COLLECTOR_WEIGHTS = {98635: 1107, 80134: 24, 93784: 24, 99476: 15, 29649: 14, 18219: 11, 73124: 10, 40147: 7,
+                     97255: 5, 39988: 4, 91368: 4, 97341: 3, 97256: 3, 77262: 1, 78101: 1, 97407: 1}
+REPAYMENT_METHOD_WEIGHTS = {35306: 1133, 35307: 97, 118491: 3, 35303: 1}
+
+FIRST_NAMES = [
+    'Kevin', 'Cynthia', 'Erick', 'Mary', 'Joseph', 'Faith', 'Brian', 'Grace', 'Dennis', 'Mercy', 'Peter', 'Esther',
+    'John', 'Ann', 'Samuel', 'Lucy', 'David', 'Janet', 'James', 'Caroline', 'Collins', 'Sharon', 'Victor', 'Winnie',
+    'Joshua', 'Sarah', 'Lawrence', 'Monica', 'Aggrey', 'Vivian', 'Dancan', 'Maurine', 'Christopher', 'Shyleen',
+]
+LAST_NAMES = [
+    'Otieno', 'Akinyi', 'Kipkoech', 'Wanjiku', 'Mwangi', 'Ochieng', 'Njoroge', 'Kamau', 'Wanjala', 'Atieno',
+    'Mutua', 'Chebet', 'Kiprono', 'Achieng', 'Odhiambo', 'Wambui', 'Korir', 'Nyambura', 'Omondi', 'Muthoni',
+    'Kiganane', 'Chetambe', 'Gacheri', 'Aluoch', 'Simiyu', 'Litunya', 'Njogu', 'Magero', 'Nekesa', 'Okungu',
+]
+LOGBOOK_OFFICERS = ['Edward Magero', 'Joab Simiyu', 'Richard Litunya', 'anne', 'cosmas njogu', 'Kevin Odongo',
+                    'Anne Nekesa', 'Mercy Wanjiru', 'Dennis Kiprop', 'Faith Atieno']
+OFFICERS_PER_ZIDISHA_BRANCH = 6
+
+
+# --- HELPERS ---
+def _weighted(rng, weights, size):
+    """Draw ``size`` keys of ``weights`` in proportion to their values"""
+    keys = list(weights)
+    p = np.asarray([weights[k] for k in keys], dtype=float)
+    return np.asarray(keys)[rng.choice(len(keys), size, p=p / p.sum())]
+
+
+def _loan_dates(rng, size, end, years, growth=2.0):
+    """Disbursement days over ``years`` up to ``end``, following the weekday pattern,
+    with daily volume rising linearly to ``growth`` times the starting volume"""
+    end = pd.Timestamp(end).normalize()
+    days = pd.date_range(end - pd.DateOffset(years=years) + pd.Timedelta(days=1), end, freq='D')
+    weights = np.asarray(WEEKDAY_WEIGHTS, dtype=float)[days.dayofweek] * np.linspace(1.0, growth, len(days))
+    return pd.DatetimeIndex(days[np.sort(rng.choice(len(days), size, p=weights / weights.sum()))])
+
+
+def _format_dates(dates, fmt):
+    """strftime once per distinct day instead of once per row"""
+    dates = pd.Series(dates)
+    unique = dates.dropna().unique()
+    return dates.map(dict(zip(unique, pd.DatetimeIndex(unique).strftime(fmt)))).astype(object)
+
+
+def _names(rng, size):
+    return pd.Series(rng.choice(FIRST_NAMES, size)), pd.Series(rng.choice(LAST_NAMES, size))
+
+
+def _codes(rng, size, length=10):
+    """M-Pesa style transaction codes, e.g. 'TJ1MH65SQ1'"""
+    alphabet = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789", dtype=np.uint8)
+    chars = alphabet[rng.integers(0, len(alphabet), (size, length))]
+    chars[:, :2] = np.frombuffer(b"TJ", dtype=np.uint8)
+    return pd.Series(chars.view(f"S{length}").ravel()).str.decode("ascii")
+
+
+def _lognormal_amounts(rng, size, median, sigma, step, low, high):
+    amounts = np.clip(rng.lognormal(np.log(median), sigma, size), low, high)
+    return np.round(amounts / step) * step
+
+
+# --- GENERATORS ---
+def logbook_disbursements(loans, end, years=3, seed=0, totals=True):
+    """Loandisk Logbook loan export with ``loans`` rows (plus the totals row Loandisk appends)"""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end).normalize()
+    disbursed_on = _loan_dates(rng, loans, end, years)
+    products = _weighted(rng, {p: w for p, (w, _) in LOGBOOK_PRODUCTS.items()}, loans)
+    terms = pd.Series(products).map({p: t for p, (_, t) in LOGBOOK_PRODUCTS.items()}).to_numpy()
+    maturity = disbursed_on + pd.to_timedelta(terms, unit='D')
+    rates = _weighted(rng, LOGBOOK_MONTHLY_RATES, loans).astype(float)
+    principal = _lognormal_amounts(rng, loans, 100_000, 1.0, 1000, 10_000, 5_000_000)
+    interest = np.round(principal * rates / 100 * np.maximum(terms / 30, 1), 2)
+    fees = np.where(rng.random(loans) < 0.2, np.round(principal * 0.04), 0.0)
+
+    # Matured loans are mostly cleared; the rest are part paid or past maturity
+    matured = maturity < end
+    elapsed = np.clip((end - disbursed_on).days.to_numpy() / terms, 0, 1)
+    paid_share = np.where(matured, np.where(rng.random(loans) < 0.9, 1.0, rng.random(loans) * 0.8),
+                          elapsed * rng.random(loans))
+    principal_paid = np.round(principal * paid_share, 2)
+    interest_paid = np.round(interest * paid_share, 2)
+    fees_paid = np.round(fees * paid_share)
+    principal_balance = principal - principal_paid
+    interest_balance = interest - interest_paid
+    fees_balance = fees - fees_paid
+    outstanding = np.round(principal_balance + interest_balance + fees_balance, 2)
+    status = np.where(outstanding <= 0, 'Fully Paid', np.where(matured, 'Past Maturity', 'Current'))
+    status = np.where((status == 'Current') & (rng.random(loans) < 0.005), 'Restructured', status)
+    days_past = np.where(status == 'Past Maturity', (end - maturity).days.to_numpy(), 0).astype(float)
+
+    branches = _weighted(rng, LOGBOOK_BRANCH_WEIGHTS, loans)
+    first, last = _names(rng, loans)
+    branch_names = pd.Series(branches).map(BRANCH_MAPPING)
+    officers = rng.choice(LOGBOOK_OFFICERS, loans)
+    loan_no = (27_000 + np.arange(loans)).astype(float)
+    next_due = np.minimum(disbursed_on + pd.DateOffset(months=1), maturity)
+    last_payment = pd.Series(disbursed_on + pd.to_timedelta(rng.integers(1, 30, loans), unit='D'))
+    titles = rng.choice(['Mr. ', 'Mrs. ', 'Ms. '], loans)
+    df = pd.DataFrame({
+        'Branch': branches.astype(float),
+        'Disbursed Date': _format_dates(disbursed_on, '%d/%m/%Y'),
+        'Name': first + ' ' + last + ' (' + branch_names + ')',
+        'Loan Product': products,
+        'Loan#': loan_no,
+        # Rollovers and top-ups keep their original balance but disburse nothing new
+        'Disbursed': np.where(rng.random(loans) < 0.5, principal, 0.0),
+        'Outstanding': outstanding,
+        'Mobile': rng.integers(700_000_000, 799_999_999, loans).astype(float),
+        # Newer borrowers get Loandisk's 'LR-YYYY-MM-nnnnn' numbers
+        'Borrower#': np.where(rng.random(loans) < 0.1,
+                              'LR-' + _format_dates(disbursed_on, '%Y-%m-') + pd.Series(np.arange(10_000, 10_000 + loans)).astype(str),
+                              pd.Series(1_000_000 + rng.permutation(loans)).astype(object)),
+        'First Name': first,
+        'Name.1': titles + ' ' + first + ' ' + last,
+        'Interest Rate': pd.Series(rates).map(lambda r: f"{r:g}%/Month"),
+        'Last Name': last,
+        'Last Payment': _format_dates(last_payment.where(paid_share > 0), '%d/%m/%Y'),
+        'Loan#.1': loan_no,
+        'Total Due': outstanding,
+        'Fees Balance': fees_balance.astype(int),
+        'Fees Paid': fees_paid.astype(int),
+        'Interest Balance': np.round(interest_balance, 2),
+        'Interest Paid': interest_paid,
+        'Penalty Balance': 0,
+        'Penalty Paid': 0.0,
+        'Principal Balance': np.round(principal_balance, 2),
+        'Principal Paid': principal_paid,
+        'National ID': rng.integers(750_000, 40_000_000, loans).astype(float),
+        'Sales Agent': officers,
+        'Sales Person': officers,
+        'DaysPast': days_past,
+        'Days Past Maturity': days_past,
+        'Days To Maturity': np.maximum((maturity - end).days.to_numpy(), 0).astype(float),
+        'Loan Id': (9_000_000 + np.arange(loans) * 3 + rng.integers(0, 3, loans)).astype(float),
+        'LoanOfficer': officers,
+        'Maturity': _format_dates(maturity, '%d/%m/%Y'),
+        'NextDue': _format_dates(next_due, '%d/%m/%Y'),
+        'Paid': np.round(principal_paid + interest_paid + fees_paid, 2),
+        'PastDue': 0,
+        'Product': products,
+        'Status': status,
+        'Penalty': 0,
+        'PendingDue': 0,
+        'PendingFeesDue': 0,
+        'PendingInterestDue': 0,
+        'Principal': principal,
+        'Status.1': status,
+    }, columns=LOGBOOK_DISBURSEMENT_SCHEMA)
+    if totals:
+        totals_row = pd.DataFrame([df[LOGBOOK_TOTAL_COLUMNS].sum().round(2)], columns=LOGBOOK_DISBURSEMENT_SCHEMA)
+        df = pd.concat([df, totals_row], ignore_index=True)
+    return df
+
+
+def logbook_repayments(rows, disbursements, end, seed=0):
+    """Loandisk repayments export with ``rows`` repayments against the loans in ``disbursements``.
+
+    Rows are in posting order (``loandisk_system_date``), as the export is
+    append-only; a few repayments are backdated by up to a week.
+    """
+    rng = np.random.default_rng(seed + 1)
+    end = pd.Timestamp(end).normalize()
+    loans = disbursements[disbursements['Branch'].notna()]
+    picked = rng.integers(0, len(loans), rows)
+    disbursed_on = pd.to_datetime(loans['Disbursed Date'].to_numpy()[picked], format='%d/%m/%Y')
+    maturity = pd.to_datetime(loans['Maturity'].to_numpy()[picked], format='%d/%m/%Y')
+    window = np.maximum((np.minimum(maturity, end) - disbursed_on).days.to_numpy(), 0)
+    collected = disbursed_on + pd.to_timedelta((rng.random(rows) * (window + 1)).astype(int), unit='D')
+    backdated = np.where(rng.random(rows) < 0.03, rng.integers(1, 8, rows), 0)
+    posted = np.minimum(collected + pd.to_timedelta(backdated, unit='D'), end)
+    minute = rng.integers(4 * 60, 21 * 60, rows)
+    order = np.lexsort((minute, posted.to_numpy()))
+    picked, collected, posted, minute = picked[order], collected[order], posted[order], minute[order]
+
+    amount = _lognormal_amounts(rng, rows, 8000, 1.2, 50, 100, 999_999)
+    split = rng.dirichlet([13, 5, 1, 0.5], rows)
+    parts = np.round(amount[:, None] * split[:, :3], 2)
+    penalty = np.round(amount - parts.sum(axis=1), 2)
+
+    # Loandisk writes '01/10/2025 04:36' or '21/10/2025 2:16pm' depending on the client
+    clock24 = np.asarray([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)], dtype=object)
+    clock12 = np.asarray([f"{(m // 60 - 1) % 12 + 1}:{m % 60:02d}{'am' if m < 720 else 'pm'}"
+                          for m in range(24 * 60)], dtype=object)
+    clock = np.where(rng.random(rows) < 0.5, clock24[minute], clock12[minute])
+    loan_ids = loans['Loan Id'].to_numpy()[picked].astype(np.int64)
+    branch_ids = loans['Branch'].to_numpy()[picked].astype(np.int64)
+    access_ids = {b: f"[{rng.integers(10_000, 99_999)}]" for b in LOGBOOK_BRANCH_WEIGHTS}
+    df = pd.DataFrame({
+        'repayment_id': 82_900_000 + np.cumsum(rng.integers(1, 2000, rows)),
+        'loan_id': loan_ids,
+        'repayment_amount': amount,
+        'loan_repayment_method_id': _weighted(rng, REPAYMENT_METHOD_WEIGHTS, rows),
+        'repayment_collected_date': _format_dates(collected, '%d/%m/%Y'),
+        'collector_id': _weighted(rng, COLLECTOR_WEIGHTS, rows),
+        'repayment_backdate': np.nan,
+        'repayment_adjust_remaining_schedule': np.nan,
+        'repayment_adjust_remaining_schedule_pro_rata': np.nan,
+        'repayment_manual_composition': np.nan,
+        'principal_repayment_amount': parts[:, 0],
+        'interest_repayment_amount': parts[:, 1],
+        'fees_repayment_amount': parts[:, 2],
+        'penalty_repayment_amount': penalty,
+        'loandisk_system_date': _format_dates(posted, '%d/%m/%Y') + ' ' + clock,
+        'borrower_access_ids': pd.Series(branch_ids).map(access_ids),
+        'repayment_description': np.nan,
+        'dea_cash_bank_account': 0,
+        'branch_id': branch_ids,
+        'custom_field_23214': _codes(rng, rows) + ' - ' + pd.Series(loan_ids).astype(str),
+        'repayment_backdated_date': np.nan,
+    }, columns=LOGBOOK_REPAYMENT_SCHEMA)
+    df.index = pd.RangeIndex(1, rows + 1)
+    return df
+
+
+def zidisha(loans, end, years=3, seed=0):
+    """Zidisha loan book export with ``loans`` rows (Advans Branch included)"""
+    rng = np.random.default_rng(seed + 2)
+    end = pd.Timestamp(end).normalize()
+    disbursed_on = _loan_dates(rng, loans, end, years)
+    branches = _weighted(rng, ZIDISHA_BRANCH_WEIGHTS, loans)
+    is_advans = branches == 'Advans Branch'
+    products = np.where(
+        is_advans,
+        _weighted(rng, {p: spec[0] for p, spec in ZIDISHA_PRODUCTS.items() if spec[4]}, loans),
+        _weighted(rng, {p: spec[0] for p, spec in ZIDISHA_PRODUCTS.items() if not spec[4]}, loans))
+    spec = pd.DataFrame(ZIDISHA_PRODUCTS, index=['weight', 'median', 'markup', 'term', 'advans']).T.loc[products]
+    principal = _lognormal_amounts(rng, loans, spec['median'].to_numpy(float), 0.45, 500, 1000, 200_000)
+    expected = np.round(principal * (1 + spec['markup'].to_numpy(float)))
+    expected_maturity = disbursed_on + pd.to_timedelta(spec['term'].to_numpy(int) + rng.integers(0, 2, loans), unit='D')
+
+    # Matured loans are mostly repaid in full, a few late; open loans are part repaid
+    matured = expected_maturity < end
+    repaid_share = np.where(matured, np.where(rng.random(loans) < 0.93, 1.0, rng.random(loans)), rng.random(loans) * 0.5)
+    repaid = np.round(expected * repaid_share)
+    outstanding = expected - repaid
+    late = matured & (outstanding > 0)
+    closed_on = expected_maturity + pd.to_timedelta(rng.integers(-3, 30, loans), unit='D')
+    officers = {b: [f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}" for _ in range(OFFICERS_PER_ZIDISHA_BRANCH)]
+                for b in ZIDISHA_BRANCH_WEIGHTS}
+    officer_pick = rng.integers(0, OFFICERS_PER_ZIDISHA_BRANCH, loans)
+    first, last = _names(rng, loans)
+    client_ids = rng.integers(1, max(loans // 2, 10), loans)
+    return pd.DataFrame({
+        'Branch Name': branches,
+        'Client Id': client_ids,
+        'Client Name': first + ' ' + last,
+        'Disbursed On Date': disbursed_on,
+        'Expected Matured On Date': expected_maturity,
+        'Loan ID': 600 + np.arange(loans),
+        'Loan Officer Name': [officers[b][i] for b, i in zip(branches, officer_pick)],
+        'Matured On Date': np.where(outstanding > 0, expected_maturity, np.minimum(closed_on, end)),
+        'Penalties Overdue Derived': np.where(late, np.round(outstanding * 0.05), np.nan),
+        'Principal Amount': principal.astype(np.int64),
+        'Product Name': products,
+        'Total Expected Repayment Derived': expected,
+        'Total Outstanding Derived': outstanding.astype(np.int64),
+        'Total Repayment Derived': repaid,
+    }, columns=ZIDISHA_SCHEMA)
+
+
+def generate(directory, loans=5000, repayments=50000, zidisha_loans=50000, end=None, years=3, seed=0):
+    """Write the three source files into ``directory``; returns their paths"""
+    end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end).normalize()
+    if max(loans, zidisha_loans) > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sources are limited to {EXCEL_MAX_ROWS:,} rows")
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, name) for name in data_loader.SOURCES}
+    disbursements = logbook_disbursements(loans, end, years, seed)
+    disbursements.to_excel(paths[data_loader.LOGBOOK_DISBURSEMENTS], index=False)
+    logbook_repayments(repayments, disbursements, end, seed).to_csv(
+        paths[data_loader.LOGBOOK_REPAYMENTS], index_label='', encoding='utf-8-sig')
+    zidisha(zidisha_loans, end, years, seed).to_excel(paths[data_loader.ZIDISHA], index=False)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Logbook and Zidisha source files")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("--loans", type=int, default=5000, help="Logbook loans (default: 5000)")
+    parser.add_argument("--repayments", type=int, default=50000, help="Logbook repayments (default: 50000)")
+    parser.add_argument("--zidisha", type=int, default=50000, help="Zidisha loans (default: 50000)")
+    parser.add_argument("--years", type=int, default=3, help="years of history (default: 3)")
+    parser.add_argument("--end", help="last business date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    paths = generate(args.directory, args.loans, args.repayments, args.zidisha, args.end, args.years, args.seed)
+    for path in paths.values():
+        print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
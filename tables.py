@@ -0,0 +1,122 @@
+"""Server-side sorting, searching and paging for large tables.
+
+``st.dataframe(df)`` serialises the whole frame to Arrow and sends it over
+the websocket on every rerun, which for an uploaded report or a branch's
+loan list of tens of thousands of rows dominates the page. Pages instead
+keep the frame on the server and send one page of it: the row positions
+matching a search and sort order are computed here once per (frame, sort,
+search) and reused while the user pages through them, so a page turn is a
+gather of ``page_size`` rows. Nothing here touches Streamlit.
+
+A view is cached by frame identity, or by an explicit ``key`` for frames
+rebuilt on every rerun from the same data (e.g. a period read from the
+partition store); the least recently used views are evicted beyond
+``MAX_CACHED_VIEWS``.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import timings
+
+PAGE_SIZES = [25, 50, 100, 500]
+DEFAULT_PAGE_SIZE = 50
+MAX_CACHED_VIEWS = 32
+
+# (frame key, sort, ascending, search) -> (weak reference to the frame or None, rows, positions)
+_views = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+# --- SEARCH AND SORT ---
+def _text_columns(df):
+    return [col for col in df.columns
+            if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object
+            or pd.api.types.is_string_dtype(df[col].dtype)]
+
+
+def search_mask(df, search):
+    """Rows where any text column contains ``search`` (case-insensitive)"""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in _text_columns(df):
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match the categories once, then rows by their codes
+            hits = pd.Series(values.cat.categories.astype(str)).str.contains(search, case=False, regex=False)
+            mask |= np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits.to_numpy()))
+        else:
+            mask |= values.astype(str).str.contains(search, case=False, regex=False).to_numpy(dtype=bool)
+    return mask
+
+
+@timings.timed('mask')
+def build_view(df, sort=None, ascending=True, search=None):
+    """Row positions of ``df`` matching ``search``, ordered by ``sort`` (stable, missing values last)"""
+    positions = np.flatnonzero(search_mask(df, search)) if search else np.arange(len(df))
+    if sort is not None:
+        values = df[sort].take(positions).reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def view_positions(df, sort=None, ascending=True, search=None, key=None):
+    """``build_view`` positions, cached per frame (or ``key``), sort and search"""
+    search = (search or '').strip() or None
+    frame_key = ('key', key) if key is not None else ('id', id(df))
+    cache_key = (frame_key, sort, bool(ascending), search)
+    with _lock:
+        entry = _views.get(cache_key)
+        if entry is not None and entry[1] == len(df) and (entry[0] is None or entry[0]() is df):
+            _views.move_to_end(cache_key)
+            _stats["hits"] += 1
+            return entry[2]
+        _stats["misses"] += 1
+    positions = build_view(df, sort, ascending, search)
+    with _lock:
+        _views[cache_key] = (weakref.ref(df) if key is None else None, len(df), positions)
+        while len(_views) > MAX_CACHED_VIEWS:
+            _views.popitem(last=False)
+    return positions
+
+
+# --- PAGES ---
+def page_count(rows, page_size=DEFAULT_PAGE_SIZE):
+    """Pages needed for ``rows`` rows (at least one)"""
+    return max(-(-rows // page_size), 1)
+
+
+def page_rows(df, positions, page, page_size=DEFAULT_PAGE_SIZE):
+    """Rows of page ``page`` (1-based, clamped to the last page) of a view"""
+    page = min(max(int(page), 1), page_count(len(positions), page_size))
+    rows = df.take(positions[(page - 1) * page_size:page * page_size])
+    # Arrow sends a categorical's whole dictionary; keep only the page's values
+    for col in rows.columns:
+        if isinstance(rows[col].dtype, pd.CategoricalDtype):
+            rows[col] = rows[col].cat.remove_unused_categories()
+    return rows
+
+
+def table_page(df, page=1, page_size=DEFAULT_PAGE_SIZE, sort=None, ascending=True, search=None, key=None):
+    """One page of ``df`` searched and sorted on the server: its rows, the matching rows and page count"""
+    positions = view_positions(df, sort, ascending, search, key)
+    return {'frame': page_rows(df, positions, page, page_size), 'rows': len(positions),
+            'pages': page_count(len(positions), page_size)}
+
+
+def table_cache_info():
+    """Hit/miss counts and cached views"""
+    with _lock:
+        return dict(_stats, cached=len(_views))
+
+
+def clear_table_cache():
+    """Drop every cached view and reset the counters"""
+    with _lock:
+        _views.clear()
+        for stat in _stats:
+            _stats[stat] = 0
@@ -0,0 +1,117 @@
+"""Branch targets and target achievement against the daily cube.
+
+Targets are a long table with one row per (unit, branch, month, metric) and
+its ``target`` amount; ``month`` is 'YYYY-MM', or empty for a standing target
+used in every month without a row of its own. An optional ``mtd_target``
+fixes the month-to-date target, otherwise it is the monthly target prorated
+by the days of the month elapsed at the reporting date.
+
+The table is read from ``TARGETS_PATH`` when that CSV exists, so targets can
+change from month to month by editing the file, e.g.:
+
+    unit,branch,month,metric,target,mtd_target
+    Logbook,Thika Branch,2025-11,disbursed,8000000,
+    Logbook,Thika Branch,,collected,1049290.77,
+
+Without it the standing targets in ``config`` are used. Achievement, MTD
+achievement and the run-rate projection are computed for every branch at
+once by joining the month's target rows with the per-branch cube totals.
+"""
+import os
+import threading
+
+import pandas as pd
+
+from aggregates import branch_summary
+from config import BRANCH_TARGETS, LOGBOOK_COLLECTION_TARGETS
+
+TARGETS_PATH = "targets.csv"
+TARGET_COLUMNS = ['unit', 'branch', 'month', 'metric', 'target', 'mtd_target']
+REQUIRED_COLUMNS = ['unit', 'branch', 'metric', 'target']
+
+# path -> {"signature": (mtime_ns, size), "table": DataFrame}
+_cache = {}
+_lock = threading.Lock()
+
+
+# --- TARGETS TABLE ---
+def default_targets():
+    """Standing targets from ``config``: Logbook disbursement and collection targets per branch"""
+    disbursed = pd.DataFrame.from_dict(BRANCH_TARGETS, orient='index')
+    collected = pd.Series(LOGBOOK_COLLECTION_TARGETS, name='target').to_frame()
+    table = pd.concat([disbursed.assign(metric='disbursed'), collected.assign(metric='collected')])
+    table = table.rename_axis('branch').reset_index().assign(unit='Logbook', month=None)
+    return _normalise(table)
+
+
+def _normalise(table):
+    missing = [col for col in REQUIRED_COLUMNS if col not in table]
+    if missing:
+        raise ValueError(f"targets table is missing column(s): {', '.join(missing)}")
+    table = table.reindex(columns=TARGET_COLUMNS).copy()
+    # 'YYYY-MM' (or a full date in that month); empty means every month
+    months = pd.to_datetime(table['month'], format='mixed', errors='raise')
+    table['month'] = months.dt.strftime('%Y-%m').where(months.notna(), None)
+    for col in ('target', 'mtd_target'):
+        table[col] = pd.to_numeric(table[col], errors='raise').astype('float64')
+    return table.reset_index(drop=True)
+
+
+def load_targets(path=TARGETS_PATH):
+    """The targets table from ``path``, re-read only when the file changes; ``config`` targets if it is missing"""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return default_targets()
+    signature = (info.st_mtime_ns, info.st_size)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is not None and entry["signature"] == signature:
+            return entry["table"]
+    table = _normalise(pd.read_csv(path, dtype={'month': 'string'}))
+    with _lock:
+        _cache[path] = {"signature": signature, "table": table}
+    return table
+
+
+def month_targets(table, unit, metric, month):
+    """Target and fixed MTD target per branch for one month, indexed by branch.
+
+    A branch's row for ``month`` ('YYYY-MM') replaces its standing target.
+    """
+    rows = table[(table['unit'] == unit) & (table['metric'] == metric)]
+    rows = rows[(rows['month'] == month) | rows['month'].isna()]
+    rows = rows.sort_values('month', na_position='last', kind='stable').drop_duplicates('branch')
+    rows = rows.set_index('branch')[['target', 'mtd_target']]
+    rows.index.name = None
+    return rows
+
+
+# --- ACHIEVEMENT ---
+def target_achievement(cube, unit, metric, start, end, as_of, targets=None):
+    """Actual vs target per branch with a target, for the period ``start``..``end`` seen at ``as_of``.
+
+    Targets are those of the month containing ``start``. Columns: actual,
+    target, mtd_target, achievement_pct, mtd_achievement_pct, run_rate (the
+    month's total at the period's daily pace so far) and
+    projected_achievement_pct. Percentages are NaN where the target is 0.
+    """
+    targets = load_targets() if targets is None else targets
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    as_of = min(max(pd.Timestamp(as_of).normalize(), start), end)
+    month_start = start.replace(day=1)
+    month_days = month_start.days_in_month
+    # Days of the month and of the period that have passed at the reporting date
+    month_elapsed = min((as_of - month_start).days + 1, month_days)
+    period_elapsed = (as_of - start).days + 1
+
+    frame = month_targets(targets, unit, metric, month_start.strftime('%Y-%m'))
+    actual = branch_summary(cube, unit=unit, metric=metric, start=start, end=end)['sum']
+    frame.insert(0, 'actual', actual.reindex(frame.index, fill_value=0.0).astype('float64'))
+    frame['mtd_target'] = frame['mtd_target'].fillna(frame['target'] * month_elapsed / month_days)
+    target = frame['target'].where(frame['target'] > 0)
+    frame['achievement_pct'] = frame['actual'] / target * 100
+    frame['mtd_achievement_pct'] = frame['actual'] / frame['mtd_target'].where(frame['mtd_target'] > 0) * 100
+    frame['run_rate'] = frame['actual'] / period_elapsed * month_days
+    frame['projected_achievement_pct'] = frame['run_rate'] / target * 100
+    return frame
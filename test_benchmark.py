@@ -0,0 +1,42 @@
+"""The benchmark regression guard (``python benchmark.py ... --compare baseline.json``)."""
+import json
+
+import pytest
+
+import benchmark
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"cube@10000": 0.100, "kpis@10000": 0.010}))
+    return str(path)
+
+
+def test_within_tolerance_passes(baseline):
+    limit = 0.100 * (1 + benchmark.REGRESSION_TOLERANCE)
+    assert not benchmark.compare_results({"cube@10000": limit, "kpis@10000": 0.001}, baseline)
+
+
+def test_slower_than_tolerance_regresses(baseline, capsys):
+    limit = 0.100 * (1 + benchmark.REGRESSION_TOLERANCE)
+    assert benchmark.compare_results({"cube@10000": limit * 1.01, "kpis@10000": 0.010}, baseline)
+    assert "REGRESSION cube@10000" in capsys.readouterr().out
+
+
+def test_timings_missing_from_the_baseline_are_ignored(baseline):
+    assert not benchmark.compare_results({"par@10000": 5.0}, baseline)
+
+
+def test_tolerance_can_be_tightened(baseline):
+    assert benchmark.compare_results({"cube@10000": 0.105}, baseline, tolerance=0.01)
+
+
+def test_compare_exits_non_zero_on_regression(baseline, monkeypatch):
+    monkeypatch.setitem(benchmark.BENCHMARKS, "fake", lambda: {"cube@10000": 0.200})
+    with pytest.raises(SystemExit) as raised:
+        benchmark.main(["fake", "--compare", baseline])
+    assert raised.value.code == 1
+
+    monkeypatch.setitem(benchmark.BENCHMARKS, "fake", lambda: {"cube@10000": 0.100})
+    benchmark.main(["fake", "--compare", baseline])
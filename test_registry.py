@@ -0,0 +1,125 @@
+"""Shared datasets under concurrent sessions while the repayments export is appended to.
+
+Runs against a small synthetic loan book in a temporary directory, the same
+scenario as ``python benchmark.py sessions``.
+"""
+import threading
+import time
+
+import pytest
+
+import aggregates
+import data_loader
+import partitions
+import registry
+import synthetic
+
+SESSIONS = 8
+APPENDS = 4
+# Seconds the writer waits for the sessions to be served an appended version
+REFRESH_TIMEOUT = 60
+
+
+@pytest.fixture
+def books(tmp_path, monkeypatch):
+    """Synthetic source files with the last repayments held back; returns the held-back lines"""
+    synthetic.generate(tmp_path, loans=300, repayments=3000, zidisha_loans=500, end='2025-10-21')
+    monkeypatch.chdir(tmp_path)
+    with open(data_loader.LOGBOOK_REPAYMENTS, "rb") as fh:
+        lines = fh.read().splitlines(keepends=True)
+    held_back = lines[-APPENDS * 50:]
+    with open(data_loader.LOGBOOK_REPAYMENTS, "wb") as fh:
+        fh.writelines(lines[:-len(held_back)])
+    data_loader.clear_cache()
+    partitions.clear_cache()
+    registry.clear()
+    yield held_back
+    # Background refreshes read the sources from the temporary directory
+    while registry.registry_info()['refreshing']:
+        time.sleep(0.05)
+    registry.clear()
+    data_loader.clear_cache()
+    partitions.clear_cache()
+
+
+def _consistent(logbook, zidisha):
+    """Problems with a dataset pair: its cubes and store must be built from the frames handed out with them"""
+    problems = []
+    repayments = logbook['repayments']
+    if abs(aggregates.cube_total(logbook['cube'], metric='collected') - repayments['repayment_amount'].sum()) >= 0.01:
+        problems.append('logbook cube')
+    if logbook['repayments_store']['rows'] != len(repayments):
+        problems.append('repayments store')
+    principal = zidisha['loans']['Principal Amount'].astype('float64').sum()
+    if abs(aggregates.cube_total(zidisha['cube'], metric='disbursed') - principal) >= 0.01:
+        problems.append('zidisha cube')
+    return problems
+
+
+def test_sessions_share_one_consistent_build_per_version(books):
+    seen, problems = {}, []
+    seen_lock = threading.Lock()
+    done = threading.Event()
+
+    def session():
+        while not done.is_set():
+            logbook = registry.get_dataset('logbook')
+            zidisha = registry.get_dataset('zidisha')
+            found = _consistent(logbook, zidisha)
+            with seen_lock:
+                problems.extend(found)
+                for dataset in (logbook, zidisha):
+                    seen.setdefault((dataset['name'], dataset['signature']), set()).add(id(dataset['cube']))
+
+    def served(signature):
+        with seen_lock:
+            return ('logbook', signature) in seen
+
+    threads = [threading.Thread(target=session) for _ in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    try:
+        step = len(books) // APPENDS
+        for i in range(APPENDS + 1):
+            signature = registry._signature('logbook')
+            deadline = time.monotonic() + REFRESH_TIMEOUT
+            while not served(signature):
+                assert time.monotonic() < deadline, f"version {i} was never served"
+                time.sleep(0.01)
+            if i < APPENDS:
+                # One write, so no session sees a half-appended version
+                with open(data_loader.LOGBOOK_REPAYMENTS, "ab", buffering=0) as fh:
+                    fh.write(b"".join(books[i * step:(i + 1) * step]))
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+
+    assert problems == []
+    # The first load plus one background rebuild per append, and a single zidisha build
+    assert len(seen) == APPENDS + 2
+    assert registry.registry_info()['builds'] == len(seen)
+    # Every session got the same objects for a version
+    assert all(len(cubes) == 1 for cubes in seen.values())
+
+
+def test_appended_version_matches_a_full_load(books):
+    served = registry.get_dataset('logbook')
+    with open(data_loader.LOGBOOK_REPAYMENTS, "ab") as fh:
+        fh.writelines(books)
+    registry.refresh('logbook')
+    while registry.registry_info()['refreshing']:
+        time.sleep(0.05)
+    logbook = registry.get_dataset('logbook')
+    # The new version was folded in from the appended rows, not reloaded
+    assert data_loader.appended_rows(data_loader.LOGBOOK_REPAYMENTS, served['repayments']) is not None
+
+    data_loader.clear_cache()
+    full = data_loader.read_source(data_loader.LOGBOOK_REPAYMENTS)
+    assert logbook['repayments']['repayment_id'].tolist() == full['repayment_id'].tolist()
+    dates = full['repayment_collected_date']
+    stored = partitions.read_period(logbook['repayments_store'], dates.min(), dates.max())
+    assert stored['repayment_id'].tolist() == full.loc[dates.notna(), 'repayment_id'].tolist()
+    # Only the months of the appended rows were written again
+    appended = {partitions._month_name(key) for key in partitions._month_keys(dates.iloc[-len(books):])}
+    assert set(logbook['repayments_store']['written']) <= appended
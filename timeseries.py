@@ -0,0 +1,250 @@
+"""Rolling-window, month-to-date and day-over-day series over the daily cube.
+
+For each (unit, metric) in ``SERIES_METRICS`` a series keeps a running total
+per branch of the cube's daily values, from the first dated day on.
+``running[b, p]`` is branch ``b``'s total over the series' first ``p`` days.
+Any window is then a difference of two running totals, so each of these is
+two lookups per branch, whatever the window or the length of the history:
+
+- a day's value;
+- its 7- or 30-day rolling sum;
+- its month-to-date total;
+- the same day of the previous month.
+
+Rows landing after a series was built (an append to the repayments export)
+are folded in by ``append_rows``:
+
+- Days after the last one already seen extend the running totals, at O(1)
+  per branch per day.
+- The latest day stays open, so more rows for it (the export is appended to
+  during the day) only redo that day.
+- Rows for an earlier day, or for a branch the series has not seen, rebuild
+  the series.
+
+Closed days live in a buffer with spare capacity that later series append
+into without copying. A series only reads the days it had when it was made,
+so a shared series never changes under a reader.
+
+Days without rows count as zero: rolling means are per calendar day.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_loader
+import timings
+
+# unit -> cube metrics kept as series
+SERIES_METRICS = {
+    'Logbook': ['disbursed', 'collected'],
+    'Zidisha': ['disbursed', 'collections'],
+    'Advans': ['disbursed', 'collections'],
+}
+# Rolling windows in days
+WINDOWS = (7, 30)
+# Smallest number of days a running-total buffer is allocated for
+MIN_CAPACITY = 64
+
+# Guards the cached series and the fill marks of shared running-total buffers
+_lock = threading.Lock()
+
+
+def _days(dates):
+    """Days since the epoch of datetime values"""
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+# --- BUILDING ---
+def _rows(rows):
+    """Branch, day and value arrays of the dated cube rows in ``rows``"""
+    rows = rows[rows['date'].notna()]
+    return (rows['branch'].to_numpy(dtype=object), _days(rows['date']),
+            rows['value'].to_numpy(dtype='float64'))
+
+
+def _from_grid(unit, metric, branches, first, grid):
+    """Series of a branches x days grid of values starting at day ``first``; the last day stays open"""
+    closed = max(grid.shape[1] - 1, 0)
+    running = np.zeros((len(branches), max(2 * closed, MIN_CAPACITY) + 1))
+    np.cumsum(grid[:, :closed], axis=1, out=running[:, 1:closed + 1])
+    return {'unit': unit, 'metric': metric, 'branches': branches, 'first': first, 'closed': closed,
+            'buffer': {'running': running, 'filled': closed}, 'tail': grid[:, closed:].copy()}
+
+
+def _build(unit, metric, branches, days, values):
+    index = pd.Index(pd.unique(branches))
+    first = int(days.min()) if len(days) else 0
+    grid = np.zeros((len(index), int(days.max()) - first + 1 if len(days) else 0))
+    np.add.at(grid, (index.get_indexer(branches), days - first), values)
+    return _from_grid(unit, metric, index, first, grid)
+
+
+@timings.timed('aggregate')
+def build_series(cube, unit, metric):
+    """Series of one unit's metric from the cube's dated rows"""
+    return _build(unit, metric, *_rows(aggregates.cube_slice(cube, unit=unit, metric=metric)))
+
+
+def series_days(series):
+    """Number of days a series covers, from its first dated day"""
+    return series['closed'] + series['tail'].shape[1]
+
+
+def _grid(series):
+    """The series' daily values as a branches x days grid"""
+    closed = series['closed']
+    return np.concatenate([np.diff(series['buffer']['running'][:, :closed + 1], axis=1), series['tail']], axis=1)
+
+
+# --- APPENDING ---
+def _close(series, tail):
+    """Series whose open days are ``tail``; all but the last are closed into the running totals"""
+    closed, new = series['closed'], tail.shape[1] - 1
+    if new <= 0:
+        return dict(series, tail=tail)
+    buffer = series['buffer']
+    with _lock:
+        # Append in place unless another series already extended this buffer
+        in_place = buffer['filled'] == closed and buffer['running'].shape[1] > closed + new
+        if in_place:
+            buffer['filled'] = closed + new
+    if in_place:
+        running = buffer['running']
+    else:
+        running = np.zeros((len(series['branches']), max(2 * (closed + new), MIN_CAPACITY) + 1))
+        running[:, :closed + 1] = buffer['running'][:, :closed + 1]
+        buffer = {'running': running, 'filled': closed + new}
+    running[:, closed + 1:closed + new + 1] = running[:, closed:closed + 1] + np.cumsum(tail[:, :new], axis=1)
+    return dict(series, closed=closed + new, buffer=buffer, tail=tail[:, new:].copy())
+
+
+@timings.timed('aggregate')
+def append_rows(series, rows):
+    """New series with cube rows of its unit and metric (e.g. from appended repayments) added.
+
+    ``series`` itself is left as it was.
+    """
+    branches, days, values = _rows(rows)
+    if not len(days):
+        return series
+    codes = series['branches'].get_indexer(branches)
+    open_from = series['first'] + series['closed']
+    if not series_days(series) or (codes < 0).any() or days.min() < open_from:
+        # A closed day or a new branch changes: rebuild from every day's values
+        grid = _grid(series)
+        known, day = np.nonzero(grid)
+        return _build(series['unit'], series['metric'],
+                      np.concatenate([series['branches'].to_numpy(dtype=object)[known], branches]),
+                      np.concatenate([day + series['first'], days]),
+                      np.concatenate([grid[known, day], values]))
+    tail = series['tail']
+    grown = np.zeros((len(series['branches']), max(tail.shape[1], int(days.max()) - open_from + 1)))
+    grown[:, :tail.shape[1]] = tail
+    np.add.at(grown, (codes, days - open_from), values)
+    return _close(series, grown)
+
+
+# --- QUERIES ---
+def _select(series, branches=None, except_branches=None):
+    names = series['branches']
+    mask = np.ones(len(names), dtype=bool)
+    if branches is not None:
+        mask &= names.isin(list(branches))
+    if except_branches is not None:
+        mask &= ~names.isin(list(except_branches))
+    return np.flatnonzero(mask)
+
+
+def _running(series, rows, through):
+    """Running totals of the selected branch rows through the epoch days ``through`` (inclusive)"""
+    closed, tail = series['closed'], series['tail']
+    counts = np.clip(through - series['first'] + 1, 0, series_days(series))
+    # Only the days this series has closed are read, never those a later series appended
+    totals = series['buffer']['running'][np.ix_(rows, np.minimum(counts, closed))].sum(axis=0)
+    is_open = counts > closed
+    if is_open.any():
+        totals[is_open] += np.cumsum(tail[rows], axis=1).sum(axis=0)[counts[is_open] - closed - 1]
+    return totals
+
+
+@timings.timed('aggregate')
+def series_frame(series, start, end, branches=None, except_branches=None, target=None):
+    """Daily values and their rolling, month-to-date and delta columns for ``start``..``end``, indexed by date.
+
+    Columns: value, sum_7d/mean_7d and sum_30d/mean_30d (windows ending on
+    the day), mtd, dod (change from the day before) and last_month (change
+    from the same day of the previous month, or its last day when shorter).
+    A monthly ``target`` adds mtd_target, the target prorated by the days of
+    the month elapsed, and mtd_target_pct (NaN for a zero target).
+    """
+    dates = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq='D')
+    rows = _select(series, branches, except_branches)
+    day = _days(dates)
+
+    def through(days):
+        return _running(series, rows, days)
+
+    totals = through(day)
+    value = totals - through(day - 1)
+    columns = {'value': value}
+    for window in WINDOWS:
+        columns[f'sum_{window}d'] = totals - through(day - window)
+        columns[f'mean_{window}d'] = columns[f'sum_{window}d'] / window
+    columns['mtd'] = totals - through(day - dates.day.to_numpy())
+    columns['dod'] = value - (through(day - 1) - through(day - 2))
+    last_month = _days(dates - pd.DateOffset(months=1))
+    columns['last_month'] = value - (through(last_month) - through(last_month - 1))
+    # Differences of running totals carry float noise below a cent
+    frame = pd.DataFrame(columns, index=dates).round(2)
+    if target is not None:
+        frame['mtd_target'] = target * dates.day.to_numpy() / dates.days_in_month.to_numpy()
+        frame['mtd_target_pct'] = frame['mtd'] / frame['mtd_target'].where(frame['mtd_target'] > 0) * 100
+    return frame
+
+
+# --- CACHED SERIES ---
+# name -> (source frames, series by (unit, metric)); the loader hands out the same frames until a file changes
+_series = {}
+
+
+def cube_series(cube, units):
+    """Series of every ``SERIES_METRICS`` metric of ``units``, keyed by (unit, metric)"""
+    return {(unit, metric): build_series(cube, unit, metric) for unit in units for metric in SERIES_METRICS[unit]}
+
+
+def logbook_series(df_disb, df_coll, cube):
+    """Logbook series for these loaded frames and their cube.
+
+    When the only change since the cached series is rows appended to the
+    repayments export, just those rows are appended to the collections series.
+    """
+    with _lock:
+        entry = _series.get('logbook')
+    series = None
+    if entry is not None and entry[0][0] is df_disb:
+        if entry[0][1] is df_coll:
+            return entry[1]
+        delta = data_loader.appended_rows(data_loader.LOGBOOK_REPAYMENTS, entry[0][1])
+        if delta is not None:
+            rows = aggregates._aggregate(delta, 'Logbook', 'Branch Name', aggregates.LOGBOOK_REPAYMENT_METRICS)
+            series = dict(entry[1])
+            series[('Logbook', 'collected')] = append_rows(series[('Logbook', 'collected')], rows)
+    if series is None:
+        series = cube_series(cube, ['Logbook'])
+    with _lock:
+        _series['logbook'] = ((df_disb, df_coll), series)
+    return series
+
+
+def zidisha_series(df_zidisha, cube):
+    """Zidisha and Advans series for a loaded Zidisha frame and its cube"""
+    with _lock:
+        entry = _series.get('zidisha')
+    if entry is not None and entry[0][0] is df_zidisha:
+        return entry[1]
+    series = cube_series(cube, ['Zidisha', 'Advans'])
+    with _lock:
+        _series['zidisha'] = ((df_zidisha,), series)
+    return series
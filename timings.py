@@ -0,0 +1,181 @@
+"""Per-stage timings for dashboard reruns.
+
+Each rerun of a page is a *run*; code inside it is attributed to named stages
+(``STAGES``) with the ``stage`` context manager or the ``timed`` decorator.
+Stages nest and each records its own time only: loading a workbook inside
+``load`` that spends 0.3s in ``parse dates`` counts 0.3s there and the rest
+under ``load``, so the stages of a run add up to at most its total. Outside a
+run (precompute, benchmarks, background threads) stages cost two clock reads
+and record nothing.
+
+Finished runs are kept in memory for the admin panel and appended to
+``LOG_PATH`` as JSON lines, one per rerun, tagged with ``RELEASE``. Summarise
+a log (p50/p95 per page and stage, per release) with:
+
+    python timings.py
+    python timings.py --log /srv/exco/.reports/timings.jsonl --release 2025.11
+"""
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+STAGES = ['load', 'parse dates', 'map branches', 'mask', 'aggregate', 'render chart']
+# Time in a run not covered by any stage (building widgets, formatting tables)
+OTHER = 'other'
+LOG_PATH = os.path.join(".reports", "timings.jsonl")
+# Set per deployment so the log can be compared across releases
+RELEASE = os.environ.get("EXCO_RELEASE", "dev")
+MAX_RECENT_RUNS = 500
+
+# Runs are per script thread: Streamlit reruns each session on its own thread
+_local = threading.local()
+_recent = deque(maxlen=MAX_RECENT_RUNS)
+_lock = threading.Lock()
+
+
+# --- RUNS ---
+def start_run(page):
+    """Start timing a rerun of ``page``, discarding any unfinished run on this thread"""
+    _local.run = {'page': page, 'start': time.perf_counter(), 'stages': {}, 'stack': []}
+
+
+def set_page(page):
+    """Rename the current run (e.g. once the selected view is known)"""
+    run = getattr(_local, 'run', None)
+    if run is not None:
+        run['page'] = page
+
+
+def finish_run(path=LOG_PATH):
+    """End the current run and return its record; appended to ``path`` unless it is None"""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        return None
+    _local.run = None
+    total = time.perf_counter() - run['start']
+    stages = {name: round(seconds, 6) for name, seconds in run['stages'].items()}
+    stages[OTHER] = round(max(total - sum(run['stages'].values()), 0.0), 6)
+    record = {'ts': round(time.time(), 3), 'release': RELEASE, 'page': run['page'],
+              'total': round(total, 6), 'stages': stages}
+    with _lock:
+        _recent.append(record)
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "a") as fh:
+                    fh.write(json.dumps(record) + "\n")
+            except OSError:
+                # Timings must never break a page (e.g. read-only deployment)
+                pass
+    return record
+
+
+def recent_runs():
+    """Runs finished in this process, oldest first"""
+    with _lock:
+        return list(_recent)
+
+
+def clear():
+    """Forget the in-memory runs (the log file is left alone)"""
+    with _lock:
+        _recent.clear()
+
+
+# --- STAGES ---
+@contextmanager
+def stage(name):
+    """Attribute the enclosed code to stage ``name`` of the current run"""
+    run = getattr(_local, 'run', None)
+    if run is None:
+        yield
+        return
+    frame = [time.perf_counter(), 0.0]  # start, time spent in nested stages
+    run['stack'].append(frame)
+    try:
+        yield
+    finally:
+        run['stack'].pop()
+        elapsed = time.perf_counter() - frame[0]
+        run['stages'][name] = run['stages'].get(name, 0.0) + elapsed - frame[1]
+        if run['stack']:
+            run['stack'][-1][1] += elapsed
+
+
+def timed(name):
+    """Decorator form of ``stage``"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- SUMMARIES ---
+def read_log(path=LOG_PATH, release=None):
+    """Run records from a JSON-lines log, optionally for one release; bad lines are skipped"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if release is None or record.get('release') == release:
+                records.append(record)
+    return records
+
+
+def summarize(records):
+    """p50/p95 seconds of the total and of each stage, per (release, page).
+
+    Returns ``{(release, page): {'runs': n, 'total': (p50, p95), stage: (p50, p95), ...}}``;
+    a stage a run never entered counts as 0 for that run.
+    """
+    by_page = {}
+    for record in records:
+        by_page.setdefault((record.get('release'), record['page']), []).append(record)
+    summary = {}
+    for key, runs in sorted(by_page.items(), key=lambda item: tuple(map(str, item[0]))):
+        names = STAGES + [OTHER] + sorted({s for r in runs for s in r['stages']} - set(STAGES) - {OTHER})
+        row = {'runs': len(runs), 'total': _p50_p95([r['total'] for r in runs])}
+        for name in names:
+            row[name] = _p50_p95([r['stages'].get(name, 0.0) for r in runs])
+        summary[key] = row
+    return summary
+
+
+def _p50_p95(values):
+    p50, p95 = np.percentile(np.asarray(values, dtype=float), [50, 95])
+    return round(float(p50), 6), round(float(p95), 6)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="p50/p95 page and stage timings from the timings log")
+    parser.add_argument("--log", default=LOG_PATH, help=f"JSON-lines timings log (default: {LOG_PATH})")
+    parser.add_argument("--release", help="only runs tagged with this release")
+    args = parser.parse_args(argv)
+    summary = summarize(read_log(args.log, args.release))
+    if not summary:
+        print(f"no runs in {args.log}")
+        return
+    for (release, page), row in summary.items():
+        print(f"{release}  {page}  ({row['runs']} runs)")
+        for name, value in row.items():
+            if name != 'runs':
+                print(f"    {name:<14}p50 {value[0] * 1000:9.1f} ms    p95 {value[1] * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Parsed-frame cache for workbooks uploaded through ``st.file_uploader``.
+
+Streamlit reruns the page on every widget interaction and hands the same
+upload back each time, so parsing it with ``pd.read_excel`` on every rerun
+costs seconds per click for a multi-MB report. Uploads are keyed by the
+SHA-1 of their bytes: the first rerun parses and types the workbook, later
+reruns (and other sessions uploading the same file) get the cached frame.
+
+Parsed frames are typed as the loader types its sources (mixed object
+columns as strings, repeated strings as categoricals) and kept in memory
+up to ``MAX_CACHED_BYTES``, least recently used first out. With ``spill``
+each frame is also written to a Parquet file under ``SPILL_DIR``, so a
+report evicted from memory or uploaded again after a restart is read back
+in milliseconds instead of re-parsed; the spill directory is bounded by
+``MAX_SPILL_BYTES`` the same way. Cached frames are shared and must not be
+modified in place.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import data_loader
+import timings
+
+SPILL_DIR = ".uploads"
+MAX_CACHED_BYTES = 256 * 1024 * 1024
+MAX_SPILL_BYTES = 1024 * 1024 * 1024
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+# content digest -> (frame, bytes in memory), least recently used first
+_frames = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "spill_hits": 0, "misses": 0, "evictions": 0}
+
+
+def upload_digest(data):
+    """SHA-1 of an upload's bytes"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def spill_path(digest):
+    return os.path.join(SPILL_DIR, digest + ".parquet")
+
+
+# --- PARSING ---
+def _typed(df):
+    df = data_loader._to_parquet_safe(df)
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            if len(values) and values.nunique() <= len(values) * CATEGORY_RATIO:
+                df[col] = values.astype('category')
+    return df
+
+
+@timings.timed('load')
+def parse_upload(data):
+    """Typed frame of the first sheet of a workbook's bytes"""
+    return _typed(pd.read_excel(io.BytesIO(data)))
+
+
+# --- SPILL FILES ---
+def _read_spill(digest):
+    try:
+        frame = pd.read_parquet(spill_path(digest))
+        # Modification time orders the spill files for eviction
+        os.utime(spill_path(digest))
+        return frame
+    except (OSError, ValueError):
+        return None
+
+
+def _write_spill(digest, frame):
+    try:
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        tmp = spill_path(digest) + ".tmp"
+        frame.to_parquet(tmp, index=True)
+        os.replace(tmp, spill_path(digest))
+        _trim_spill()
+    except (OSError, ValueError):
+        # Spilling is an optimisation; the frame stays cached in memory
+        pass
+
+
+def _trim_spill(limit=MAX_SPILL_BYTES):
+    """Delete the least recently used spill files beyond ``limit`` bytes"""
+    files = []
+    for name in os.listdir(SPILL_DIR):
+        if name.endswith(".parquet"):
+            info = os.stat(os.path.join(SPILL_DIR, name))
+            files.append((info.st_mtime_ns, info.st_size, name))
+    total = sum(size for _, size, _ in files)
+    for _, size, name in sorted(files)[:-1]:
+        if total <= limit:
+            break
+        os.remove(os.path.join(SPILL_DIR, name))
+        total -= size
+
+
+# --- CACHE ---
+def _remember(digest, frame, limit):
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    with _lock:
+        _frames[digest] = (frame, size)
+        _frames.move_to_end(digest)
+        total = sum(s for _, s in _frames.values())
+        # The newest frame is kept even when it alone exceeds the limit
+        while total > limit and len(_frames) > 1:
+            _, (_, evicted) = _frames.popitem(last=False)
+            total -= evicted
+            _stats["evictions"] += 1
+
+
+def load_upload(file, spill=True, limit=MAX_CACHED_BYTES):
+    """Parsed frame of an uploaded workbook (a Streamlit ``UploadedFile`` or bytes), parsed once per content.
+
+    Raises whatever ``pd.read_excel`` raises for a file it cannot read;
+    failed parses are not cached.
+    """
+    data = file if isinstance(file, bytes) else file.getvalue()
+    digest = upload_digest(data)
+    with _lock:
+        entry = _frames.get(digest)
+        if entry is not None:
+            _frames.move_to_end(digest)
+            _stats["hits"] += 1
+            return entry[0]
+    frame = _read_spill(digest) if spill else None
+    if frame is not None:
+        with _lock:
+            _stats["spill_hits"] += 1
+    else:
+        frame = parse_upload(data)
+        with _lock:
+            _stats["misses"] += 1
+        if spill:
+            _write_spill(digest, frame)
+    _remember(digest, frame, limit)
+    return frame
+
+
+def upload_cache_info():
+    """Hit/spill-hit/miss/eviction counts, cached uploads and their bytes in memory"""
+    with _lock:
+        return dict(_stats, cached=len(_frames), bytes=sum(s for _, s in _frames.values()))
+
+
+def clear_upload_cache():
+    """Drop every cached frame and reset the counters (spill files are kept)"""
+    with _lock:
+        _frames.clear()
+        for stat in _stats:
+            _stats[stat] = 0